@@ -0,0 +1,60 @@
+"""
+Offline benchmarks for Weblist.
+
+Every module is runnable from the project root with ``python -m benchmarks.<name>``
+and prints a JSON report to stdout so that runs can be diffed between commits.
+"""
+import json
+import math
+import os
+import sys
+from contextlib import contextmanager
+
+
+def setup_django(settings_module="config.settings.test"):
+    """Configure Django for a standalone benchmark process."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """Create the test databases for the duration of the block."""
+    from django.test.utils import (
+        setup_databases,
+        setup_test_environment,
+        teardown_databases,
+        teardown_test_environment,
+    )
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """Nearest-rank percentiles of ``samples``, in milliseconds."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {f"p{point}": None for point in points}
+    return {
+        f"p{point}": round(ordered[max(math.ceil(point / 100 * len(ordered)) - 1, 0)] * 1000, 3)
+        for point in points
+    }
+
+
+def report(name, results, output=None):
+    """Print a benchmark report as JSON, and write it to ``output`` if given."""
+    data = {"benchmark": name, "results": results}
+    json.dump(data, sys.stdout, indent=2, sort_keys=True)
+    sys.stdout.write("\n")
+    if output:
+        with open(output, "w") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.write("\n")
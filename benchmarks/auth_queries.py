@@ -0,0 +1,54 @@
+"""
+Queries and time per authenticated request with and without the cached auth backend.
+
+    python -m benchmarks.auth_queries --requests 500
+"""
+import argparse
+import time
+
+from benchmarks import percentiles, report, setup_django, test_database
+
+
+def run(backend, requests):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.test.utils import CaptureQueriesContext
+
+    from weblist.users.tests.factories import UserFactory
+
+    cache.clear()
+    with override_settings(AUTHENTICATION_BACKENDS=[backend]):
+        client = Client()
+        client.force_login(UserFactory(), backend=backend)
+        client.get("/")
+        samples = []
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(requests):
+                start = time.perf_counter()
+                client.get("/")
+                samples.append(time.perf_counter() - start)
+    user_queries = [q for q in queries.captured_queries if "users_user" in q["sql"]]
+    return {
+        "queries_per_request": len(queries) / requests,
+        "user_queries_per_request": len(user_queries) / requests,
+        **percentiles(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        results = {
+            "model_backend": run("django.contrib.auth.backends.ModelBackend", args.requests),
+            "cached_backend": run("weblist.users.backends.CachedModelBackend", args.requests),
+        }
+    report("auth_queries", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Database queries made by celery beat in one simulated hour, per scheduler.
+
+Each scheduler runs against a throwaway test database holding ``--tasks``
+interval tasks. The hour is replayed as 5 second ticks: every tick reads the
+schedule, every minute all tasks run, every three minutes the run state is
+synced, and the admin edits one task halfway through.
+
+    python -m benchmarks.beat_queries --tasks 20
+"""
+import argparse
+
+from benchmarks import report, setup_django, test_database
+
+SCHEDULERS = {
+    "database": "django_celery_beat.schedulers:DatabaseScheduler",
+    "cached_database": "weblist.utils.schedulers:CachedDatabaseScheduler",
+}
+TICKS = 720  # one hour of 5 second ticks
+RUN_EVERY = 12
+SYNC_EVERY = 36
+
+
+def run(scheduler_path, tasks):
+    from celery.utils.imports import symbol_by_name
+    from django_celery_beat.models import IntervalSchedule, PeriodicTask
+
+    from config.celery_app import app as celery_app
+    from weblist.utils.db import QueryCounter
+
+    PeriodicTask.objects.all().delete()
+    every_minute, _ = IntervalSchedule.objects.get_or_create(every=1, period=IntervalSchedule.MINUTES)
+    for number in range(tasks):
+        PeriodicTask.objects.create(
+            name=f"task-{number}", task="weblist.users.tasks.get_users_count", interval=every_minute
+        )
+    scheduler = symbol_by_name(scheduler_path)(app=celery_app)
+    scheduler.schedule
+    counter = QueryCounter()
+    # Both aliases: schedule reads outside a transaction go to the replica.
+    counter.install()
+    try:
+        for tick in range(1, TICKS + 1):
+            schedule = scheduler.schedule
+            if tick % RUN_EVERY == 0:
+                for entry in list(schedule.values()):
+                    scheduler.reserve(entry)
+            if tick % SYNC_EVERY == 0:
+                scheduler.sync()
+            if tick == TICKS // 2:
+                task = PeriodicTask.objects.get(name="task-0")
+                task.description = "edited"
+                task.save()
+    finally:
+        counter.uninstall()
+    scheduler.close()
+    return {"queries_per_hour": counter.queries, "writes_per_hour": counter.writes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        results = {name: run(path, args.tasks) for name, path in SCHEDULERS.items()}
+    report("beat_queries", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Celery task overhead against an embedded worker, per transport and result backend.
+
+Each configuration runs in its own process: a solo-pool worker is started in a
+thread against the kombu in-memory or filesystem transport, ``--tasks``
+messages of every task are sent, and the report gives the enqueue rate,
+end-to-end latency (publish to ``task_postrun``) percentiles, throughput and,
+when results are stored, the cost of fetching them. ``rpc`` returns results
+over the broker itself, the local stand-in for the production setup where
+``CELERY_RESULT_BACKEND`` is the broker URL.
+
+    python -m benchmarks.celery_tasks --tasks 500 --backends none rpc cache+memory
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from kombu.transport import filesystem
+from kombu.utils.encoding import str_to_bytes
+from kombu.utils.json import dumps
+
+from benchmarks import percentiles, report, setup_django, test_database
+
+TRANSPORTS = ["memory", "filesystem"]
+BACKENDS = ["none", "rpc", "cache+memory", "file"]
+TASKS = {
+    "get_users_count": "weblist.users.tasks.get_users_count",
+    "noop": "benchmarks.celery_tasks.noop",
+    "payload": "benchmarks.celery_tasks.payload",
+}
+PAYLOAD_SIZE = 10 * 1024
+
+
+class FilesystemChannel(filesystem.Channel):
+    """Filesystem channel that renames finished messages into the queue folder.
+
+    kombu's channel writes messages in place and its reader does not take the
+    lock, so a worker polling the folder can pick up a half-written file.
+    """
+
+    def _put(self, queue, payload, **kwargs):
+        filename = f"{int(time.monotonic() * 1000)}_{uuid.uuid4()}.{queue}.msg"
+        staging = os.path.join(self.transport_options["data_folder_staging"], filename)
+        with open(staging, "wb") as f:
+            f.write(str_to_bytes(dumps(payload)))
+        os.replace(staging, os.path.join(self.data_folder_out, filename))
+
+
+class FilesystemTransport(filesystem.Transport):
+    Channel = FilesystemChannel
+
+
+def celery_settings(transport, backend, directory, polling_interval):
+    """Django settings overrides for one configuration."""
+    overrides = {}
+    options = {"polling_interval": polling_interval}
+    if transport == "filesystem":
+        folder, staging = os.path.join(directory, "broker"), os.path.join(directory, "staging")
+        os.mkdir(folder)
+        os.mkdir(staging)
+        options.update(data_folder_in=folder, data_folder_out=folder, data_folder_staging=staging)
+        overrides["CELERY_BROKER_TRANSPORT"] = "benchmarks.celery_tasks:FilesystemTransport"
+    result_backend = None
+    if backend == "file":
+        os.mkdir(os.path.join(directory, "results"))
+        result_backend = f"file://{directory}/results"
+    elif backend != "none":
+        result_backend = f"{backend}://"
+    return {
+        **overrides,
+        "CELERY_BROKER_TRANSPORT_OPTIONS": options,
+        "CELERY_RESULT_BACKEND": result_backend,
+        "CELERY_TASK_IGNORE_RESULT": backend == "none",
+        "CELERY_TASK_ALWAYS_EAGER": False,
+    }
+
+
+def register_tasks(app):
+    @app.task(name=TASKS["noop"])
+    def noop():
+        return None
+
+    @app.task(name=TASKS["payload"])
+    def payload(data):
+        return data
+
+
+def measure(app, task_name, count, store_results):
+    from celery.signals import task_postrun
+
+    task = app.tasks[task_name]
+    args = ("x" * PAYLOAD_SIZE,) if task_name == TASKS["payload"] else ()
+    sent, finished = {}, {}
+    done = threading.Event()
+
+    def record(task_id=None, **kwargs):
+        finished[task_id] = time.perf_counter()
+        if len(finished) == count:
+            done.set()
+
+    task_postrun.connect(record, weak=False)
+    try:
+        results = []
+        start = time.perf_counter()
+        for _ in range(count):
+            published = time.perf_counter()
+            result = task.apply_async(args)
+            sent[result.id] = published
+            results.append(result)
+        enqueue_seconds = time.perf_counter() - start
+        if not done.wait(timeout=max(60, count / 10)):
+            raise RuntimeError(f"{task_name}: {len(finished)} of {count} tasks finished")
+        elapsed = max(finished.values()) - start
+    finally:
+        task_postrun.disconnect(record)
+
+    fetches = []
+    if store_results:
+        for result in results:
+            fetch_start = time.perf_counter()
+            result.get(timeout=10)
+            fetches.append(time.perf_counter() - fetch_start)
+    return {
+        "enqueue_per_second": round(count / enqueue_seconds),
+        "tasks_per_second": round(count / elapsed),
+        "latency_ms": percentiles([finished[id] - sent[id] for id in sent]),
+        "result_get_ms": percentiles(fetches) if store_results else None,
+    }
+
+
+def run(transport, backend, count, polling_interval):
+    """Measure every task for one configuration, in this process."""
+    # Celery reads the broker URL from the environment before any setting.
+    os.environ["CELERY_BROKER_URL"] = f"{transport}://"
+    setup_django()
+    from celery.contrib.testing.worker import start_worker
+    from django.test import override_settings
+
+    from config.celery_app import app as celery_app
+
+    with tempfile.TemporaryDirectory() as directory, test_database(), override_settings(
+        **celery_settings(transport, backend, directory, polling_interval)
+    ):
+        register_tasks(celery_app)
+        with start_worker(celery_app, perform_ping_check=False):
+            return {
+                name: measure(celery_app, task_name, count, backend != "none")
+                for name, task_name in TASKS.items()
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--transports", nargs="+", default=TRANSPORTS, choices=TRANSPORTS)
+    parser.add_argument("--backends", nargs="+", default=BACKENDS, choices=BACKENDS)
+    parser.add_argument("--polling-interval", type=float, default=0.001)
+    parser.add_argument("--child", nargs=2, metavar=("TRANSPORT", "BACKEND"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        json.dump(run(*args.child, args.tasks, args.polling_interval), sys.stdout)
+        return
+
+    results = {}
+    for transport in args.transports:
+        for backend in args.backends:
+            # A fresh process per configuration: the app caches its broker
+            # connection pool and result backend on first use.
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.celery_tasks",
+                    "--tasks",
+                    str(args.tasks),
+                    "--polling-interval",
+                    str(args.polling_interval),
+                    "--child",
+                    transport,
+                    backend,
+                ],
+                check=True,
+                stdout=subprocess.PIPE,
+            ).stdout
+            results.setdefault(transport, {})[backend] = json.loads(output)
+    report("celery_tasks", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Wall time of ``collectstatic`` over the project's full static tree, per storage.
+
+Each storage collects into a fresh ``STATIC_ROOT`` (cold), then collects again
+with one source file touched (warm), the case of a deploy that changed a
+stylesheet. ``serial`` is WhiteNoise's ``CompressedManifestStaticFilesStorage``,
+``parallel`` is ``ParallelCompressedManifestStaticFilesStorage`` with
+``--workers`` processes. The report also says whether both produced the same
+files, byte for byte.
+
+    python -m benchmarks.collectstatic --workers 4
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks import report, setup_django
+
+STORAGES = {
+    "serial": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    "parallel": "weblist.utils.storages.ParallelCompressedManifestStaticFilesStorage",
+}
+TOUCHED = "sass/project.scss"
+
+
+def digest(root):
+    files = {}
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            with open(path, "rb") as f:
+                files[os.path.relpath(path, root)] = hashlib.sha256(f.read()).hexdigest()
+    return files
+
+
+def collect(storage, root, workers):
+    from django.core.management import call_command
+    from django.test import override_settings
+
+    with override_settings(STATICFILES_STORAGE=storage, STATIC_ROOT=root, STATICFILES_COMPRESS_WORKERS=workers):
+        start = time.perf_counter()
+        call_command("collectstatic", interactive=False, verbosity=0)
+        return round(time.perf_counter() - start, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+
+    from django.test import override_settings
+
+    results, digests = {}, {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, storage in STORAGES.items():
+            source = os.path.join(directory, f"{name}-source")
+            shutil.copytree(settings.STATICFILES_DIRS[0], source)
+            root = os.path.join(directory, name)
+            with override_settings(STATICFILES_DIRS=[source]):
+                cold = collect(storage, root, args.workers)
+                touched = os.path.join(source, TOUCHED)
+                with open(touched, "a") as f:
+                    f.write("\n// touched\n")
+                # collectstatic only copies files modified in a later second.
+                os.utime(touched, (time.time() + 2,) * 2)
+                warm = collect(storage, root, args.workers)
+            digests[name] = digest(root)
+            results[name] = {"cold_seconds": cold, "warm_seconds": warm, "files": len(digests[name])}
+    results["identical_output"] = digests["serial"] == digests["parallel"]
+    results["workers"] = args.workers
+    report("collectstatic", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Render time of the users pages with eager and with lazy context processors.
+
+Both backends are built from ``TEMPLATES[0]`` with its cached loader warmed up:
+``eager`` is Django's ``DjangoTemplates``, which runs every context processor
+on each render, ``lazy`` is ``weblist.utils.templates.DjangoTemplates``. Times
+are the best of ``--repeat`` runs, in microseconds per ``render`` with a
+request, as in a view. ``processors_*_us`` is the part of it spent in the
+context processors themselves, all of them for ``eager`` and those listed in
+``processors_run`` for ``lazy``.
+
+    python -m benchmarks.context_processors --renders 2000
+"""
+import argparse
+import time
+
+from benchmarks import report, setup_django, test_database
+
+BACKENDS = {
+    "eager": "django.template.backends.django.DjangoTemplates",
+    "lazy": "weblist.utils.templates.DjangoTemplates",
+}
+
+
+def best_of(function, renders, repeat):
+    """Best of ``repeat`` runs of ``renders`` calls, in microseconds per call."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(renders):
+            function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best / renders * 1e6, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--renders", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.forms import modelform_factory
+    from django.test import RequestFactory, override_settings
+    from django.utils.module_loading import import_string
+
+    from weblist.users.models import User
+    from weblist.users.tests.factories import UserFactory
+    from weblist.utils import templates
+
+    ran = []
+    run = templates.LazyProcessorOutput.run
+
+    def recorded_run(self, position, processor):
+        ran.append(processor)
+        return run(self, position, processor)
+
+    templates.LazyProcessorOutput.run = recorded_run
+    results = {}
+    # The fragment cache would hide most of the rendering being measured.
+    with test_database(), override_settings(TEMPLATE_FRAGMENT_CACHE_TIMEOUT=0):
+        user = UserFactory()
+        request = RequestFactory().get("/")
+        request.user = user
+        request.session = {}
+        pages = {
+            "users/user_detail.html": {"object": user},
+            "users/user_form.html": {"object": user, "form": modelform_factory(User, fields=["name"])(instance=user)},
+            "pages/home.html": {},
+        }
+        params = {key: value for key, value in settings.TEMPLATES[0].items() if key != "BACKEND"}
+        backends = {
+            name: import_string(path)({"APP_DIRS": False, **params, "NAME": name}) for name, path in BACKENDS.items()
+        }
+        processors = backends["eager"].engine.template_context_processors
+        for page, context in pages.items():
+            templates_ = {name: backend.get_template(page) for name, backend in backends.items()}
+            for template in templates_.values():
+                template.render(context, request)
+            ran.clear()
+            templates_["lazy"].render(context, request)
+            used = list(ran)
+            # Alternate the backends so that both see the same machine state.
+            timings = {name: [] for name in backends}
+            for _ in range(args.repeat):
+                for name, template in templates_.items():
+                    timings[name].append(best_of(lambda: template.render(context, request), args.renders, 1))
+            results[page] = {
+                "eager_us": min(timings["eager"]),
+                "lazy_us": min(timings["lazy"]),
+                "processors_eager_us": best_of(
+                    lambda: [processor(request) for processor in processors], args.renders, args.repeat
+                ),
+                "processors_lazy_us": best_of(
+                    lambda: [processor(request) for processor in used], args.renders, args.repeat
+                ),
+                "processors_run": sorted(f"{processor.__module__}.{processor.__qualname__}" for processor in used),
+            }
+    report("context_processors", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Throughput and latency per route of the ``config.urls`` pages under load.
+
+A scratch database is seeded with ``--users`` verified users from
+``UserFactory``, and the WSGI application is served either in this process by
+Django's threaded development server or by ``--workers`` gunicorn workers.
+Anonymous clients browse the public pages and sign up; authenticated clients
+log in through allauth, visit their own pages and update their name, then
+drop their session and start over. Each route reports requests per second and
+p50/p95/p99 latency of its successful requests over ``--seconds``, and its
+failed requests: any of those make the run exit with status 1.
+
+``--output`` writes the report of a run without failures to a file meant to be
+committed as the baseline, ``--baseline`` compares this run against such a file:
+
+    python -m benchmarks.http_routes --output benchmarks/baselines/http_routes.json
+    python -m benchmarks.http_routes --baseline benchmarks/baselines/http_routes.json
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+
+from benchmarks import percentiles, report
+from benchmarks.wsgi_vs_asgi import PORT, start, stop
+
+PASSWORD = "My_R@ndom-P@ssw0rd"
+
+
+def prepare(database, users):
+    """Migrate a scratch database and seed it with verified users."""
+    os.environ["DJANGO_SETTINGS_MODULE"] = "benchmarks.settings"
+    os.environ["BENCHMARK_DATABASE"] = database
+    os.environ.setdefault("CELERY_BROKER_URL", "redis://localhost:6379/0")
+    import django
+
+    django.setup()
+    from allauth.account.models import EmailAddress
+    from django.core.management import call_command
+
+    from weblist.users.tests.factories import UserFactory
+
+    call_command("migrate", verbosity=0)
+    usernames = []
+    for number in range(users):
+        user = UserFactory(username=f"user{number}", password=PASSWORD)
+        EmailAddress.objects.create(user=user, email=user.email, primary=True, verified=True)
+        usernames.append(user.username)
+    return usernames
+
+
+def serve_in_process():
+    """Serve the WSGI application from a thread of this process."""
+    from django.core.servers.basehttp import (
+        ThreadedWSGIServer,
+        WSGIRequestHandler,
+        get_internal_wsgi_application,
+    )
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = ThreadedWSGIServer(("127.0.0.1", PORT), QuietHandler, allow_reuse_address=True)
+    server.set_app(get_internal_wsgi_application())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class Browser:
+    """One client session: keeps cookies and sends the CSRF token on POST."""
+
+    def __init__(self):
+        self.cookies = {}
+
+    def request(self, method, path, data=None):
+        headers = {}
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{key}={value}" for key, value in self.cookies.items())
+        body = None
+        if data is not None:
+            body = urlencode({**data, "csrfmiddlewaretoken": self.cookies.get("csrftoken", "")})
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        connection = http.client.HTTPConnection("127.0.0.1", PORT, timeout=30)
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        finally:
+            connection.close()
+        for header in response.msg.get_all("Set-Cookie") or []:
+            for key, morsel in SimpleCookie(header).items():
+                if morsel.value:
+                    self.cookies[key] = morsel.value
+                else:
+                    self.cookies.pop(key, None)
+        return response.status
+
+
+def anonymous_steps(number, sequence):
+    """Steps of one anonymous visit: (route, method, path, data, expected status)."""
+    username = f"signup{number}x{next(sequence)}"
+    return [
+        ("home", "GET", "/", None, 200),
+        ("about", "GET", "/about/", None, 200),
+        ("account_login", "GET", "/accounts/login/", None, 200),
+        ("account_signup", "GET", "/accounts/signup/", None, 200),
+        (
+            "account_signup [POST]",
+            "POST",
+            "/accounts/signup/",
+            {
+                "username": username,
+                "email": f"{username}@example.com",
+                "password1": PASSWORD,
+                "password2": PASSWORD,
+            },
+            302,
+        ),
+    ]
+
+
+def authenticated_steps(username, sequence):
+    """Steps of one logged-in visit, starting with the login itself."""
+    return [
+        ("account_login", "GET", "/accounts/login/", None, 200),
+        ("account_login [POST]", "POST", "/accounts/login/", {"login": username, "password": PASSWORD}, 302),
+        ("home", "GET", "/", None, 200),
+        ("about", "GET", "/about/", None, 200),
+        ("users:redirect", "GET", "/users/~redirect/", None, 302),
+        ("users:detail", "GET", f"/users/{username}/", None, 200),
+        ("users:update", "GET", "/users/~update/", None, 200),
+        ("users:update [POST]", "POST", "/users/~update/", {"name": f"User {next(sequence)}"}, 302),
+    ]
+
+
+def load(usernames, anonymous, authenticated, seconds, sequence):
+    """Run the clients for ``seconds``; ``sequence`` numbers new usernames across runs."""
+    samples, errors = defaultdict(list), defaultdict(int)
+    deadline = time.monotonic() + seconds
+
+    def client(steps):
+        while time.monotonic() < deadline:
+            browser = Browser()
+            for route, method, path, data, expected in steps():
+                start = time.perf_counter()
+                try:
+                    status = browser.request(method, path, data)
+                except OSError:
+                    status = None
+                if status == expected:
+                    samples[route].append(time.perf_counter() - start)
+                else:
+                    errors[route] += 1
+                if time.monotonic() >= deadline:
+                    break
+
+    threads = [
+        threading.Thread(target=client, args=(lambda n=n: anonymous_steps(n, sequence),))
+        for n in range(anonymous)
+    ] + [
+        threading.Thread(
+            target=client,
+            args=(lambda n=n: authenticated_steps(usernames[n % len(usernames)], sequence),),
+        )
+        for n in range(authenticated)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        route: {
+            "requests_per_second": round(len(samples[route]) / seconds, 1),
+            "errors": errors[route],
+            **percentiles(samples[route]),
+        }
+        for route in sorted(samples.keys() | errors.keys())
+    }
+
+
+def compare(results, baseline):
+    """Relative change of each route's throughput and p95 against ``baseline``."""
+    changes = {}
+    for route, previous in baseline["results"]["routes"].items():
+        current = results["routes"].get(route)
+        if current is None or not previous["requests_per_second"] or not previous["p95"]:
+            continue
+        changes[route] = {
+            "requests_per_second": round(
+                current["requests_per_second"] / previous["requests_per_second"] - 1, 3
+            ),
+            "p95": round(current["p95"] / previous["p95"] - 1, 3),
+        }
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--server", choices=["inprocess", "gunicorn"], default="gunicorn")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--anonymous", type=int, default=4)
+    parser.add_argument("--authenticated", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--output", help="write the report to this file")
+    parser.add_argument("--baseline", help="compare against a report written by --output")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        usernames = prepare(os.path.join(directory, "benchmark.db"), args.users)
+        if args.server == "inprocess":
+            server = serve_in_process()
+        else:
+            server = start("wsgi", args.workers)
+        try:
+            sequence = itertools.count()
+            load(usernames, args.anonymous, args.authenticated, 2, sequence)
+            routes = load(usernames, args.anonymous, args.authenticated, args.seconds, sequence)
+        finally:
+            if args.server == "inprocess":
+                server.shutdown()
+                server.server_close()
+            else:
+                stop(server)
+
+    results = {
+        "config": {
+            key: getattr(args, key)
+            for key in ("server", "workers", "users", "anonymous", "authenticated", "seconds")
+        },
+        "routes": routes,
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            results["change_from_baseline"] = compare(results, json.load(f))
+    failing = [route for route, result in routes.items() if result["errors"]]
+    # A baseline with failures would pass off a broken route as the norm.
+    report("http_routes", results, output=None if failing else args.output)
+    if failing:
+        sys.exit(f"Failed requests on {', '.join(failing)}; no baseline written.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Cost of one log call in the request thread, per logging setup.
+
+``--threads`` threads each log ``--calls`` INFO records with an ``extra``
+field, as ``TransactionTimingMiddleware`` does. Each setup is measured
+against a fast stream (``os.devnull``) and a slow one whose writes take
+``--write-ms``, standing in for a stdout pipe the log collector is not
+draining. The report gives the mean and tail cost per call in microseconds,
+and how many records the queued handler dropped.
+
+    python -m benchmarks.logging_overhead --threads 4 --calls 5000 --write-ms 0.2
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+
+from benchmarks import report, setup_django
+
+VERBOSE = "%(levelname)s %(asctime)s %(module)s %(process)d %(thread)d %(message)s"
+
+
+class SlowStream:
+    def __init__(self, stream, write_ms):
+        self.stream = stream
+        self.delay = write_ms / 1000
+
+    def write(self, text):
+        time.sleep(self.delay)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def setups():
+    from weblist.utils.log import JSONFormatter, QueueStreamHandler, SamplingFilter
+
+    def stream_handler(stream, formatter):
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(formatter)
+        return handler
+
+    def queue_handler(stream, formatter, sample_rate=None):
+        handler = QueueStreamHandler(stream)
+        handler.setFormatter(formatter)
+        if sample_rate is not None:
+            handler.addFilter(SamplingFilter({"benchmark": sample_rate}))
+        return handler
+
+    return {
+        "stream_verbose": lambda stream: stream_handler(stream, logging.Formatter(VERBOSE)),
+        "stream_json": lambda stream: stream_handler(stream, JSONFormatter()),
+        "queue_json": lambda stream: queue_handler(stream, JSONFormatter()),
+        "queue_json_sampled_10": lambda stream: queue_handler(stream, JSONFormatter(), 0.1),
+    }
+
+
+def measure(handler, threads, calls):
+    logger = logging.getLogger("benchmark")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    samples = []
+
+    def log():
+        durations = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            logger.info("home atomic %.2fms", 1.5, extra={"view": "home", "duration_ms": 1.5})
+            durations.append(time.perf_counter() - start)
+        samples.extend(durations)
+
+    workers = [threading.Thread(target=log) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    handler.close()
+    samples.sort()
+    return {
+        "mean_us": round(sum(samples) / len(samples) * 1e6, 2),
+        "p99_us": round(samples[int(len(samples) * 0.99)] * 1e6, 2),
+        "max_us": round(samples[-1] * 1e6, 2),
+        "dropped": getattr(handler, "dropped", 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--write-ms", type=float, default=0.2)
+    args = parser.parse_args()
+
+    setup_django()
+    results = {}
+    with open(os.devnull, "w") as devnull:
+        streams = {"fast": lambda: devnull, "slow": lambda: SlowStream(devnull, args.write_ms)}
+        for name, make_handler in setups().items():
+            results[name] = {
+                speed: measure(make_handler(stream()), args.threads, args.calls)
+                for speed, stream in streams.items()
+            }
+    report("logging_overhead", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Session writes per authenticated request for each session engine.
+
+    python -m benchmarks.session_writes --requests 200
+"""
+import argparse
+
+from benchmarks import report, setup_django, test_database
+
+ENGINES = [
+    "django.contrib.sessions.backends.db",
+    "django.contrib.sessions.backends.cached_db",
+    "weblist.utils.sessions",
+]
+
+
+def measure(engine, save_every_request, requests):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+
+    from weblist.users.tests.factories import UserFactory
+
+    cache.clear()
+    with override_settings(SESSION_ENGINE=engine, SESSION_SAVE_EVERY_REQUEST=save_every_request):
+        user = UserFactory()
+        client = Client()
+        client.force_login(user)
+        urls = [
+            reverse("home"),
+            reverse("about"),
+            reverse("users:redirect"),
+            reverse("users:detail", kwargs={"username": user.username}),
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            for number in range(requests):
+                client.get(urls[number % len(urls)])
+    writes = [
+        q for q in queries.captured_queries if "django_session" in q["sql"] and not q["sql"].startswith("SELECT")
+    ]
+    return round(len(writes) / requests, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        results = {
+            f"SESSION_SAVE_EVERY_REQUEST={save_every_request}": {
+                engine: {"writes_per_request": measure(engine, save_every_request, args.requests)}
+                for engine in ENGINES
+            }
+            for save_every_request in (False, True)
+        }
+    report("session_writes", results)
+
+
+if __name__ == "__main__":
+    main()
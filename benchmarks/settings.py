@@ -0,0 +1,27 @@
+"""
+Settings for servers started by the HTTP benchmarks.
+
+Production-like (``DEBUG`` off, cached templates, WAL SQLite with the reader
+connection) but self-contained: no Redis, no outgoing mail, and a scratch
+database file named by ``BENCHMARK_DATABASE``.
+"""
+from config.settings.base import *  # noqa
+from config.settings.base import DATABASES, TEMPLATES, env
+
+SECRET_KEY = "benchmark"
+ALLOWED_HOSTS = ["127.0.0.1", "localhost"]
+
+DATABASES["default"]["NAME"] = DATABASES["replica"]["NAME"] = env("BENCHMARK_DATABASE")
+
+TEMPLATES[-1]["OPTIONS"]["loaders"] = [
+    (
+        "django.template.loaders.cached.Loader",
+        [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ],
+    )
+]
+
+EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+CELERY_TASK_ALWAYS_EAGER = True
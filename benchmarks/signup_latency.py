@@ -0,0 +1,80 @@
+"""
+Signup latency with synchronous versus queued account e-mail.
+
+The e-mail backend sleeps for ``--send-latency`` seconds to stand in for the
+Anymail/SendGrid round trip. The "sync" run uses allauth's stock adapter, the
+"queued" run uses ``weblist.users.adapters.AccountAdapter`` with an in-memory
+Celery broker, so only the enqueue cost lands on the request.
+
+    python -m benchmarks.signup_latency --signups 200 --send-latency 0.25
+"""
+import argparse
+import os
+import time
+
+from django.conf import settings
+from django.core.mail.backends.locmem import EmailBackend
+
+from benchmarks import percentiles, report, setup_django, test_database
+
+
+class SlowEmailBackend(EmailBackend):
+    """Locmem backend that pays ``BENCHMARK_SEND_LATENCY`` seconds per message."""
+
+    def send_messages(self, messages):
+        time.sleep(settings.BENCHMARK_SEND_LATENCY * len(messages))
+        return super().send_messages(messages)
+
+
+def run(signups, prefix, **overrides):
+    from django.test import Client, override_settings
+
+    client = Client()
+    samples = []
+    with override_settings(**overrides):
+        for number in range(signups):
+            data = {
+                "username": f"{prefix}{number}",
+                "email": f"{prefix}{number}@example.com",
+                "password1": "My_R@ndom-P@ssw0rd",
+                "password2": "My_R@ndom-P@ssw0rd",
+            }
+            start = time.perf_counter()
+            response = client.post("/accounts/signup/", data)
+            samples.append(time.perf_counter() - start)
+            assert response.status_code == 302, response.status_code
+            client.cookies.clear()
+    return {"signups": signups, **percentiles(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--signups", type=int, default=100)
+    parser.add_argument("--send-latency", type=float, default=0.25)
+    args = parser.parse_args()
+
+    os.environ["CELERY_BROKER_URL"] = "memory://"
+    setup_django()
+    from django.test import override_settings
+
+    with test_database(), override_settings(
+        EMAIL_BACKEND="benchmarks.signup_latency.SlowEmailBackend",
+        BENCHMARK_SEND_LATENCY=args.send_latency,
+        CELERY_RESULT_BACKEND="cache+memory://",
+    ):
+        sync = run(
+            args.signups,
+            "sync",
+            ACCOUNT_ADAPTER="allauth.account.adapter.DefaultAccountAdapter",
+        )
+        queued = run(
+            args.signups,
+            "queued",
+            ACCOUNT_ADAPTER="weblist.users.adapters.AccountAdapter",
+            CELERY_TASK_ALWAYS_EAGER=False,
+        )
+    report("signup_latency", {"sync": sync, "queued": queued})
+
+
+if __name__ == "__main__":
+    main()
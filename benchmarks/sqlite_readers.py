@@ -0,0 +1,129 @@
+"""
+SQLite read throughput by reader process count, rollback journal versus WAL.
+
+One writer process commits small transactions continuously while 1..N reader
+processes run primary-key lookups against a scratch copy of the users table
+shape. Each configuration reports total reads per second and "database is
+locked" errors.
+
+    python -m benchmarks.sqlite_readers --workers 1 2 4 8 --seconds 3
+"""
+import argparse
+import multiprocessing
+import os
+import queue
+import random
+import sqlite3
+import tempfile
+import time
+
+from benchmarks import report
+from weblist.utils.db import apply_pragmas
+
+ROWS = 10_000
+# Seconds past the run a reader may take to report before the run is abandoned.
+READER_GRACE = 30
+MODES = {
+    "rollback_journal": {"busy_timeout": 5000, "journal_mode": "DELETE"},
+    "wal": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+    },
+}
+
+
+def connect(path, pragmas):
+    db = sqlite3.connect(path, isolation_level=None)
+    apply_pragmas(db, pragmas)
+    return db
+
+
+def create(path, pragmas):
+    db = connect(path, pragmas)
+    db.execute("CREATE TABLE users_user (id INTEGER PRIMARY KEY, username TEXT, name TEXT)")
+    db.execute("BEGIN")
+    db.executemany(
+        "INSERT INTO users_user (username, name) VALUES (?, ?)",
+        ((f"user{n}", f"User {n}") for n in range(ROWS)),
+    )
+    db.execute("COMMIT")
+    db.close()
+
+
+def reader(path, pragmas, seconds, results):
+    db = connect(path, pragmas)
+    reads = errors = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            db.execute("SELECT * FROM users_user WHERE id = ?", (random.randint(1, ROWS),)).fetchall()
+            reads += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    results.put((reads, errors))
+
+
+def writer(path, pragmas, stop):
+    db = connect(path, pragmas)
+    while not stop.is_set():
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute(
+                "UPDATE users_user SET name = ? WHERE id = ?",
+                (str(time.time()), random.randint(1, ROWS)),
+            )
+            db.execute("COMMIT")
+        except sqlite3.OperationalError:
+            pass
+
+
+def run(pragmas, workers, seconds):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        create(path, pragmas)
+        results = multiprocessing.Queue()
+        stop = multiprocessing.Event()
+        write_process = multiprocessing.Process(target=writer, args=(path, pragmas, stop))
+        write_process.start()
+        readers = [
+            multiprocessing.Process(target=reader, args=(path, pragmas, seconds, results))
+            for _ in range(workers)
+        ]
+        for process in readers:
+            process.start()
+        try:
+            # A reader that crashed never reports; do not wait for it forever.
+            totals = [results.get(timeout=seconds + READER_GRACE) for _ in readers]
+        except queue.Empty:
+            exit_codes = [process.exitcode for process in readers]
+            raise RuntimeError(f"A reader process did not report within {seconds + READER_GRACE}s: {exit_codes}")
+        finally:
+            stop.set()
+            for process in (*readers, write_process):
+                process.join(READER_GRACE)
+                if process.is_alive():
+                    process.terminate()
+    reads = sum(reads for reads, _ in totals)
+    return {
+        "reads_per_second": round(reads / seconds),
+        "locked_errors": sum(errors for _, errors in totals),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+
+    results = {
+        mode: {str(workers): run(pragmas, workers, args.seconds) for workers in args.workers}
+        for mode, pragmas in MODES.items()
+    }
+    report("sqlite_readers", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Memory and speed of the streamed CSV user export over a generated users table.
+
+The peak of Python allocations (tracemalloc) and the growth of the resident set,
+which also covers SQLite's and the C extensions' memory, are measured while the
+whole export is consumed; both should stay flat whatever ``--users`` is.
+
+    python -m benchmarks.user_export --users 500000
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+from benchmarks import report, setup_django, test_database
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+MB = 1024 * 1024
+
+
+def rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * PAGE_SIZE
+
+
+def populate(count):
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < %s)
+            INSERT INTO users_user
+                (password, is_superuser, username, email,
+                 is_staff, is_active, date_joined, name)
+            SELECT '!', 0, 'user' || i, 'user' || i || '@example.com',
+                   0, 1, '2021-01-01 00:00:00', 'User ' || i
+            FROM n
+            """,
+            [count],
+        )
+
+
+def measure():
+    from weblist.users.export import csv_export_response
+
+    response = csv_export_response()
+    size = rows = 0
+    start_rss = peak_rss = rss()
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        for rows, chunk in enumerate(response.streaming_content):
+            size += len(chunk)
+            if not rows % 10_000:
+                peak_rss = max(peak_rss, rss())
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "rows": rows,
+        "csv_mb": round(size / MB, 1),
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(rows / elapsed),
+        "tracemalloc_peak_mb": round(peak / MB, 2),
+        "rss_growth_mb": round((max(peak_rss, rss()) - start_rss) / MB, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=500_000)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        populate(args.users)
+        results = measure()
+    report("user_export", results)
+
+
+if __name__ == "__main__":
+    main()
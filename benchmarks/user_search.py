@@ -0,0 +1,80 @@
+"""
+User search over a generated users table: icontains scan versus the search index.
+
+    python -m benchmarks.user_search --users 1000000
+"""
+import argparse
+import random
+import time
+
+from benchmarks import percentiles, report, setup_django, test_database
+
+FIRST = ["anna", "bjorn", "chen", "dara", "emeka", "fatima", "george", "hana", "ivan", "jules"]
+LAST = ["smith", "nguyen", "garcia", "okafor", "muller", "tanaka", "silva", "kowalski", "haddad"]
+TERMS = ["anna", "okafor", "tanaka chen", "user12345", "example", "zzz"]
+
+
+def populate(count, batch=10_000):
+    from django.db import connection, transaction
+
+    rows = (
+        (
+            f"user{n}",
+            f"{random.choice(FIRST).title()} {random.choice(LAST).title()}",
+            f"user{n}@example.com",
+        )
+        for n in range(count)
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        while True:
+            chunk = [next(rows, None) for _ in range(batch)]
+            chunk = [row for row in chunk if row]
+            if not chunk:
+                break
+            cursor.executemany(
+                "INSERT INTO users_user (username, name, email, password, is_superuser, is_staff,"
+                " is_active, date_joined) VALUES (%s, %s, %s, '!', 0, 0, 1, '2021-01-01')",
+                chunk,
+            )
+
+
+def measure(search, repeat):
+    from weblist.users.models import User
+
+    results = {}
+    for term in TERMS:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            page = list(search(User.objects.order_by("username"), term)[:50])
+            samples.append(time.perf_counter() - start)
+        results[term] = {"first_page": len(page), **percentiles(samples, points=(50, 99))}
+    return results
+
+
+def icontains(queryset, term):
+    from django.db.models import Q
+
+    return queryset.filter(Q(username__icontains=term) | Q(name__icontains=term) | Q(email__icontains=term))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from weblist.users.search import search_users
+
+    with test_database():
+        start = time.perf_counter()
+        populate(args.users)
+        results = {"users": args.users, "populate_seconds": round(time.perf_counter() - start, 2)}
+        results["icontains"] = measure(icontains, args.repeat)
+        results["search_index"] = measure(search_users, args.repeat)
+    report("user_search", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Requests per second and tail latency of the WSGI and ASGI deployments.
+
+Both deployments get the same memory budget. Each is first started with one
+worker to measure a warm worker's RSS, then restarted with as many workers as
+fit in ``--memory-mb``. A pool of client threads then requests the read-only
+pages as a logged-in user for ``--seconds``.
+
+Needs gunicorn and uvicorn from requirements/production.txt:
+
+    python -m benchmarks.wsgi_vs_asgi --memory-mb 512 --concurrency 32 --seconds 10
+"""
+import argparse
+import http.client
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks import percentiles, report
+
+DEPLOYMENTS = {
+    "wsgi": ["config.wsgi:application"],
+    "asgi": ["config.asgi:application", "--worker-class", "uvicorn.workers.UvicornWorker"],
+}
+PORT = 8765
+# gunicorn 20.0 has no __main__ module.
+GUNICORN = [sys.executable, "-c", "from gunicorn.app.wsgiapp import run; run()"]
+
+
+def prepare(database):
+    """Migrate a scratch database and return a logged-in session cookie and user."""
+    os.environ["DJANGO_SETTINGS_MODULE"] = "benchmarks.settings"
+    os.environ["BENCHMARK_DATABASE"] = database
+    os.environ.setdefault("CELERY_BROKER_URL", "redis://localhost:6379/0")
+    import django
+
+    django.setup()
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.test import Client
+
+    from weblist.users.models import User
+
+    call_command("migrate", verbosity=0)
+    user = User.objects.create_user("benchmark", "benchmark@example.com", "benchmark")
+    client = Client()
+    client.force_login(user)
+    return client.cookies[settings.SESSION_COOKIE_NAME].value, user.username
+
+
+def worker_pids(master):
+    with open(f"/proc/{master}/task/{master}/children") as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def rss_mb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0
+
+
+def start(deployment, workers):
+    server = subprocess.Popen(
+        [
+            *GUNICORN, *DEPLOYMENTS[deployment],
+            "--workers", str(workers), "--bind", f"127.0.0.1:{PORT}", "--log-level", "warning",
+        ],
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline and server.poll() is None:
+        try:
+            socket.create_connection(("127.0.0.1", PORT), timeout=1).close()
+            if len(worker_pids(server.pid)) == workers:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.1)
+    stop(server)
+    raise RuntimeError(f"{deployment} server did not start")
+
+
+def stop(server):
+    server.send_signal(signal.SIGTERM)
+    server.wait()
+
+
+def get(path, cookie):
+    connection = http.client.HTTPConnection("127.0.0.1", PORT, timeout=30)
+    try:
+        connection.request("GET", path, headers={"Cookie": f"sessionid={cookie}"})
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    finally:
+        connection.close()
+
+
+def load(paths, cookie, concurrency, seconds):
+    samples, errors = [], []
+    deadline = time.monotonic() + seconds
+
+    def client(offset):
+        number = offset
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                status = get(paths[number % len(paths)], cookie)
+            except OSError as error:
+                errors.append(repr(error))
+                continue
+            samples.append(time.perf_counter() - start)
+            if status >= 400:
+                errors.append(status)
+            number += 1
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        "requests_per_second": round(len(samples) / seconds, 1),
+        "errors": len(errors),
+        **percentiles(samples),
+    }
+
+
+def run(deployment, paths, cookie, args):
+    server = start(deployment, 1)
+    try:
+        load(paths, cookie, args.concurrency, 2)
+        worker_mb = max(rss_mb(pid) for pid in worker_pids(server.pid))
+    finally:
+        stop(server)
+    workers = max(int(args.memory_mb // worker_mb), 1)
+    server = start(deployment, workers)
+    try:
+        load(paths, cookie, args.concurrency, 2)
+        results = load(paths, cookie, args.concurrency, args.seconds)
+    finally:
+        stop(server)
+    return {"workers": workers, "worker_rss_mb": round(worker_mb, 1), **results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--memory-mb", type=float, default=512)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cookie, username = prepare(os.path.join(directory, "benchmark.db"))
+        paths = ["/", "/about/", "/users/~redirect/", f"/users/{username}/"]
+        results = {deployment: run(deployment, paths, cookie, args) for deployment in DEPLOYMENTS}
+    report("wsgi_vs_asgi", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
-# This will make sure the app is always imported when
-# Django starts so that shared_task will use this app.
-from .celery_app import app as celery_app
-
-__all__ = ("celery_app",)
+# The Celery app lives in config.celery_app and is created on first import
+# instead of whenever Django starts, so web and management processes that never
+# queue a task skip importing it. Task modules declare tasks with
+# ``from config.celery_app import app as celery_app``.
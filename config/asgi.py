@@ -0,0 +1,21 @@
+"""
+ASGI config for Weblist project.
+
+This module contains the ASGI application used by ASGI servers such as uvicorn.
+It serves the same project as ``config.wsgi`` but turns on ``ASYNC_VIEWS``, so
+the read-only pages run as async views and a worker can serve other requests
+while one waits on I/O.
+
+"""
+import os
+import sys
+from pathlib import Path
+
+from django.core.asgi import get_asgi_application
+
+ROOT_DIR = Path(__file__).resolve(strict=True).parent.parent
+sys.path.append(str(ROOT_DIR / "weblist"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
+os.environ.setdefault("DJANGO_ASYNC_VIEWS", "True")
+
+application = get_asgi_application()
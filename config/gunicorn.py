@@ -0,0 +1,151 @@
+"""
+Gunicorn configuration for Weblist.
+
+    gunicorn config.wsgi:application -c config/gunicorn.py
+
+The application is loaded and warmed up once in the master (see
+``weblist.utils.warmup``) and then frozen out of the garbage collector, so the
+forked workers keep sharing those memory pages. Each worker then renders the
+``WARMUP_ROUTES`` pages and fills the shared cache before it accepts a request,
+so its first visitors do not wait for its connections and caches. Workers are
+restarted when their resident memory passes ``GUNICORN_MAX_WORKER_RSS_MB``
+instead of after a fixed number of requests. Memory is only checked by workers
+that call ``post_request``, i.e. the sync and threaded workers. Request metrics
+files (see ``weblist.utils.metrics``) are cleared when the master starts and
+written once more when a worker exits.
+"""
+import gc
+import os
+import time
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+MB = 1024 * 1024
+
+
+def cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def memory_limit():
+    """Bytes of memory available to this container, or the host if unlimited."""
+    with open("/proc/meminfo") as f:
+        total = int(f.readline().split()[1]) * 1024
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as f:
+                limit = f.read().strip()
+        except OSError:
+            continue
+        if limit.isdigit():
+            return min(int(limit), total)
+    return total
+
+
+def default_workers(worker_mb, memory_fraction=0.75):
+    """``2 * CPUs + 1`` workers, or fewer if they would not fit in memory."""
+    by_memory = int(memory_limit() * memory_fraction // (worker_mb * MB))
+    return max(1, min(2 * cpu_count() + 1, by_memory))
+
+
+def rss():
+    """Resident bytes of the calling process; cheap enough for every request."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * PAGE_SIZE
+
+
+def memory_breakdown():
+    """Resident, proportional, shared and private bytes of the calling process.
+
+    Pages still shared copy-on-write with the master count as shared.
+    """
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if value.strip().endswith("kB"):
+                fields[key] = int(value.split()[0]) * 1024
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "shared": fields["Shared_Clean"] + fields["Shared_Dirty"],
+        "private": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+worker_rss_mb = int(os.environ.get("GUNICORN_WORKER_RSS_MB", 150))
+max_worker_rss_mb = int(os.environ.get("GUNICORN_MAX_WORKER_RSS_MB", 2 * worker_rss_mb))
+memory_log_interval = int(os.environ.get("GUNICORN_MEMORY_LOG_INTERVAL", 60))
+
+preload_app = True
+workers = int(os.environ.get("WEB_CONCURRENCY") or default_workers(worker_rss_mb))
+
+
+def on_starting(server):
+    from weblist.utils.metrics import clear_metrics_dir
+
+    clear_metrics_dir()
+
+
+def when_ready(server):
+    from weblist.utils.warmup import warm_up
+
+    for step, (count, ms) in warm_up().items():
+        server.log.info("Warm-up %s: %d in %.1fms", step, count, ms)
+    gc.collect()
+    gc.freeze()
+    server.log.info("Froze %d objects before forking %d workers", gc.get_freeze_count(), server.num_workers)
+
+
+def pre_fork(server, worker):
+    # Objects the master allocated since when_ready are shared too.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from weblist.utils import warmup
+
+    try:
+        for step, (count, ms) in warmup.warm_up(warmup.worker_steps()).items():
+            worker.log.info("Worker %s warm-up %s: %d in %.1fms", worker.pid, step, count, ms)
+    except Exception:
+        # A cold worker is better than none.
+        worker.log.exception("Worker %s warm-up failed", worker.pid)
+    worker.requests_served = 0
+    worker.memory_logged_at = time.monotonic()
+
+
+def post_request(worker, req, environ, resp):
+    worker.requests_served += 1
+    now = time.monotonic()
+    if now - worker.memory_logged_at >= memory_log_interval:
+        worker.memory_logged_at = now
+        memory = memory_breakdown()
+        worker.log.info(
+            "Worker %s memory: rss=%.1fMB pss=%.1fMB shared=%.1fMB private=%.1fMB after %d requests",
+            worker.pid,
+            memory["rss"] / MB,
+            memory["pss"] / MB,
+            memory["shared"] / MB,
+            memory["private"] / MB,
+            worker.requests_served,
+        )
+    resident = rss()
+    if resident > max_worker_rss_mb * MB and worker.alive:
+        worker.log.info(
+            "Worker %s rss %.1fMB exceeds %dMB after %d requests, restarting",
+            worker.pid,
+            resident / MB,
+            max_worker_rss_mb,
+            worker.requests_served,
+        )
+        # Finish the current request, then exit; the master starts a new worker.
+        worker.alive = False
+
+
+def worker_exit(server, worker):
+    from weblist.utils.metrics import store
+
+    store.flush()
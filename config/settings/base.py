@@ -45,11 +45,33 @@ LOCALE_PATHS = [str(ROOT_DIR / "locale")]
 DATABASES = {
     # "default": env.db("DATABASE_URL", default="postgres:///weblist"),
     'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
+            # Django's SQLite backend, with transactions started by BEGIN IMMEDIATE.
+            'ENGINE': 'weblist.utils.sqlite',
             'NAME': 'base.db',
         }
 }
 DATABASES["default"]["ATOMIC_REQUESTS"] = True
+# Read-only connection to the same file. Reads made outside a transaction are
+# routed here, see weblist.utils.db.ReadWriteRouter.
+DATABASES["replica"] = {
+    **DATABASES["default"],
+    "ENGINE": "django.db.backends.sqlite3",
+    "ATOMIC_REQUESTS": False,
+    "TEST": {"MIRROR": "default"},
+}
+# https://docs.djangoproject.com/en/dev/ref/settings/#database-routers
+DATABASE_ROUTERS = ["weblist.utils.db.ReadWriteRouter"]
+# Applied to every new SQLite connection by weblist.utils.db.
+# https://www.sqlite.org/pragma.html
+SQLITE_PRAGMAS = {
+    # First, so that switching the journal mode waits for other connections.
+    "busy_timeout": 5000,
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -20000,
+    "temp_store": "MEMORY",
+}
 
 # URLS
 # ------------------------------------------------------------------------------
@@ -57,6 +79,10 @@ DATABASES["default"]["ATOMIC_REQUESTS"] = True
 ROOT_URLCONF = "config.urls"
 # https://docs.djangoproject.com/en/dev/ref/settings/#wsgi-application
 WSGI_APPLICATION = "config.wsgi.application"
+# https://docs.djangoproject.com/en/dev/ref/settings/#asgi-application
+ASGI_APPLICATION = "config.asgi.application"
+# Route the read-only pages to their async views; config/asgi.py turns this on.
+ASYNC_VIEWS = env.bool("DJANGO_ASYNC_VIEWS", default=False)
 
 # APPS
 # ------------------------------------------------------------------------------
@@ -81,6 +107,7 @@ THIRD_PARTY_APPS = [
 
 LOCAL_APPS = [
     "weblist.users.apps.UsersConfig",
+    "weblist.utils.apps.UtilsConfig",
     # Your stuff: custom apps go here
 ]
 # https://docs.djangoproject.com/en/dev/ref/settings/#installed-apps
@@ -95,9 +122,18 @@ MIGRATION_MODULES = {"sites": "weblist.contrib.sites.migrations"}
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#authentication-backends
 AUTHENTICATION_BACKENDS = [
-    "django.contrib.auth.backends.ModelBackend",
-    "allauth.account.auth_backends.AuthenticationBackend",
+    "weblist.users.backends.CachedModelBackend",
+    "weblist.users.backends.CachedAuthenticationBackend",
 ]
+# Backends sessions may still name, with the backend now serving them; sessions
+# naming a backend missing from the list above would be logged out.
+AUTHENTICATION_BACKEND_ALIASES = {
+    "django.contrib.auth.backends.ModelBackend": "weblist.users.backends.CachedModelBackend",
+    "allauth.account.auth_backends.AuthenticationBackend": "weblist.users.backends.CachedAuthenticationBackend",
+}
+# Cache alias and timeout used by the backends above to load request.user.
+AUTH_USER_CACHE = "default"
+AUTH_USER_CACHE_TIMEOUT = 5 * 60
 # https://docs.djangoproject.com/en/dev/ref/settings/#auth-user-model
 AUTH_USER_MODEL = "users.User"
 # https://docs.djangoproject.com/en/dev/ref/settings/#login-redirect-url
@@ -110,11 +146,24 @@ LOGIN_URL = "account_login"
 # https://docs.djangoproject.com/en/dev/ref/settings/#password-hashers
 PASSWORD_HASHERS = [
     # https://docs.djangoproject.com/en/dev/topics/auth/passwords/#using-argon2-with-django
-    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "weblist.users.hashers.PooledArgon2PasswordHasher",
     "django.contrib.auth.hashers.PBKDF2PasswordHasher",
     "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
     "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
 ]
+# Argon2 cost parameters; run "manage.py tune_argon2" to pick them for a host.
+# Changing them rehashes each password on its owner's next login.
+ARGON2_TIME_COST = env.int("ARGON2_TIME_COST", default=2)
+ARGON2_MEMORY_COST = env.int("ARGON2_MEMORY_COST", default=512)
+ARGON2_PARALLELISM = env.int("ARGON2_PARALLELISM", default=2)
+# Processes per web worker verifying passwords; 0 verifies in the request
+# process.
+ARGON2_POOL_SIZE = env.int("ARGON2_POOL_SIZE", default=1)
+ARGON2_POOL_NICE = env.int("ARGON2_POOL_NICE", default=5)
+# Logins verified at once by all the processes sharing ARGON2_LOCK_DIR, i.e.
+# the host; 0 lifts the limit. See weblist.users.hashers.host_slot.
+ARGON2_HOST_SLOTS = env.int("ARGON2_HOST_SLOTS", default=2)
+ARGON2_LOCK_DIR = env("ARGON2_LOCK_DIR", default=str(ROOT_DIR / ".locks" / "argon2"))
 # https://docs.djangoproject.com/en/dev/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -129,18 +178,42 @@ AUTH_PASSWORD_VALIDATORS = [
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#middleware
 MIDDLEWARE = [
+    # First, to time every other middleware; see weblist.utils.metrics.
+    "weblist.utils.middleware.PerformanceMiddleware",
+    # Request id, user, route and elapsed time for log records.
+    "weblist.utils.middleware.RequestContextMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "weblist.users.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.common.BrokenLinkEmailsMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "weblist.utils.middleware.TransactionTimingMiddleware",
 ]
 
+# METRICS
+# ------------------------------------------------------------------------------
+# Each process writes its request metrics here for the /metrics/ endpoint to
+# sum across gunicorn workers; None keeps them in the process. Created private
+# to the app's user, and refused if anyone else can write to it.
+METRICS_DIR = env("DJANGO_METRICS_DIR", default=str(ROOT_DIR / ".metrics"))
+# Seconds between writes of a process's metrics file.
+METRICS_FLUSH_INTERVAL = 5
+# Bearer token scrapers send to /metrics/; without it only staff may read it.
+METRICS_TOKEN = env("DJANGO_METRICS_TOKEN", default="")
+
+# SESSIONS
+# ------------------------------------------------------------------------------
+# https://docs.djangoproject.com/en/dev/ref/settings/#session-engine
+SESSION_ENGINE = "weblist.utils.sessions"
+# Seconds an expiry-only refresh may stay in the cache before the database row
+# is brought up to date, see weblist.utils.sessions.
+SESSION_DB_REFRESH_INTERVAL = 60 * 60
+
 # STATIC
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#static-root
@@ -154,6 +227,21 @@ STATICFILES_FINDERS = [
     "django.contrib.staticfiles.finders.FileSystemFinder",
     "django.contrib.staticfiles.finders.AppDirectoriesFinder",
 ]
+# Bundles built from committed sources by `manage.py build_assets`, see
+# weblist.utils.assets. Paths are relative to ASSETS_ROOT.
+ASSETS_ROOT = str(APPS_DIR / "static")
+ASSET_BUNDLES = {
+    "dist/bundle.css": [
+        "vendor/bootstrap-4.3.1/bootstrap.min.css",
+        "sass/project.scss",
+    ],
+    "dist/bundle.js": [
+        "vendor/jquery-3.3.1/jquery.slim.min.js",
+        "vendor/popper.js-1.14.3/popper.min.js",
+        "vendor/bootstrap-4.3.1/bootstrap.min.js",
+        "js/project.js",
+    ],
+}
 
 # MEDIA
 # ------------------------------------------------------------------------------
@@ -168,7 +256,11 @@ MEDIA_URL = "/media/"
 TEMPLATES = [
     {
         # https://docs.djangoproject.com/en/dev/ref/settings/#std:setting-TEMPLATES-BACKEND
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # Django's backend, running context processors only for the keys a
+        # template looks up; see weblist.utils.templates.
+        "BACKEND": "weblist.utils.templates.DjangoTemplates",
+        # The alias Django's backend has, engines["django"].
+        "NAME": "django",
         # https://docs.djangoproject.com/en/dev/ref/settings/#template-dirs
         "DIRS": [str(APPS_DIR / "templates")],
         "OPTIONS": {
@@ -194,6 +286,15 @@ TEMPLATES = [
     }
 ]
 
+# Seconds a {% fragmentcache %} block stays cached, see weblist.utils.fragments;
+# 0 renders the blocks on every request.
+TEMPLATE_FRAGMENT_CACHE_TIMEOUT = env.int("DJANGO_TEMPLATE_FRAGMENT_CACHE_TIMEOUT", default=60 * 60)
+
+# URL names each gunicorn worker and `manage.py warmup` render before serving,
+# and callables that fill the shared cache; see weblist.utils.warmup.
+WARMUP_ROUTES = env.list("DJANGO_WARMUP_ROUTES", default=["home", "about", "account_login", "account_signup"])
+WARMUP_CACHE_FILLERS = ["weblist.users.counters.get_user_count"]
+
 # https://docs.djangoproject.com/en/dev/ref/settings/#form-renderer
 FORM_RENDERER = "django.forms.renderers.TemplatesSetting"
 
@@ -237,20 +338,30 @@ MANAGERS = ADMINS
 # https://docs.djangoproject.com/en/dev/ref/settings/#logging
 # See https://docs.djangoproject.com/en/dev/topics/logging for
 # more details on how to customize your logging configuration.
+# Records are written by a background thread; see
+# weblist.utils.log.QueueStreamHandler. DJANGO_LOG_FORMAT=json gives the JSON
+# lines production writes, and LOG_SAMPLE_RATES keeps only a fraction of noisy INFO loggers.
+LOG_SAMPLE_RATES = {"weblist.transactions": env.float("DJANGO_TRANSACTION_LOG_SAMPLE_RATE", default=1)}
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
+    "filters": {
+        "sampling": {"()": "weblist.utils.log.SamplingFilter", "rates": LOG_SAMPLE_RATES},
+    },
     "formatters": {
         "verbose": {
             "format": "%(levelname)s %(asctime)s %(module)s "
             "%(process)d %(thread)d %(message)s"
-        }
+        },
+        "json": {"()": "weblist.utils.log.JSONFormatter"},
     },
     "handlers": {
         "console": {
             "level": "DEBUG",
-            "class": "logging.StreamHandler",
-            "formatter": "verbose",
+            "class": "weblist.utils.log.QueueStreamHandler",
+            "filters": ["sampling"],
+            "formatter": env("DJANGO_LOG_FORMAT", default="verbose"),
+            "maxsize": env.int("DJANGO_LOG_QUEUE_SIZE", default=10000),
         }
     },
     "root": {"level": "INFO", "handlers": ["console"]},
@@ -278,7 +389,24 @@ CELERY_TASK_TIME_LIMIT = 5 * 60
 # TODO: set to whatever value is adequate in your circumstances
 CELERY_TASK_SOFT_TIME_LIMIT = 60
 # http://docs.celeryproject.org/en/latest/userguide/configuration.html#beat-scheduler
-CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+CELERY_BEAT_SCHEDULER = "weblist.utils.schedulers:CachedDatabaseScheduler"
+# Seconds between database checks for schedule changes, in case the cache the
+# change marker lives in is not shared with beat; see weblist.utils.schedulers.
+BEAT_SCHEDULE_DB_CHECK_INTERVAL = 5 * 60
+# Installed as PeriodicTask rows by the DatabaseScheduler when beat starts.
+# http://docs.celeryproject.org/en/latest/userguide/configuration.html#beat-schedule
+CELERY_BEAT_SCHEDULE = {
+    "reconcile-user-count": {
+        "task": "weblist.users.tasks.reconcile_user_count",
+        "schedule": 60 * 60,
+    },
+    # Batches queued e-mail; a drain that waited past the next one is moot.
+    "drain-email-queue": {
+        "task": "weblist.users.tasks.drain_email_queue",
+        "schedule": 5,
+        "options": {"expires": 5},
+    },
+}
 # django-allauth
 # ------------------------------------------------------------------------------
 ACCOUNT_ALLOW_REGISTRATION = env.bool("DJANGO_ACCOUNT_ALLOW_REGISTRATION", True)
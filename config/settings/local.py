@@ -1,3 +1,6 @@
+import os
+import sys
+
 from .base import *  # noqa
 from .base import env
 
@@ -36,10 +39,15 @@ INSTALLED_APPS = ["whitenoise.runserver_nostatic"] + INSTALLED_APPS  # noqa F405
 
 # django-debug-toolbar
 # ------------------------------------------------------------------------------
-# https://django-debug-toolbar.readthedocs.io/en/latest/installation.html#prerequisites
-INSTALLED_APPS += ["debug_toolbar"]  # noqa F405
-# https://django-debug-toolbar.readthedocs.io/en/latest/installation.html#middleware
-MIDDLEWARE += ["debug_toolbar.middleware.DebugToolbarMiddleware"]  # noqa F405
+# Only the development server (runserver, or django-extensions' runserver_plus)
+# uses the toolbar, so other management commands skip loading it unless
+# DJANGO_DEBUG_TOOLBAR says otherwise.
+USE_DEBUG_TOOLBAR = env.bool("DJANGO_DEBUG_TOOLBAR", default=any(arg.startswith("runserver") for arg in sys.argv[1:]))
+if USE_DEBUG_TOOLBAR:
+    # https://django-debug-toolbar.readthedocs.io/en/latest/installation.html#prerequisites
+    INSTALLED_APPS += ["debug_toolbar"]  # noqa F405
+    # https://django-debug-toolbar.readthedocs.io/en/latest/installation.html#middleware
+    MIDDLEWARE += ["debug_toolbar.middleware.DebugToolbarMiddleware"]  # noqa F405
 # https://django-debug-toolbar.readthedocs.io/en/latest/configuration.html#debug-toolbar-config
 DEBUG_TOOLBAR_CONFIG = {
     "DISABLE_PANELS": ["debug_toolbar.panels.redirects.RedirectsPanel"],
@@ -55,6 +63,10 @@ INTERNAL_IPS = ["127.0.0.1", "10.0.2.2"]
 INSTALLED_APPS += ["django_extensions"]  # noqa F405
 # Celery
 # ------------------------------------------------------------------------------
+# Tasks run in-process, so no broker is needed. Celery prefers the
+# environment variable, which config/settings/.env sets, over this setting.
+CELERY_BROKER_URL = os.environ["CELERY_BROKER_URL"] = "memory://"
+CELERY_RESULT_BACKEND = "cache+memory://"
 # http://docs.celeryproject.org/en/latest/userguide/configuration.html#task-always-eager
 CELERY_TASK_ALWAYS_EAGER = True
 # http://docs.celeryproject.org/en/latest/userguide/configuration.html#task-eager-propagates
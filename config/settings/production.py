@@ -14,6 +14,7 @@ ALLOWED_HOSTS = env.list("DJANGO_ALLOWED_HOSTS", default=["example.com"])
 # keeping the setting from Base for now
 DATABASES["default"]["ATOMIC_REQUESTS"] = True  # noqa F405
 DATABASES["default"]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)  # noqa F405
+DATABASES["replica"]["CONN_MAX_AGE"] = DATABASES["default"]["CONN_MAX_AGE"]  # noqa F405
 
 # CACHES
 # ------------------------------------------------------------------------------
@@ -27,7 +28,14 @@ CACHES = {
             # https://github.com/jazzband/django-redis#memcached-exceptions-behavior
             "IGNORE_EXCEPTIONS": True,
         },
-    }
+    },
+    # {% fragmentcache %} blocks, per process: fetching them from Redis would
+    # cost about as much as rendering them. See weblist.utils.fragments.
+    "template_fragments": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "template_fragments",
+        "OPTIONS": {"MAX_ENTRIES": 2000},
+    },
 }
 
 # SECURITY
@@ -53,7 +61,9 @@ SECURE_CONTENT_TYPE_NOSNIFF = env.bool("DJANGO_SECURE_CONTENT_TYPE_NOSNIFF", def
 
 # STATIC
 # ------------------------
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+STATICFILES_STORAGE = "weblist.utils.storages.ParallelCompressedManifestStaticFilesStorage"
+# Processes compressing static files during collectstatic, default one per CPU.
+STATICFILES_COMPRESS_WORKERS = env.int("DJANGO_STATICFILES_COMPRESS_WORKERS", default=None)
 # MEDIA
 # ------------------------------------------------------------------------------
 
@@ -106,28 +116,39 @@ ANYMAIL = {
 # See https://docs.djangoproject.com/en/dev/topics/logging for
 # more details on how to customize your logging configuration.
 # A sample logging configuration. The only tangible logging
-# performed by this configuration is to send an email to
-# the site admins on every HTTP 500 error when DEBUG=False.
+# performed by this configuration is to send an email digest to
+# the site admins on HTTP 500 errors when DEBUG=False.
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
-    "filters": {"require_debug_false": {"()": "django.utils.log.RequireDebugFalse"}},
+    "filters": {
+        "require_debug_false": {"()": "django.utils.log.RequireDebugFalse"},
+        "sampling": {"()": "weblist.utils.log.SamplingFilter", "rates": LOG_SAMPLE_RATES},  # noqa F405
+    },
     "formatters": {
         "verbose": {
             "format": "%(levelname)s %(asctime)s %(module)s "
             "%(process)d %(thread)d %(message)s"
-        }
+        },
+        "json": {"()": "weblist.utils.log.JSONFormatter"},
     },
     "handlers": {
+        # Queues records and mails one digest per distinct traceback, see
+        # weblist.utils.log.AdminDigestHandler.
         "mail_admins": {
             "level": "ERROR",
             "filters": ["require_debug_false"],
-            "class": "django.utils.log.AdminEmailHandler",
+            "class": "weblist.utils.log.AdminDigestHandler",
+            "window": env.int("DJANGO_ADMIN_DIGEST_WINDOW", default=60),
         },
+        # Writes from a background thread and drops records when its queue
+        # is full, see weblist.utils.log.QueueStreamHandler.
         "console": {
             "level": "DEBUG",
-            "class": "logging.StreamHandler",
-            "formatter": "verbose",
+            "class": "weblist.utils.log.QueueStreamHandler",
+            "filters": ["sampling"],
+            "formatter": env("DJANGO_LOG_FORMAT", default="json"),  # noqa F405
+            "maxsize": env.int("DJANGO_LOG_QUEUE_SIZE", default=10000),
         },
     },
     "root": {"level": "INFO", "handlers": ["console"]},
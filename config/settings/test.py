@@ -1,6 +1,7 @@
 """
 With these settings, tests run faster.
 """
+import os
 
 from .base import *  # noqa
 from .base import env
@@ -15,6 +16,12 @@ SECRET_KEY = env(
 # https://docs.djangoproject.com/en/dev/ref/settings/#test-runner
 TEST_RUNNER = "django.test.runner.DiscoverRunner"
 
+# DATABASES
+# ------------------------------------------------------------------------------
+# Each test runs inside one transaction on "default"; a second connection
+# would not see its rows.
+del DATABASES["replica"]  # noqa F405
+
 # PASSWORDS
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#password-hashers
@@ -37,5 +44,21 @@ TEMPLATES[-1]["OPTIONS"]["loaders"] = [  # type: ignore[index] # noqa F405
 # https://docs.djangoproject.com/en/dev/ref/settings/#email-backend
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 
+# METRICS
+# ------------------------------------------------------------------------------
+# Keep request metrics in the test process.
+METRICS_DIR = None
+
+# Celery
+# ------------------------------------------------------------------------------
+# Tasks run in-process, so no broker is needed. Celery prefers the
+# environment variable, which config/settings/.env sets, over this setting.
+CELERY_BROKER_URL = os.environ["CELERY_BROKER_URL"] = "memory://"
+CELERY_RESULT_BACKEND = "cache+memory://"
+# http://docs.celeryproject.org/en/latest/userguide/configuration.html#task-always-eager
+CELERY_TASK_ALWAYS_EAGER = True
+# http://docs.celeryproject.org/en/latest/userguide/configuration.html#task-eager-propagates
+CELERY_TASK_EAGER_PROPAGATES = True
+
 # Your stuff...
 # ------------------------------------------------------------------------------
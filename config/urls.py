@@ -5,19 +5,44 @@ from django.urls import include, path
 from django.views import defaults as default_views
 from django.views.generic import TemplateView
 
+from weblist.utils.async_views import async_template_view
+from weblist.utils.transactions import apply_transaction_policy
+from weblist.utils.views import metrics_view
+
+if settings.ASYNC_VIEWS:
+    home_view = async_template_view("pages/home.html")
+    about_view = async_template_view("pages/about.html")
+else:
+    home_view = TemplateView.as_view(template_name="pages/home.html")
+    about_view = TemplateView.as_view(template_name="pages/about.html")
+
 urlpatterns = [
-    path("", TemplateView.as_view(template_name="pages/home.html"), name="home"),
-    path(
-        "about/", TemplateView.as_view(template_name="pages/about.html"), name="about"
-    ),
+    path("", home_view, name="home"),
+    path("about/", about_view, name="about"),
     # Django Admin, use {% url 'admin:index' %}
     path(settings.ADMIN_URL, admin.site.urls),
     # User management
     path("users/", include("weblist.users.urls", namespace="users")),
     path("accounts/", include("allauth.urls")),
+    path("metrics/", metrics_view, name="metrics"),
     # Your stuff: custom urls includes go here
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
+# Views that never write skip the per-request transaction of ATOMIC_REQUESTS,
+# see weblist.utils.transactions. Async views must be among them.
+apply_transaction_policy(
+    urlpatterns,
+    read_only=[
+        "home",
+        "about",
+        "users:detail",
+        "users:redirect",
+        "users:search",
+        "users:export",
+        "metrics",
+    ],
+)
+
 
 if settings.DEBUG:
     # This allows the error pages to be debugged during development, just visit
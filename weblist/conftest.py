@@ -1,14 +1,40 @@
 import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
 
 from weblist.users.models import User
 from weblist.users.tests.factories import UserFactory
 
 
+def pytest_configure(config):
+    # The budget fixture and marker, see weblist.utils.pytest_budget.
+    config.pluginmanager.import_plugin("weblist.utils.pytest_budget")
+
+
 @pytest.fixture(autouse=True)
 def media_storage(settings, tmpdir):
     settings.MEDIA_ROOT = tmpdir.strpath
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Database changes are rolled back after each test; cached copies of them
+    # (users, sessions, the user count) have to go too.
+    cache.clear()
+
+
 @pytest.fixture
 def user() -> User:
     return UserFactory()
+
+
+@pytest.fixture
+def live_replica(monkeypatch):
+    """A read-only "replica" alias on the test database, as in base.py."""
+    replica = {**connections["default"].settings_dict, "ENGINE": "django.db.backends.sqlite3"}
+    monkeypatch.setitem(settings.DATABASES, "replica", replica)
+    monkeypatch.setitem(connections.databases, "replica", replica)
+    yield connections["replica"]
+    connections["replica"].close()
+    delattr(connections._connections, "replica")
@@ -5,11 +5,21 @@ from allauth.socialaccount.adapter import DefaultSocialAccountAdapter
 from django.conf import settings
 from django.http import HttpRequest
 
+from weblist.users.tasks import queue_email_on_commit
+
 
 class AccountAdapter(DefaultAccountAdapter):
     def is_open_for_signup(self, request: HttpRequest):
         return getattr(settings, "ACCOUNT_ALLOW_REGISTRATION", True)
 
+    def send_mail(self, template_prefix, email, context):
+        """Render the message in the request and leave delivery to Celery.
+
+        The message is queued when the request's transaction commits and sent
+        with others queued around the same time.
+        """
+        queue_email_on_commit(self.render_mail(template_prefix, email, context))
+
 
 class SocialAccountAdapter(DefaultSocialAccountAdapter):
     def is_open_for_signup(self, request: HttpRequest, sociallogin: Any):
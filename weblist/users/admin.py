@@ -1,13 +1,28 @@
 from django.contrib import admin
 from django.contrib.auth import admin as auth_admin
 from django.contrib.auth import get_user_model
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
+from weblist.users.counters import get_user_count
+from weblist.users.export import csv_export_response
 from weblist.users.forms import UserChangeForm, UserCreationForm
+from weblist.users.search import search_users
 
 User = get_user_model()
 
 
+class UserCountPaginator(Paginator):
+    """Take the total of an unfiltered changelist from the user counter."""
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            return get_user_count()
+        return super().count
+
+
 @admin.register(User)
 class UserAdmin(auth_admin.UserAdmin):
 
@@ -31,4 +46,17 @@ class UserAdmin(auth_admin.UserAdmin):
         (_("Important dates"), {"fields": ("last_login", "date_joined")}),
     )
     list_display = ["username", "name", "is_superuser"]
-    search_fields = ["name"]
+    search_fields = ["username", "name", "email"]
+    actions = ["export_csv"]
+    paginator = UserCountPaginator
+    # The unfiltered total would be another COUNT(*) on every filtered page.
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        # Staff expect the admin's usual substring matches.
+        return search_users(queryset, search_term, substring_fallback=True), False
+
+    def export_csv(self, request, queryset):
+        return csv_export_response(queryset)
+
+    export_csv.short_description = _("Export selected users as CSV")  # type: ignore[attr-defined]
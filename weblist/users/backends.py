@@ -0,0 +1,85 @@
+"""
+Authentication backends that cache ``request.user``.
+
+The cache holds each user's fields except the password hash, and the session
+auth hash derived from it; the loaded user's password is a deferred field,
+fetched only if something reads it. Entries are dropped by the ``User`` save
+and delete signals, so writes that send none, such as ``QuerySet.update()`` or
+raw SQL, must call :func:`invalidate_cached_user` for each user they change.
+"""
+import uuid
+
+from allauth.account.auth_backends import AuthenticationBackend
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+#: Bump when the cached entry changes shape so old entries are never read.
+USER_CACHE_VERSION = 2
+
+
+def cached_fields():
+    return [field.attname for field in get_user_model()._meta.concrete_fields if field.attname != "password"]
+
+
+def dump_user(user):
+    return user._state.db, [getattr(user, name) for name in cached_fields()], user.get_session_auth_hash()
+
+
+def load_user(entry):
+    db, values, session_auth_hash = entry
+    user = get_user_model().from_db(db, cached_fields(), values)
+    user.cached_session_auth_hash = session_auth_hash
+    return user
+
+
+def get_user_cache():
+    return caches[getattr(settings, "AUTH_USER_CACHE", "default")]
+
+
+def user_cache_keys(user_id):
+    """The generation key and the entry key for ``user_id``."""
+    return f"users:auth:{user_id}:generation", f"users:auth:{user_id}"
+
+
+def invalidate_cached_user(user_id):
+    """Make every cached copy of ``user_id`` unreadable.
+
+    Entries are stored together with the generation they were read under, so
+    starting a new generation also defeats a reader that loaded the old row
+    before the save and writes it back afterwards.
+    """
+    generation_key, _ = user_cache_keys(user_id)
+    get_user_cache().set(generation_key, uuid.uuid4().hex, None, version=USER_CACHE_VERSION)
+
+
+class CachedUserMixin:
+    """Serve ``get_user`` from the cache instead of ``users_user`` on every request."""
+
+    def get_user(self, user_id):
+        cache = get_user_cache()
+        generation_key, user_key = user_cache_keys(user_id)
+        cached = cache.get_many([generation_key, user_key], version=USER_CACHE_VERSION)
+        generation = cached.get(generation_key)
+        if generation is None:
+            generation = uuid.uuid4().hex
+            if not cache.add(generation_key, generation, None, version=USER_CACHE_VERSION):
+                # Lost a race with an invalidation; skip caching this time.
+                generation = None
+        elif user_key in cached and cached[user_key][0] == generation:
+            return load_user(cached[user_key][1])
+
+        user = super().get_user(user_id)
+        if user is not None and generation is not None:
+            timeout = getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 300)
+            cache.set(user_key, (generation, dump_user(user)), timeout, version=USER_CACHE_VERSION)
+        return user
+
+
+class CachedModelBackend(CachedUserMixin, ModelBackend):
+    pass
+
+
+class CachedAuthenticationBackend(CachedUserMixin, AuthenticationBackend):
+    pass
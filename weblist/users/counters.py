@@ -0,0 +1,83 @@
+"""
+Denormalized user count.
+
+``COUNT(*)`` over ``users_user`` is a full scan, so the total is kept in a
+single ``UserCount`` row that signals adjust with ``F()`` expressions in the
+same transaction as the insert or delete, and mirrored in the cache for
+readers. :func:`reconcile_user_count` runs periodically to correct drift from
+writes that bypass signals, such as raw SQL.
+
+The cached copy is keyed by a version that every committed change bumps. A
+reader that loaded the row before a commit stores what it read under the
+version it started from, which no one reads any more, so a stale count never
+outlives the commit that changed it.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from weblist.users.models import User, UserCount
+
+COUNTER_PK = 1
+CACHE_KEY = "weblist.users.count"
+VERSION_KEY = "weblist.users.count.version"
+CACHE_TIMEOUT = 5 * 60
+
+
+def cache_key():
+    """Key of the cached count for the current version."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # A new version never reuses the key of one evicted earlier.
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return f"{CACHE_KEY}:{version}"
+
+
+def get_user_count():
+    key = cache_key()
+    count = cache.get(key)
+    if count is None:
+        count = UserCount.objects.filter(pk=COUNTER_PK).values_list("count", flat=True).first()
+        if count is None:
+            count = reconcile_user_count()
+        cache.add(key, count, CACHE_TIMEOUT)
+    return count
+
+
+def invalidate_cached_count():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # No version cached; the next reader starts a new one.
+        pass
+
+
+def adjust_user_count(delta):
+    """Add ``delta`` to the count as part of the current transaction."""
+    with transaction.atomic():
+        if not UserCount.objects.filter(pk=COUNTER_PK).update(count=F("count") + delta):
+            reconcile_user_count()
+            return
+    transaction.on_commit(invalidate_cached_count)
+
+
+def reconcile_user_count():
+    """Recount the users table, store the result and return it."""
+    with transaction.atomic():
+        # Take the write lock before counting so that no insert or delete can
+        # commit between the count and the update.
+        locked = UserCount.objects.filter(pk=COUNTER_PK).update(count=F("count"))
+        count = User.objects.count()
+        if locked:
+            UserCount.objects.filter(pk=COUNTER_PK).update(count=count, reconciled_at=timezone.now())
+        else:
+            # Another process may be creating the missing row too.
+            UserCount.objects.update_or_create(
+                pk=COUNTER_PK, defaults={"count": count, "reconciled_at": timezone.now()}
+            )
+    transaction.on_commit(invalidate_cached_count)
+    return count
@@ -0,0 +1,68 @@
+"""
+Bounded-memory user export shared by the admin, the staff URL and ``export_users``.
+"""
+import csv
+
+from django.contrib.auth import get_user_model
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+User = get_user_model()
+
+EXPORT_FIELDS = ["username", "email", "name", "is_active", "date_joined"]
+EXPORT_CHUNK_SIZE = 2000
+# Spreadsheets run a cell starting with one of these as a formula.
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def iter_users(queryset=None, fields=EXPORT_FIELDS, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield ``fields`` tuples for ``queryset`` in primary key order.
+
+    Rows are fetched a page at a time with ``pk > last_pk`` so that every query
+    is bounded and cheap however deep into the table the export is.
+    """
+    if queryset is None:
+        queryset = User.objects.all()
+    queryset = queryset.order_by("pk").values_list("pk", *fields)
+    last_pk = None
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        count = 0
+        for pk, *values in page[:chunk_size].iterator(chunk_size=chunk_size):
+            last_pk = pk
+            count += 1
+            yield values
+        if count < chunk_size:
+            return
+
+
+class Echo:
+    """File-like object whose ``write`` returns the value instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def escape_formula(value):
+    """Quote text that a spreadsheet opening the CSV would run as a formula."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_row(row):
+    return [escape_formula(value) for value in row]
+
+
+def iter_csv(rows, header=EXPORT_FIELDS):
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(csv_row(row))
+
+
+def csv_export_response(queryset=None, filename=None):
+    filename = filename or f"users-{timezone.now():%Y%m%d-%H%M%S}.csv"
+    response = StreamingHttpResponse(iter_csv(iter_users(queryset)), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,129 @@
+"""
+Argon2 password hashing with verification offloaded to a process pool.
+
+Verifying an Argon2 hash is deliberately CPU and memory heavy. A host-wide
+limit of ``ARGON2_HOST_SLOTS`` bounds how many verifications run at once across
+every web worker, and a small pool of low-priority processes per worker lets
+the kernel schedule other requests ahead of logins.
+"""
+import fcntl
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+_lock = threading.Lock()
+_pool = None
+_pool_pid = None
+
+
+def _lower_priority(increment):
+    os.nice(increment)
+
+
+def _verify(password, encoded):
+    return Argon2PasswordHasher().verify(password, encoded)
+
+
+def get_pool():
+    """Return this process's verification pool.
+
+    The pool is created lazily and again after a fork, since worker processes
+    inherited from a preloaded parent are not usable in the child.
+    """
+    global _pool, _pool_pid
+    with _lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(
+                settings.ARGON2_POOL_SIZE,
+                # Forked from the request process, a pool process would keep
+                # the host slot held when it was started, see host_slot().
+                mp_context=multiprocessing.get_context("forkserver"),
+                initializer=_lower_priority,
+                initargs=(settings.ARGON2_POOL_NICE,),
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def reset_pool():
+    global _pool
+    with _lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=False)
+        _pool = None
+
+
+def _open_slot(directory, number):
+    return os.open(directory / f"slot-{number}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+
+
+@contextmanager
+def host_slot():
+    """Hold one of the ``ARGON2_HOST_SLOTS`` slots shared by the processes on the host.
+
+    A slot is an ``flock`` on a file in ``ARGON2_LOCK_DIR``, which the kernel
+    releases even if its holder dies. When every slot is taken, wait for one.
+    """
+    slots = getattr(settings, "ARGON2_HOST_SLOTS", 0)
+    if not slots:
+        yield
+        return
+    directory = Path(settings.ARGON2_LOCK_DIR)
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    for number in range(slots):
+        fd = _open_slot(directory, number)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            break
+        except BlockingIOError:
+            os.close(fd)
+    else:
+        # Spread the waiting processes over the slots.
+        fd = _open_slot(directory, os.getpid() % slots)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        except BaseException:
+            os.close(fd)
+            raise
+    try:
+        yield
+    finally:
+        # Closing the only descriptor of the open file releases the lock.
+        os.close(fd)
+
+
+class PooledArgon2PasswordHasher(Argon2PasswordHasher):
+    """``Argon2PasswordHasher`` tuned from settings, verifying in a process pool.
+
+    The algorithm name stays ``argon2``, so existing hashes verify unchanged and
+    are upgraded on login whenever the ``ARGON2_*`` cost settings change.
+    """
+
+    @property
+    def time_cost(self):
+        return getattr(settings, "ARGON2_TIME_COST", Argon2PasswordHasher.time_cost)
+
+    @property
+    def memory_cost(self):
+        return getattr(settings, "ARGON2_MEMORY_COST", Argon2PasswordHasher.memory_cost)
+
+    @property
+    def parallelism(self):
+        return getattr(settings, "ARGON2_PARALLELISM", Argon2PasswordHasher.parallelism)
+
+    def verify(self, password, encoded):
+        with host_slot():
+            if not getattr(settings, "ARGON2_POOL_SIZE", 0):
+                return super().verify(password, encoded)
+            try:
+                return get_pool().submit(_verify, password, encoded).result()
+            except BrokenProcessPool:
+                reset_pool()
+                return super().verify(password, encoded)
@@ -0,0 +1,42 @@
+import csv
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from weblist.users.export import EXPORT_CHUNK_SIZE, EXPORT_FIELDS, csv_row, iter_users
+
+
+class Command(BaseCommand):
+    help = "Stream every user to CSV or JSON lines in bounded memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("-o", "--output", default="-", help="File to write, or - for stdout.")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension.")
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = options["output"]
+        if not options["format"] and path.endswith(".json"):
+            raise CommandError("A .json file is ambiguous; pass --format jsonl for JSON lines.")
+        fmt = options["format"] or ("jsonl" if path.endswith(".jsonl") else "csv")
+        stream = self.stdout if path == "-" else open(path, "w", newline="", encoding="utf-8")
+        rows = iter_users(chunk_size=options["chunk_size"])
+
+        count = 0
+        start = time.perf_counter()
+        try:
+            if fmt == "csv":
+                writer = csv.writer(stream)
+                writer.writerow(EXPORT_FIELDS)
+                for count, row in enumerate(rows, 1):
+                    writer.writerow(csv_row(row))
+            else:
+                for count, row in enumerate(rows, 1):
+                    stream.write(json.dumps(dict(zip(EXPORT_FIELDS, row)), cls=DjangoJSONEncoder) + "\n")
+        finally:
+            if stream is not self.stdout:
+                stream.close()
+        elapsed = time.perf_counter() - start
+        self.stderr.write(f"{count} users exported in {elapsed:.1f}s ({count / elapsed if elapsed else 0:.0f} rows/s)")
@@ -0,0 +1,148 @@
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from allauth.account.models import EmailAddress
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from weblist.users.counters import adjust_user_count
+
+User = get_user_model()
+
+
+def read_rows(stream, fmt):
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+
+def hash_passwords(passwords, executor):
+    """Hash plaintext passwords, in ``executor`` when one is given."""
+    # One call per user: each unusable password is a distinct random string.
+    hashed = [make_password(None) for _ in passwords]
+    todo = [(index, password) for index, password in enumerate(passwords) if password]
+    if not todo:
+        return hashed
+    plaintext = [password for _, password in todo]
+    if executor is None:
+        results = map(make_password, plaintext)
+    else:
+        results = executor.map(make_password, plaintext, chunksize=max(len(plaintext) // 32, 1))
+    for (index, _), result in zip(todo, results):
+        hashed[index] = result
+    return hashed
+
+
+class Command(BaseCommand):
+    help = (
+        "Import users from CSV or JSON lines with username, email, name and an optional "
+        "plaintext password. Existing usernames are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to read, or - for stdin.")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Processes hashing passwords; 0 hashes in this process.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not options["format"] and path.endswith(".json"):
+            raise CommandError("A .json file is ambiguous; pass --format jsonl for JSON lines.")
+        fmt = options["format"] or ("jsonl" if path.endswith(".jsonl") else "csv")
+        stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+        executor = None
+        if options["workers"]:
+            executor = ProcessPoolExecutor(options["workers"], initializer=django.setup)
+
+        created = read = 0
+        start = time.perf_counter()
+        try:
+            rows = read_rows(stream, fmt)
+            while True:
+                batch = list(islice(rows, options["batch_size"]))
+                if not batch:
+                    break
+                read += len(batch)
+                created += self.import_batch(batch, executor)
+                self.report(read, created, start, ending="\r")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            if stream is not sys.stdin:
+                stream.close()
+        self.report(read, created, start)
+
+    def import_batch(self, batch, executor):
+        rows = {}
+        for row in batch:
+            if not row.get("username"):
+                raise CommandError(f"Row without a username: {row!r}")
+            rows.setdefault(row["username"], row)
+        # Hashing is slow; do it before taking the write lock, for the rows
+        # that look new. The transaction checks again.
+        existing = set(User.objects.filter(username__in=rows).values_list("username", flat=True))
+        candidates = [row for username, row in rows.items() if username not in existing]
+        hashed = hash_passwords([row.get("password") for row in candidates], executor)
+        passwords = {row["username"]: password for row, password in zip(candidates, hashed)}
+
+        with transaction.atomic():
+            existing = set(User.objects.filter(username__in=passwords).values_list("username", flat=True))
+            new = [row for row in candidates if row["username"] not in existing]
+            User.objects.bulk_create(
+                [
+                    User(
+                        username=row["username"],
+                        email=row.get("email") or "",
+                        name=row.get("name") or "",
+                        password=passwords[row["username"]],
+                    )
+                    for row in new
+                ],
+                ignore_conflicts=True,
+            )
+            # A username created concurrently is skipped by bulk_create. Every
+            # password hash is salted, so a row holding the hash written here
+            # was inserted here.
+            inserted = {
+                username: pk
+                for username, pk, password in User.objects.filter(
+                    username__in=[row["username"] for row in new]
+                ).values_list("username", "id", "password")
+                if password == passwords[username]
+            }
+            EmailAddress.objects.bulk_create(
+                [
+                    EmailAddress(user_id=inserted[row["username"]], email=row["email"], primary=True)
+                    for row in new
+                    if row.get("email") and row["username"] in inserted
+                ],
+                ignore_conflicts=True,
+            )
+            # bulk_create sends no post_save.
+            adjust_user_count(len(inserted))
+        return len(inserted)
+
+    def report(self, read, created, start, ending="\n"):
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"{read} rows read, {created} users created in {elapsed:.1f}s "
+            f"({read / elapsed if elapsed else 0:.0f} rows/s)",
+            ending=ending,
+        )
@@ -0,0 +1,71 @@
+import statistics
+import time
+
+from argon2 import PasswordHasher, Type
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+PASSWORD = "correct horse battery staple"
+
+
+def verify_latency(time_cost, memory_cost, parallelism, samples):
+    """Median milliseconds to verify one hash with these parameters."""
+    hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism, type=Type.I)
+    encoded = hasher.hash(PASSWORD)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.verify(encoded, PASSWORD)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure Argon2 verify latency on this host for a range of time and memory "
+        "costs and recommend the strongest parameters within a target latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--target-ms", type=float, default=250)
+        parser.add_argument(
+            "--memory-costs",
+            type=int,
+            nargs="+",
+            default=[512, 8192, 19456, 47104, 65536],
+            help="Memory costs to try, in KiB.",
+        )
+        parser.add_argument("--max-time-cost", type=int, default=10)
+        parser.add_argument("--parallelism", type=int, default=settings.ARGON2_PARALLELISM)
+        parser.add_argument("--samples", type=int, default=5)
+
+    def handle(self, *args, **options):
+        target = options["target_ms"]
+        parallelism = options["parallelism"]
+        best = None
+        self.stdout.write(f"{'memory KiB':>10} {'time':>4} {'verify ms':>10}")
+        for memory_cost in sorted(options["memory_costs"]):
+            for time_cost in range(1, options["max_time_cost"] + 1):
+                latency = verify_latency(time_cost, memory_cost, parallelism, options["samples"])
+                self.stdout.write(f"{memory_cost:>10} {time_cost:>4} {latency:>10.1f}")
+                if latency > target:
+                    break
+                best = (memory_cost, time_cost, latency)
+
+        current = verify_latency(
+            settings.ARGON2_TIME_COST, settings.ARGON2_MEMORY_COST, parallelism, options["samples"]
+        )
+        self.stdout.write(
+            f"Current: ARGON2_TIME_COST={settings.ARGON2_TIME_COST} "
+            f"ARGON2_MEMORY_COST={settings.ARGON2_MEMORY_COST} ({current:.1f} ms)"
+        )
+        if best is None:
+            self.stdout.write(self.style.WARNING(f"No parameters verify within {target:g} ms on this host."))
+            return
+        memory_cost, time_cost, latency = best
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Recommended: ARGON2_TIME_COST={time_cost} ARGON2_MEMORY_COST={memory_cost} "
+                f"ARGON2_PARALLELISM={parallelism} ({latency:.1f} ms)"
+            )
+        )
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware as DjangoAuthenticationMiddleware
+from django.utils.functional import SimpleLazyObject
+
+
+def get_user(request):
+    """``request.user``, first moving a session of a renamed backend to its new name."""
+    if not hasattr(request, "_cached_user"):
+        backend = request.session.get(auth.BACKEND_SESSION_KEY)
+        if backend in settings.AUTHENTICATION_BACKEND_ALIASES:
+            request.session[auth.BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKEND_ALIASES[backend]
+        request._cached_user = auth.get_user(request)
+    return request._cached_user
+
+
+class AuthenticationMiddleware(DjangoAuthenticationMiddleware):
+    """Django's middleware, keeping users logged in across backend renames."""
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_user(request))
@@ -0,0 +1,77 @@
+from django.db import migrations
+
+# SQLite: an external-content FTS5 table over users_user, kept in sync by
+# triggers so bulk_create and queryset updates are indexed too. Django rebuilds
+# SQLite tables when altering them, which drops these triggers; a migration
+# that alters users_user has to run SQLITE_TRIGGERS again.
+SQLITE_TABLE = """
+CREATE VIRTUAL TABLE users_user_search USING fts5(
+    username, name, email,
+    content='users_user', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+)
+"""
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER users_user_search_insert AFTER INSERT ON users_user BEGIN
+        INSERT INTO users_user_search (rowid, username, name, email)
+        VALUES (new.id, new.username, new.name, new.email);
+    END
+    """,
+    """
+    CREATE TRIGGER users_user_search_delete AFTER DELETE ON users_user BEGIN
+        INSERT INTO users_user_search (users_user_search, rowid, username, name, email)
+        VALUES ('delete', old.id, old.username, old.name, old.email);
+    END
+    """,
+    """
+    CREATE TRIGGER users_user_search_update AFTER UPDATE OF username, name, email ON users_user BEGIN
+        INSERT INTO users_user_search (users_user_search, rowid, username, name, email)
+        VALUES ('delete', old.id, old.username, old.name, old.email);
+        INSERT INTO users_user_search (rowid, username, name, email)
+        VALUES (new.id, new.username, new.name, new.email);
+    END
+    """,
+]
+SQLITE_REBUILD = "INSERT INTO users_user_search (users_user_search) VALUES ('rebuild')"
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS users_user_search_insert",
+    "DROP TRIGGER IF EXISTS users_user_search_delete",
+    "DROP TRIGGER IF EXISTS users_user_search_update",
+    "DROP TABLE IF EXISTS users_user_search",
+]
+
+# PostgreSQL: trigram GIN indexes on the expressions Django's icontains emits.
+POSTGRESQL_CREATE = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+    f"CREATE INDEX users_user_{column}_trgm ON users_user "
+    f"USING gin (UPPER({column}::text) gin_trgm_ops)"
+    for column in ("username", "name", "email")
+]
+POSTGRESQL_DROP = [
+    f"DROP INDEX IF EXISTS users_user_{column}_trgm" for column in ("username", "name", "email")
+]
+
+
+def run(statements_by_vendor):
+    def operation(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("users", "0001_initial")]
+
+    operations = [
+        migrations.RunPython(
+            run(
+                {
+                    "sqlite": [SQLITE_TABLE, *SQLITE_TRIGGERS, SQLITE_REBUILD],
+                    "postgresql": POSTGRESQL_CREATE,
+                }
+            ),
+            run({"sqlite": SQLITE_DROP, "postgresql": POSTGRESQL_DROP}),
+        )
+    ]
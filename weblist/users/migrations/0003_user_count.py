@@ -0,0 +1,29 @@
+# Generated by Django 3.1.7 on 2026-10-17 18:43
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def count_users(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    UserCount = apps.get_model("users", "UserCount")
+    UserCount.objects.create(pk=1, count=User.objects.count(), reconciled_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.BigIntegerField(default=0, verbose_name='Number of users')),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True, verbose_name='Reconciled at')),
+            ],
+        ),
+        migrations.RunPython(count_users, migrations.RunPython.noop),
+    ]
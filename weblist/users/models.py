@@ -1,5 +1,5 @@
 from django.contrib.auth.models import AbstractUser
-from django.db.models import CharField
+from django.db.models import BigIntegerField, CharField, DateTimeField, Model
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
@@ -20,3 +20,18 @@ class User(AbstractUser):
 
         """
         return reverse("users:detail", kwargs={"username": self.username})
+
+    def get_session_auth_hash(self):
+        # A user loaded by weblist.users.backends carries the hash instead of
+        # the password; once the password is loaded or set, it is the source.
+        cached = getattr(self, "cached_session_auth_hash", None)
+        if cached is not None and "password" in self.get_deferred_fields():
+            return cached
+        return super().get_session_auth_hash()
+
+
+class UserCount(Model):
+    """Number of users, kept up to date by signals; see ``weblist.users.counters``."""
+
+    count = BigIntegerField(_("Number of users"), default=0)
+    reconciled_at = DateTimeField(_("Reconciled at"), null=True, blank=True)
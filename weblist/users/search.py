@@ -0,0 +1,41 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def fts_query(term):
+    """An FTS5 query matching every word of ``term`` as a prefix."""
+    return " ".join(f'"{token}"*' for token in TOKEN_RE.findall(term))
+
+
+def contains(queryset, term):
+    return queryset.filter(Q(username__icontains=term) | Q(name__icontains=term) | Q(email__icontains=term))
+
+
+def search_users(queryset, term, substring_fallback=False):
+    """Filter ``queryset`` to users whose username, name or e-mail match ``term``.
+
+    SQLite uses the ``users_user_search`` FTS5 index, so each word of ``term``
+    has to start a word of the username, name or e-mail. With
+    ``substring_fallback``, a term no word starts with is looked for anywhere
+    instead, at the cost of a scan, so "ohn" still finds "John". Other
+    databases use ``icontains``, which the trigram indexes cover on PostgreSQL.
+    """
+    term = term.strip()
+    if not term:
+        return queryset
+    if connections[queryset.db].vendor != "sqlite":
+        return contains(queryset, term)
+    query = fts_query(term)
+    if query:
+        matches = RawSQL("SELECT rowid FROM users_user_search WHERE users_user_search MATCH %s", (query,))
+        found = queryset.filter(pk__in=matches)
+    else:
+        found = queryset.none()
+    if substring_fallback and not found.exists():
+        return contains(queryset, term)
+    return found
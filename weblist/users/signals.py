@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from weblist.users.backends import invalidate_cached_user
+from weblist.users.counters import adjust_user_count
+from weblist.utils.fragments import bump_user_version
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """Drop the cached user on every save, which includes password changes.
+
+    The second invalidation after commit covers a concurrent request that read
+    the old row while the transaction was still open.
+    """
+    user_id = instance.pk
+    invalidate_cached_user(user_id)
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_fragments(sender, instance, **kwargs):
+    """Render the user's cached template fragments again, before and after commit."""
+    user_id = instance.pk
+    bump_user_version(user_id)
+    transaction.on_commit(lambda: bump_user_version(user_id))
+
+
+@receiver(post_save, sender=User)
+def count_created_user(sender, instance, created, **kwargs):
+    if created:
+        adjust_user_count(1)
+
+
+@receiver(post_delete, sender=User)
+def count_deleted_user(sender, instance, **kwargs):
+    adjust_user_count(-1)
@@ -1,11 +1,160 @@
+import base64
+import logging
+from email.mime.base import MIMEBase
+from functools import partial
+
 from django.contrib.auth import get_user_model
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
 
-from config import celery_app
+from config.celery_app import app as celery_app
+from weblist.users import counters
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
+
+#: Broker queue the messages wait on until ``drain_email_queue`` batches them.
+EMAIL_QUEUE = "weblist.emails"
+#: Largest number of messages handed to one ``send_emails`` task.
+EMAIL_BATCH_SIZE = 50
+#: Delivery attempts before a batch is given up on.
+EMAIL_MAX_RETRIES = 5
 
 
 @celery_app.task()
 def get_users_count():
-    """A pointless Celery task to demonstrate usage."""
-    return User.objects.count()
+    """Return the number of users from the denormalized counter."""
+    return counters.get_user_count()
+
+
+@celery_app.task(ignore_result=True)
+def reconcile_user_count():
+    """Correct the user counter; scheduled by ``CELERY_BEAT_SCHEDULE``."""
+    counters.reconcile_user_count()
+
+
+def serialize_attachment(attachment):
+    if isinstance(attachment, MIMEBase):
+        raise ValueError("MIME attachments cannot be queued; attach a (filename, content, mimetype) tuple instead.")
+    filename, content, mimetype = attachment
+    if isinstance(content, bytes):
+        return [filename, base64.b64encode(content).decode(), mimetype, True]
+    return [filename, content, mimetype, False]
+
+
+def deserialize_attachment(data):
+    filename, content, mimetype, encoded = data
+    return filename, base64.b64decode(content) if encoded else content, mimetype
+
+
+def serialize_email(message):
+    """Turn an ``EmailMessage`` into a JSON-serializable dict for the broker."""
+    return {
+        "subject": message.subject,
+        "body": message.body,
+        "from_email": message.from_email,
+        "to": message.to,
+        "cc": message.cc,
+        "bcc": message.bcc,
+        "reply_to": message.reply_to,
+        "headers": message.extra_headers,
+        "content_subtype": message.content_subtype,
+        "alternatives": [
+            list(alternative) for alternative in getattr(message, "alternatives", [])
+        ],
+        "attachments": [serialize_attachment(attachment) for attachment in message.attachments],
+    }
+
+
+def deserialize_email(data, connection=None):
+    """Rebuild the ``EmailMessage`` produced by :func:`serialize_email`."""
+    message = EmailMultiAlternatives(
+        subject=data["subject"],
+        body=data["body"],
+        from_email=data["from_email"],
+        to=data["to"],
+        cc=data["cc"],
+        bcc=data["bcc"],
+        reply_to=data["reply_to"],
+        headers=data["headers"],
+        alternatives=[tuple(alternative) for alternative in data["alternatives"]],
+        attachments=[deserialize_attachment(attachment) for attachment in data.get("attachments", [])],
+        connection=connection,
+    )
+    message.content_subtype = data["content_subtype"]
+    return message
+
+
+def email_queue(connection):
+    return connection.SimpleQueue(EMAIL_QUEUE, serializer="json")
+
+
+def publish_email(payload):
+    """Put a serialized message on ``EMAIL_QUEUE`` for :func:`drain_email_queue`.
+
+    A broker that cannot be reached is logged and the message lost, rather
+    than failing a request whose transaction has already committed.
+    """
+    try:
+        if celery_app.conf.task_always_eager:
+            # No worker drains the queue.
+            send_emails.delay([payload])
+            return
+        with celery_app.pool.acquire(block=True) as connection, email_queue(connection) as queue:
+            queue.put(payload)
+    except Exception:
+        logger.exception("Could not queue e-mail %r to %s", payload["subject"], ", ".join(payload["to"]))
+
+
+def queue_email_on_commit(message, using=None):
+    """Queue ``message`` for delivery once the current transaction commits.
+
+    Messages of a transaction that rolls back are never sent, nor are those of
+    a rolled back savepoint. Outside a transaction the message is queued at once.
+    Delivery happens in batches, see :func:`drain_email_queue`.
+    """
+    transaction.on_commit(partial(publish_email, serialize_email(message)), using)
+
+
+@celery_app.task(ignore_result=True)
+def drain_email_queue():
+    """Hand the messages on ``EMAIL_QUEUE`` to ``send_emails``, ``EMAIL_BATCH_SIZE`` at a time.
+
+    Scheduled by ``CELERY_BEAT_SCHEDULE``, so the messages of a burst of
+    signups go out in a few bulk sends. Messages are acknowledged once their
+    batch is on the broker; a drain that fails leaves them queued.
+    """
+    batches = 0
+    with celery_app.connection_for_read() as connection, email_queue(connection) as queue:
+        while True:
+            messages = []
+            while len(messages) < EMAIL_BATCH_SIZE:
+                try:
+                    messages.append(queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not messages:
+                return batches
+            send_emails.delay([message.payload for message in messages])
+            for message in messages:
+                message.ack()
+            batches += 1
+
+
+@celery_app.task(bind=True, ignore_result=True, max_retries=EMAIL_MAX_RETRIES)
+def send_emails(self, payloads):
+    """Deliver a batch of serialized messages in one ``send_messages`` call.
+
+    A failed batch, including a failure to connect, is retried whole with an
+    exponential backoff. Backends stop at the first message they fail on and do
+    not tell which went out before it, so delivery is at least once.
+    """
+    connection = get_connection()
+    try:
+        connection.open()
+        sent = connection.send_messages([deserialize_email(payload, connection) for payload in payloads])
+    except Exception as exc:
+        raise self.retry(exc=exc, countdown=2 ** self.request.retries * 10)
+    finally:
+        connection.close()
+    return sent
@@ -2,6 +2,7 @@ import pytest
 from django.urls import reverse
 
 from weblist.users.models import User
+from weblist.users.tests.factories import UserFactory
 
 pytestmark = pytest.mark.django_db
 
@@ -17,6 +18,12 @@ class TestUserAdmin:
         response = admin_client.get(url, data={"q": "test"})
         assert response.status_code == 200
 
+    def test_search_uses_index(self, admin_client):
+        UserFactory(username="jdoe", name="John Doe", email="john@example.com")
+        url = reverse("admin:users_user_changelist")
+        response = admin_client.get(url, data={"q": "doe"})
+        assert [user.username for user in response.context["cl"].result_list] == ["jdoe"]
+
     def test_add(self, admin_client):
         url = reverse("admin:users_user_add")
         response = admin_client.get(url)
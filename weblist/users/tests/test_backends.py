@@ -0,0 +1,143 @@
+import pytest
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from weblist.users.backends import (
+    USER_CACHE_VERSION,
+    CachedModelBackend,
+    invalidate_cached_user,
+    user_cache_keys,
+)
+from weblist.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+class TestCachedModelBackend:
+    def test_get_user_is_served_from_cache(self, user: User):
+        backend = CachedModelBackend()
+        assert backend.get_user(user.pk) == user
+
+        with CaptureQueriesContext(connection) as queries:
+            cached = backend.get_user(user.pk)
+
+        assert cached == user
+        assert len(queries) == 0
+
+    def test_save_invalidates(self, user: User):
+        backend = CachedModelBackend()
+        backend.get_user(user.pk)
+
+        user.name = "Renamed"
+        user.save()
+
+        assert backend.get_user(user.pk).name == "Renamed"
+
+    def test_password_change_invalidates(self, user: User):
+        backend = CachedModelBackend()
+        old_hash = backend.get_user(user.pk).password
+
+        user.set_password("N3w_P@ssw0rd-123")
+        user.save()
+
+        assert backend.get_user(user.pk).password != old_hash
+
+    def test_delete_invalidates(self, user: User):
+        backend = CachedModelBackend()
+        user_id = user.pk
+        backend.get_user(user_id)
+
+        user.delete()
+
+        assert backend.get_user(user_id) is None
+
+    def test_read_racing_a_save_is_not_served(self, user: User):
+        """A copy loaded before a save but written after it is never returned."""
+        backend = CachedModelBackend()
+        backend.get_user(user.pk)
+        _, user_key = user_cache_keys(user.pk)
+        stale = cache.get(user_key, version=USER_CACHE_VERSION)
+
+        User.objects.filter(pk=user.pk).update(name="Renamed")
+        invalidate_cached_user(user.pk)
+        cache.set(user_key, stale, version=USER_CACHE_VERSION)
+
+        assert backend.get_user(user.pk).name == "Renamed"
+
+    def test_password_hash_is_not_cached(self, user: User):
+        backend = CachedModelBackend()
+        backend.get_user(user.pk)
+        _, user_key = user_cache_keys(user.pk)
+
+        assert user.password not in repr(cache.get(user_key, version=USER_CACHE_VERSION))
+        with CaptureQueriesContext(connection) as queries:
+            cached = backend.get_user(user.pk)
+            assert cached.get_session_auth_hash() == user.get_session_auth_hash()
+        assert len(queries) == 0
+        assert cached.check_password("password") == user.check_password("password")
+        assert cached.password == user.password
+
+    def test_saving_cached_user_keeps_password(self, user: User):
+        backend = CachedModelBackend()
+        backend.get_user(user.pk)
+        cached = backend.get_user(user.pk)
+
+        cached.name = "Renamed"
+        cached.save()
+
+        assert User.objects.get(pk=user.pk).password == user.password
+
+    def test_inactive_user_is_not_returned(self, user: User):
+        backend = CachedModelBackend()
+        backend.get_user(user.pk)
+
+        user.is_active = False
+        user.save()
+
+        assert backend.get_user(user.pk) is None
+
+
+def test_request_user_does_not_query_users_table(client, user: User):
+    client.force_login(user)
+    client.get("/")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/")
+
+    assert response.status_code == 200
+    assert not [q for q in queries.captured_queries if "users_user" in q["sql"]]
+
+
+@pytest.mark.parametrize(
+    "old_backend",
+    ["django.contrib.auth.backends.ModelBackend", "allauth.account.auth_backends.AuthenticationBackend"],
+)
+def test_sessions_of_renamed_backends_stay_logged_in(client, user: User, old_backend):
+    client.force_login(user)
+    session = client.session
+    session[BACKEND_SESSION_KEY] = old_backend
+    session.save()
+
+    response = client.get("/")
+
+    assert response.context["user"] == user
+    assert client.session[BACKEND_SESSION_KEY] == settings.AUTHENTICATION_BACKEND_ALIASES[old_backend]
+
+
+def test_password_change_keeps_session(client, user: User):
+    user.set_password("0ld_P@ssw0rd-123")
+    user.save()
+    client.force_login(user)
+    client.get("/")
+
+    response = client.post(
+        reverse("account_change_password"),
+        {"oldpassword": "0ld_P@ssw0rd-123", "password1": "N3w_P@ssw0rd-123", "password2": "N3w_P@ssw0rd-123"},
+    )
+
+    assert response.status_code == 302
+    assert client.get("/").context["user"] == user
@@ -0,0 +1,128 @@
+import csv
+import json
+
+import pytest
+from allauth.account.models import EmailAddress
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from weblist.users.management.commands import import_users
+from weblist.users.models import User, UserCount
+from weblist.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, ["username", "email", "name", "password"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def test_import_users_csv(tmp_path):
+    path = tmp_path / "users.csv"
+    write_csv(
+        path,
+        [
+            {"username": f"user{n}", "email": f"user{n}@example.com", "name": f"User {n}", "password": f"secret-{n}"}
+            for n in range(5)
+        ],
+    )
+
+    call_command("import_users", str(path), batch_size=2, workers=2)
+
+    assert User.objects.count() == 5
+    user = User.objects.get(username="user3")
+    assert user.name == "User 3"
+    assert user.check_password("secret-3")
+    address = EmailAddress.objects.get(user=user)
+    assert address.email == "user3@example.com"
+    assert address.primary and not address.verified
+
+
+def test_import_users_jsonl_skips_existing_usernames(tmp_path):
+    existing = UserFactory(username="taken", email="taken@example.com")
+    path = tmp_path / "users.jsonl"
+    path.write_text(
+        "\n".join(
+            json.dumps(row)
+            for row in [
+                {"username": "taken", "email": "other@example.com"},
+                {"username": "fresh", "email": "fresh@example.com"},
+                {"username": "nopassword"},
+            ]
+        )
+    )
+
+    call_command("import_users", str(path), workers=0)
+
+    assert User.objects.count() == 3
+    assert User.objects.get(pk=existing.pk).email == "taken@example.com"
+    assert not EmailAddress.objects.filter(user=existing).exists()
+    assert not User.objects.get(username="nopassword").has_usable_password()
+    assert EmailAddress.objects.filter(email="fresh@example.com").exists()
+
+
+@pytest.mark.parametrize("hook", ["hash_passwords", "bulk_create"])
+def test_import_users_skips_username_taken_meanwhile(tmp_path, monkeypatch, hook):
+    path = tmp_path / "users.jsonl"
+    rows = [{"username": name, "email": f"{name}@example.com"} for name in ("racer", "fresh", "plain")]
+    path.write_text("\n".join(json.dumps(row) for row in rows))
+    # Another request signs "racer" up after the first check, while passwords
+    # are hashed, or just before the insert.
+    owner = import_users if hook == "hash_passwords" else User.objects
+    original = getattr(owner, hook)
+
+    def racing(*args, **kwargs):
+        if not User.objects.filter(username="racer").exists():
+            UserFactory(username="racer", email="racer@elsewhere.com")
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(owner, hook, racing)
+
+    call_command("import_users", str(path), workers=0)
+
+    racer = User.objects.get(username="racer")
+    assert racer.email == "racer@elsewhere.com"
+    assert not EmailAddress.objects.filter(user=racer).exists()
+    assert UserCount.objects.get().count == User.objects.count() == 3
+    assert User.objects.get(username="fresh").password != User.objects.get(username="plain").password
+
+
+def test_export_users_round_trip(tmp_path):
+    UserFactory.create_batch(3)
+    path = tmp_path / "users.jsonl"
+
+    call_command("export_users", output=str(path), chunk_size=2)
+
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert sorted(row["username"] for row in rows) == sorted(User.objects.values_list("username", flat=True))
+
+    User.objects.all().delete()
+    call_command("import_users", str(path), workers=0)
+    assert User.objects.count() == 3
+
+
+def test_export_users_rejects_json_extension_without_format(tmp_path):
+    UserFactory()
+    path = tmp_path / "users.json"
+
+    with pytest.raises(CommandError, match="--format jsonl"):
+        call_command("export_users", output=str(path))
+    assert not path.exists()
+
+    call_command("export_users", output=str(path), format="jsonl")
+    assert json.loads(path.read_text())["username"] == User.objects.get().username
+
+
+def test_import_users_rejects_json_extension_without_format(tmp_path):
+    path = tmp_path / "users.json"
+    path.write_text(json.dumps({"username": "ada", "email": "ada@example.com", "name": "Ada"}) + "\n")
+
+    with pytest.raises(CommandError, match="--format jsonl"):
+        call_command("import_users", str(path), workers=0)
+    assert not User.objects.exists()
+
+    call_command("import_users", str(path), format="jsonl", workers=0)
+    assert User.objects.get().username == "ada"
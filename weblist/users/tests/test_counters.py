@@ -0,0 +1,149 @@
+import threading
+
+import pytest
+from django.core.cache import cache
+from django.db import OperationalError, connection, connections, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from weblist.users import counters
+from weblist.users.counters import cache_key, get_user_count, reconcile_user_count
+from weblist.users.models import User, UserCount
+from weblist.users.tasks import get_users_count
+from weblist.users.tests.factories import UserFactory
+
+
+# Transactional, so that the on_commit cache updates run.
+@pytest.mark.django_db(transaction=True)
+class TestUserCount:
+    def test_follows_creates_and_deletes(self):
+        users = UserFactory.create_batch(3)
+        assert get_user_count() == 3
+
+        users[0].delete()
+        User.objects.filter(pk=users[1].pk).delete()
+        UserFactory()
+
+        assert get_user_count() == User.objects.count() == 2
+        assert cache.get(cache_key()) == 2
+
+    def test_updates_are_not_counted(self, user):
+        user.name = "Renamed"
+        user.save()
+
+        assert get_user_count() == 1
+
+    def test_rolled_back_insert_is_not_counted(self):
+        with pytest.raises(RuntimeError), transaction.atomic():
+            UserFactory()
+            raise RuntimeError
+
+        assert get_user_count() == 0
+
+    def test_reconcile_corrects_drift(self):
+        UserFactory.create_batch(2)
+        UserCount.objects.update(count=10)
+        counters.invalidate_cached_count()
+        assert get_user_count() == 10
+
+        assert reconcile_user_count() == 2
+        assert get_user_count() == 2
+        assert UserCount.objects.get().reconciled_at is not None
+
+    def test_missing_row_is_recreated(self):
+        UserFactory()
+        UserCount.objects.all().delete()
+
+        UserFactory()
+
+        assert UserCount.objects.get().count == 2
+
+    def test_count_read_before_a_commit_is_not_served_after_it(self, monkeypatch):
+        UserFactory()
+        add = cache.add
+
+        def add_after_concurrent_signup(key, value, timeout):
+            if key.startswith(f"{counters.CACHE_KEY}:"):
+                # The reader loaded the row, then another request committed a signup.
+                UserFactory()
+            return add(key, value, timeout)
+
+        monkeypatch.setattr(cache, "add", add_after_concurrent_signup)
+        assert get_user_count() == 1
+        monkeypatch.undo()
+
+        assert get_user_count() == 2
+
+    def test_row_created_concurrently_is_updated(self, monkeypatch):
+        UserFactory()
+        UserCount.objects.all().delete()
+        count = User.objects.count
+
+        def count_while_row_is_created():
+            UserCount.objects.create(pk=counters.COUNTER_PK, count=0)
+            return count()
+
+        monkeypatch.setattr(User.objects, "count", count_while_row_is_created)
+
+        assert reconcile_user_count() == 1
+        assert UserCount.objects.get().count == 1
+
+    def test_task_reads_counter(self, django_assert_num_queries):
+        UserFactory.create_batch(2)
+        get_user_count()
+
+        with django_assert_num_queries(0):
+            assert get_users_count.delay().result == 2
+
+    def test_admin_changelist_skips_count_query(self, admin_client):
+        UserFactory.create_batch(2)
+        url = reverse("admin:users_user_changelist")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.get(url)
+
+        assert response.context["cl"].result_count == 3
+        assert not [q for q in queries.captured_queries if 'COUNT(*) AS "__count" FROM "users_user"' in q["sql"]]
+
+    def test_admin_search_counts_matches(self, admin_client):
+        UserFactory(username="jdoe", name="John Doe")
+        UserFactory(username="other")
+
+        response = admin_client.get(reverse("admin:users_user_changelist"), {"q": "doe"})
+
+        assert response.context["cl"].result_count == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_exact_under_concurrent_inserts():
+    threads, per_thread = 8, 10
+    start = threading.Barrier(threads)
+    errors = []
+
+    def insert(number):
+        start.wait()
+        try:
+            for n in range(per_thread):
+                while True:
+                    try:
+                        with transaction.atomic():
+                            User.objects.create(username=f"user-{number}-{n}")
+                        break
+                    except OperationalError:
+                        # SQLite lets one writer in at a time; retry like a request would.
+                        continue
+        except Exception as error:  # pragma: no cover
+            errors.append(error)
+        finally:
+            connections.close_all()
+
+    workers = [threading.Thread(target=insert, args=(number,)) for number in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert not errors
+    assert User.objects.count() == threads * per_thread
+    assert UserCount.objects.get().count == threads * per_thread
+    assert get_user_count() == threads * per_thread
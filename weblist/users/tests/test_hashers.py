@@ -0,0 +1,111 @@
+import fcntl
+import os
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth.hashers import Argon2PasswordHasher, check_password, identify_hasher, make_password
+from django.core.management import call_command
+
+from weblist.users import hashers
+from weblist.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def argon2(settings, tmp_path):
+    settings.PASSWORD_HASHERS = ["weblist.users.hashers.PooledArgon2PasswordHasher"]
+    settings.ARGON2_TIME_COST = 1
+    settings.ARGON2_MEMORY_COST = 256
+    settings.ARGON2_POOL_SIZE = 1
+    settings.ARGON2_HOST_SLOTS = 1
+    settings.ARGON2_LOCK_DIR = str(tmp_path / "locks")
+    return settings
+
+
+def slot_is_taken(settings):
+    fd = os.open(os.path.join(settings.ARGON2_LOCK_DIR, "slot-0.lock"), os.O_RDWR | os.O_CREAT)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return True
+    finally:
+        os.close(fd)
+    return False
+
+
+def test_verify_in_pool(argon2):
+    encoded = make_password("secret")
+
+    assert encoded.startswith("argon2$argon2i$v=19$m=256,t=1,p=2$")
+    assert check_password("secret", encoded)
+    assert not check_password("wrong", encoded)
+    # Pool processes must not have inherited the slot's lock.
+    assert not slot_is_taken(argon2)
+
+
+def test_verify_in_process(argon2):
+    argon2.ARGON2_POOL_SIZE = 0
+
+    assert check_password("secret", make_password("secret"))
+
+
+def test_verification_waits_for_a_host_slot(argon2):
+    encoded = make_password("secret")
+    os.makedirs(argon2.ARGON2_LOCK_DIR)
+    # Another process's lock: flock conflicts between open files.
+    held = os.open(os.path.join(argon2.ARGON2_LOCK_DIR, "slot-0.lock"), os.O_RDWR | os.O_CREAT)
+    fcntl.flock(held, fcntl.LOCK_EX)
+    results = []
+    thread = threading.Thread(target=lambda: results.append(check_password("secret", encoded)))
+    thread.start()
+
+    thread.join(0.3)
+    assert thread.is_alive()
+    os.close(held)
+    thread.join(5)
+    assert results == [True]
+    assert not slot_is_taken(argon2)
+
+
+@pytest.mark.parametrize("pool_size", [0, 1])
+def test_in_process_verification_holds_a_host_slot(argon2, monkeypatch, pool_size):
+    encoded = make_password("secret")
+    argon2.ARGON2_POOL_SIZE = pool_size
+    taken = []
+
+    def broken_pool():
+        raise BrokenProcessPool
+
+    def verify(self, password, encoded):
+        taken.append(slot_is_taken(argon2))
+        return True
+
+    monkeypatch.setattr(hashers, "get_pool", lambda: SimpleNamespace(submit=lambda *args: broken_pool()))
+    monkeypatch.setattr(hashers, "reset_pool", lambda: None)
+    monkeypatch.setattr(Argon2PasswordHasher, "verify", verify)
+
+    assert check_password("secret", encoded)
+    assert taken == [True]
+
+
+def test_changed_cost_rehashes_on_login(argon2):
+    user = UserFactory(password="secret")
+    old = user.password
+
+    argon2.ARGON2_TIME_COST = 2
+    assert identify_hasher(old).must_update(old)
+    assert user.check_password("secret")
+
+    user.refresh_from_db()
+    assert user.password != old
+    assert "t=2" in user.password
+    assert not identify_hasher(user.password).must_update(user.password)
+
+
+def test_tune_argon2(capsys):
+    call_command("tune_argon2", target_ms=10_000, memory_costs=[256], max_time_cost=2, samples=1)
+
+    assert "Recommended: ARGON2_TIME_COST=2 ARGON2_MEMORY_COST=256" in capsys.readouterr().out
@@ -0,0 +1,75 @@
+import pytest
+from django.urls import reverse
+
+from weblist.users.models import User
+from weblist.users.search import fts_query, search_users
+from weblist.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def usernames(queryset):
+    return sorted(queryset.values_list("username", flat=True))
+
+
+@pytest.fixture
+def people():
+    return [
+        UserFactory(username="jdoe", name="John Doe", email="john@example.com"),
+        UserFactory(username="asmith", name="Anna Smith", email="anna@corp.test"),
+        UserFactory(username="bjohnson", name="Björn Johnson", email="bj@example.com"),
+    ]
+
+
+def test_fts_query_quotes_tokens():
+    assert fts_query('jo "doe') == '"jo"* "doe"*'
+
+
+@pytest.mark.parametrize(
+    "term, expected",
+    [
+        ("john", ["bjohnson", "jdoe"]),
+        ("Smi", ["asmith"]),
+        ("corp", ["asmith"]),
+        ("bjorn", ["bjohnson"]),
+        ("john doe", ["jdoe"]),
+        ("nobody", []),
+        ('"', []),
+    ],
+)
+def test_search_users(people, term, expected):
+    assert usernames(search_users(User.objects.all(), term)) == expected
+
+
+def test_index_follows_updates_and_deletes(people):
+    jdoe, asmith, _ = people
+    jdoe.name = "Jane Roe"
+    jdoe.save()
+    asmith.delete()
+
+    assert usernames(search_users(User.objects.all(), "roe")) == ["jdoe"]
+    assert usernames(search_users(User.objects.all(), "anna")) == []
+
+
+def test_empty_term_returns_everything(people):
+    assert search_users(User.objects.all(), "  ").count() == 3
+
+
+@pytest.mark.parametrize(
+    "term, expected",
+    [
+        ("john", ["bjohnson", "jdoe"]),
+        ("ohn", ["bjohnson", "jdoe"]),
+        ("mith", ["asmith"]),
+        ("@corp", ["asmith"]),
+        ("nobody", []),
+    ],
+)
+def test_admin_search_falls_back_to_substrings(people, admin_client, term, expected):
+    response = admin_client.get(reverse("admin:users_user_changelist"), {"q": term})
+
+    assert usernames(response.context["cl"].result_list) == expected
+
+
+def test_public_search_matches_word_prefixes_only(people):
+    assert usernames(search_users(User.objects.all(), "ohn")) == []
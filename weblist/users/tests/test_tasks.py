@@ -1,7 +1,16 @@
+import json
+from email.mime.text import MIMEText
+
 import pytest
+from celery.exceptions import Retry
 from celery.result import EagerResult
+from django.core.mail import EmailMessage, EmailMultiAlternatives
+from django.core.mail.backends import locmem
+from django.db import transaction
+from django.urls import reverse
 
-from weblist.users.tasks import get_users_count
+from weblist.users import tasks
+from weblist.users.tasks import deserialize_email, get_users_count, serialize_email
 from weblist.users.tests.factories import UserFactory
 
 pytestmark = pytest.mark.django_db
@@ -14,3 +23,140 @@ def test_user_count(settings):
     task_result = get_users_count.delay()
     assert isinstance(task_result, EagerResult)
     assert task_result.result == 3
+
+
+def test_serialize_email_round_trip():
+    message = EmailMultiAlternatives(
+        "Subject", "Body", "from@example.com", ["to@example.com"], reply_to=["reply@example.com"]
+    )
+    message.attach_alternative("<p>Body</p>", "text/html")
+
+    rebuilt = deserialize_email(serialize_email(message))
+
+    assert serialize_email(rebuilt) == serialize_email(message)
+    assert rebuilt.alternatives == [("<p>Body</p>", "text/html")]
+
+
+@pytest.fixture
+def email_queue(monkeypatch, settings):
+    """The broker queue, with publishing no longer short-circuited by eager mode."""
+    settings.CELERY_TASK_ALWAYS_EAGER = False
+    batches = []
+    monkeypatch.setattr(tasks.send_emails, "delay", lambda payloads: batches.append([p["subject"] for p in payloads]))
+    with tasks.celery_app.connection_for_write() as connection, tasks.email_queue(connection) as queue:
+        queue.clear()
+        yield batches
+        queue.clear()
+
+
+def test_drain_sends_queued_messages_in_batches(email_queue, monkeypatch):
+    monkeypatch.setattr(tasks, "EMAIL_BATCH_SIZE", 2)
+    for n in range(5):
+        tasks.publish_email(serialize_email(EmailMessage(f"Subject {n}", to=["to@example.com"])))
+
+    assert tasks.drain_email_queue() == 3
+    assert email_queue == [["Subject 0", "Subject 1"], ["Subject 2", "Subject 3"], ["Subject 4"]]
+    assert tasks.drain_email_queue() == 0
+
+
+def test_unreachable_broker_is_logged(monkeypatch, settings, caplog):
+    settings.CELERY_TASK_ALWAYS_EAGER = False
+
+    def fail(*args, **kwargs):
+        raise OSError("connection refused")
+
+    monkeypatch.setattr(tasks.celery_app.pool, "acquire", fail)
+
+    tasks.publish_email(serialize_email(EmailMessage("Welcome", to=["to@example.com"])))
+
+    assert "Could not queue e-mail 'Welcome' to to@example.com" in caplog.text
+
+
+def test_send_emails_sends_batch_in_one_call(mailoutbox, monkeypatch):
+    payloads = [serialize_email(EmailMessage(f"Subject {n}", to=["to@example.com"])) for n in range(3)]
+    calls = []
+    send_messages = locmem.EmailBackend.send_messages
+
+    def counted_send_messages(self, messages):
+        calls.append(len(messages))
+        return send_messages(self, messages)
+
+    monkeypatch.setattr(locmem.EmailBackend, "send_messages", counted_send_messages)
+
+    assert tasks.send_emails(payloads) == 3
+    assert calls == [3]
+    assert [m.subject for m in mailoutbox] == ["Subject 0", "Subject 1", "Subject 2"]
+
+
+@pytest.mark.parametrize("failing", ["open", "send_messages"])
+def test_send_emails_retries_failed_batch(monkeypatch, failing):
+    payloads = [serialize_email(EmailMessage("Subject", to=["to@example.com"]))]
+    retried = []
+
+    def fail(*args):
+        raise OSError("connection refused")
+
+    def retry(exc, countdown):
+        retried.append(exc)
+        return Retry(exc=exc, when=countdown)
+
+    monkeypatch.setattr(locmem.EmailBackend, failing, fail)
+    monkeypatch.setattr(tasks.send_emails, "retry", retry)
+
+    with pytest.raises(Retry):
+        tasks.send_emails(payloads)
+    assert len(retried) == 1
+
+
+def test_attachments_are_queued_with_the_message():
+    message = EmailMessage("Subject", "Body", to=["to@example.com"])
+    message.attach("report.pdf", b"%PDF\x00\xff", "application/pdf")
+    message.attach("notes.txt", "Notes", "text/plain")
+
+    rebuilt = deserialize_email(json.loads(json.dumps(serialize_email(message))))
+
+    assert rebuilt.attachments == message.attachments
+
+
+def test_mime_attachments_are_refused():
+    message = EmailMessage("Subject", to=["to@example.com"])
+    message.attach(MIMEText("Notes"))
+
+    with pytest.raises(ValueError, match="MIME attachments"):
+        serialize_email(message)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_messages_are_queued_on_commit(email_queue):
+    with transaction.atomic():
+        tasks.queue_email_on_commit(EmailMessage("First"))
+        tasks.queue_email_on_commit(EmailMessage("Second"))
+        with pytest.raises(RuntimeError), transaction.atomic():
+            tasks.queue_email_on_commit(EmailMessage("Rolled back"))
+            raise RuntimeError
+        assert tasks.drain_email_queue() == 0
+    with pytest.raises(RuntimeError), transaction.atomic():
+        tasks.queue_email_on_commit(EmailMessage("Never sent"))
+        raise RuntimeError
+    tasks.queue_email_on_commit(EmailMessage("Outside"))
+
+    assert tasks.drain_email_queue() == 1
+    assert email_queue == [["First", "Second", "Outside"]]
+
+
+# Transactional, so that the request's on_commit callbacks run.
+@pytest.mark.django_db(transaction=True)
+def test_signup_email_is_delivered_by_worker(client, mailoutbox):
+    response = client.post(
+        reverse("account_signup"),
+        {
+            "username": "newuser",
+            "email": "newuser@example.com",
+            "password1": "My_R@ndom-P@ssw0rd",
+            "password2": "My_R@ndom-P@ssw0rd",
+        },
+    )
+
+    assert response.status_code == 302
+    assert len(mailoutbox) == 1
+    assert mailoutbox[0].to == ["newuser@example.com"]
@@ -1,11 +1,15 @@
+import asyncio
+import importlib
+
 import pytest
+from asgiref.sync import async_to_sync
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.models import AnonymousUser
 from django.contrib.messages.middleware import MessageMiddleware
 from django.contrib.sessions.middleware import SessionMiddleware
-from django.test import RequestFactory
-from django.urls import reverse
+from django.test import AsyncClient, RequestFactory
+from django.urls import clear_url_caches, resolve, reverse
 
 from weblist.users.forms import UserChangeForm
 from weblist.users.models import User
@@ -13,8 +17,11 @@ from weblist.users.tests.factories import UserFactory
 from weblist.users.views import (
     UserRedirectView,
     UserUpdateView,
+    user_detail_async_view,
     user_detail_view,
+    user_redirect_async_view,
 )
+from weblist.utils.transactions import READ_ONLY, get_transaction_policy
 
 pytestmark = pytest.mark.django_db
 
@@ -95,3 +102,142 @@ class TestUserDetailView:
 
         assert response.status_code == 302
         assert response.url == f"{login_url}?next=/fake-url/"
+
+
+class TestAsyncViews:
+    def test_detail(self, user: User, rf: RequestFactory):
+        request = rf.get("/fake-url/")
+        request.user = UserFactory()
+
+        response = async_to_sync(user_detail_async_view)(request, username=user.username)
+
+        assert response.status_code == 200
+        assert user.username in response.content.decode()
+
+    def test_detail_not_authenticated(self, user: User, rf: RequestFactory):
+        request = rf.get("/fake-url/")
+        request.user = AnonymousUser()
+
+        response = async_to_sync(user_detail_async_view)(request, username=user.username)
+        login_url = reverse(settings.LOGIN_URL)
+
+        assert response.status_code == 302
+        assert response.url == f"{login_url}?next=/fake-url/"
+
+    def test_redirect(self, user: User, rf: RequestFactory):
+        request = rf.get("/fake-url/")
+        request.user = user
+
+        response = async_to_sync(user_redirect_async_view)(request)
+
+        assert response.url == f"/users/{user.username}/"
+
+    def test_urlconf_serves_async_views(self, settings, user: User):
+        import config.urls
+        import weblist.users.urls
+
+        settings.ASYNC_VIEWS = True
+        try:
+            importlib.reload(weblist.users.urls)
+            importlib.reload(config.urls)
+            clear_url_caches()
+            for path in ["/", "/about/", "/users/~redirect/", f"/users/{user.username}/"]:
+                view = resolve(path).func
+                assert asyncio.iscoroutinefunction(view)
+                assert get_transaction_policy(view) == READ_ONLY
+
+            async def get(path):
+                return await AsyncClient().get(path)
+
+            assert async_to_sync(get)("/about/").status_code == 200
+        finally:
+            settings.ASYNC_VIEWS = False
+            importlib.reload(weblist.users.urls)
+            importlib.reload(config.urls)
+            clear_url_caches()
+
+
+class TestUserSearchView:
+    def test_staff_gets_paginated_results(self, admin_client):
+        UserFactory(username="jdoe", name="John Doe", email="john@example.com")
+
+        response = admin_client.get(reverse("users:search"), {"q": "john"})
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "results": [{"username": "jdoe", "name": "John Doe", "email": "john@example.com"}],
+            "page": 1,
+            "num_pages": 1,
+            "count": 1,
+        }
+
+    def test_non_staff_is_forbidden(self, client, user: User):
+        client.force_login(user)
+
+        response = client.get(reverse("users:search"), {"q": "john"})
+
+        assert response.status_code == 403
+
+
+class TestViewBudgets:
+    """Query and time budgets; raise them only for a deliberate change in cost."""
+
+    def test_detail(self, client, user: User, budget):
+        client.force_login(user)
+        other = UserFactory()
+
+        templates = {"users/user_detail.html": {"queries": 0}, "base.html": {"queries": 0}}
+        with budget(queries=2, ms=500, templates=templates):
+            response = client.get(reverse("users:detail", kwargs={"username": other.username}))
+
+        assert response.status_code == 200
+
+    def test_detail_async(self, user: User, rf: RequestFactory, budget):
+        request = rf.get("/fake-url/")
+        request.user = UserFactory()
+
+        with budget(queries=1, ms=500, templates={"users/user_detail.html": {"queries": 0}}):
+            response = async_to_sync(user_detail_async_view)(request, username=user.username)
+
+        assert response.status_code == 200
+
+    def test_redirect(self, client, user: User, budget):
+        client.force_login(user)
+
+        with budget(queries=1, ms=200):
+            response = client.get(reverse("users:redirect"))
+
+        assert response.status_code == 302
+
+    def test_update_form(self, client, user: User, budget):
+        client.force_login(user)
+
+        with budget(queries=3, ms=500, templates={"users/user_form.html": {"queries": 0}}):
+            response = client.get(reverse("users:update"))
+
+        assert response.status_code == 200
+
+    def test_update(self, client, user: User, budget):
+        client.force_login(user)
+
+        with budget(queries=4, ms=500):
+            response = client.post(reverse("users:update"), {"name": "Jane Doe"})
+
+        assert response.status_code == 302
+
+    def test_search(self, admin_client, budget):
+        UserFactory.create_batch(5)
+
+        with budget(queries=3, ms=500):
+            response = admin_client.get(reverse("users:search"), {"q": "a"})
+
+        assert response.status_code == 200
+
+    def test_export(self, admin_client, budget):
+        UserFactory.create_batch(5)
+
+        with budget(queries=2, ms=500):
+            response = admin_client.get(reverse("users:export"))
+            b"".join(response.streaming_content)
+
+        assert response.status_code == 200
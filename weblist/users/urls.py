@@ -1,14 +1,29 @@
+from django.conf import settings
 from django.urls import path
 
 from weblist.users.views import (
+    user_detail_async_view,
     user_detail_view,
+    user_export_view,
+    user_redirect_async_view,
     user_redirect_view,
+    user_search_view,
     user_update_view,
 )
 
 app_name = "users"
 urlpatterns = [
-    path("~redirect/", view=user_redirect_view, name="redirect"),
+    path(
+        "~redirect/",
+        view=user_redirect_async_view if settings.ASYNC_VIEWS else user_redirect_view,
+        name="redirect",
+    ),
     path("~update/", view=user_update_view, name="update"),
-    path("<str:username>/", view=user_detail_view, name="detail"),
+    path("~search/", view=user_search_view, name="search"),
+    path("~export/", view=user_export_view, name="export"),
+    path(
+        "<str:username>/",
+        view=user_detail_async_view if settings.ASYNC_VIEWS else user_detail_view,
+        name="detail",
+    ),
 ]
@@ -1,9 +1,16 @@
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.messages.views import SuccessMessageMixin
+from django.http import HttpResponseRedirect, JsonResponse
+from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
-from django.views.generic import DetailView, RedirectView, UpdateView
+from django.views.generic import DetailView, ListView, RedirectView, UpdateView, View
+
+from weblist.users.export import csv_export_response
+from weblist.users.search import search_users
+from weblist.utils.async_views import async_login_required, render_async
 
 User = get_user_model()
 
@@ -18,6 +25,12 @@ class UserDetailView(LoginRequiredMixin, DetailView):
 user_detail_view = UserDetailView.as_view()
 
 
+@async_login_required
+async def user_detail_async_view(request, username):
+    user = await sync_to_async(get_object_or_404, thread_sensitive=True)(User, username=username)
+    return await render_async(request, "users/user_detail.html", {"object": user, "user": user})
+
+
 class UserUpdateView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
 
     model = User
@@ -43,3 +56,46 @@ class UserRedirectView(LoginRequiredMixin, RedirectView):
 
 
 user_redirect_view = UserRedirectView.as_view()
+
+
+@async_login_required
+async def user_redirect_async_view(request):
+    return HttpResponseRedirect(reverse("users:detail", kwargs={"username": request.user.username}))
+
+
+class UserSearchView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+
+    paginate_by = 50
+    result_fields = ["username", "name", "email"]
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get_queryset(self):
+        queryset = User.objects.order_by("username").values(*self.result_fields)
+        return search_users(queryset, self.request.GET.get("q", ""))
+
+    def render_to_response(self, context, **response_kwargs):
+        page = context["page_obj"]
+        return JsonResponse(
+            {
+                "results": list(page),
+                "page": page.number,
+                "num_pages": page.paginator.num_pages,
+                "count": page.paginator.count,
+            }
+        )
+
+
+user_search_view = UserSearchView.as_view()
+
+
+class UserExportView(LoginRequiredMixin, UserPassesTestMixin, View):
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        return csv_export_response()
+
+
+user_export_view = UserExportView.as_view()
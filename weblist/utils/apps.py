@@ -0,0 +1,44 @@
+from django.apps import AppConfig, apps
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+
+
+def get_celery_app():
+    from config.celery_app import app as celery_app
+
+    return celery_app
+
+
+class UtilsConfig(AppConfig):
+    name = "weblist.utils"
+    verbose_name = _("Utilities")
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        # Registers the system check for unbuilt bundles.
+        from weblist.utils import assets  # noqa: F401
+        from weblist.utils.db import configure_sqlite_connection
+        from weblist.utils.metrics import instrument_connection
+
+        connection_created.connect(configure_sqlite_connection)
+        connection_created.connect(instrument_connection)
+
+        if apps.is_installed("django_celery_beat"):
+            from django.db.models.signals import post_delete, post_save
+            from django_celery_beat import admin
+            from django_celery_beat.models import PeriodicTask, PeriodicTasks
+
+            from weblist.utils.beat import schedule_changed
+
+            # PeriodicTasks is written for every schedule change, including
+            # interval and crontab edits and the admin's bulk actions.
+            for model in (PeriodicTask, PeriodicTasks):
+                post_save.connect(schedule_changed, sender=model)
+                post_delete.connect(schedule_changed, sender=model)
+
+            # The admin lists and runs tasks of celery.current_app, which is an
+            # empty default app until config.celery_app is created on first use.
+            celery_app = SimpleLazyObject(get_celery_app)
+            admin.TaskSelectWidget.celery_app = celery_app
+            admin.PeriodicTaskAdmin.celery_app = celery_app
@@ -0,0 +1,144 @@
+"""
+Offline build of the CSS and JavaScript bundles that ``base.html`` loads.
+
+``ASSET_BUNDLES`` maps each bundle, relative to ``ASSETS_ROOT``, to its sources
+in order. SCSS sources are compiled with libsass and JavaScript that is not
+already minified goes through rjsmin; both are development requirements, as
+the bundles are committed. Third-party files live in ``vendor/``, where
+``vendor.json`` pins the upstream URL and subresource integrity hash of each
+one. Only :func:`fetch_vendor` uses the network: a build reads the committed
+files and refuses any whose hash does not match.
+
+Bundles keep stable names. ``ManifestStaticFilesStorage`` fingerprints them at
+``collectstatic``, and WhiteNoise compresses them and serves the fingerprinted
+names with immutable cache headers.
+
+Production serves only the bundles, and :func:`check_bundles` fails while one
+is missing. With ``DEBUG`` on, the ``{% asset_bundle %}`` tag loads the sources
+of a bundle that is not built yet one by one instead, so a fresh checkout can
+be worked on before the first ``build_assets --fetch``.
+"""
+import base64
+import hashlib
+import json
+import re
+from pathlib import Path
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core import checks
+
+VENDOR_MANIFEST = "vendor/vendor.json"
+# Source maps of the individual files do not apply to a bundle.
+SOURCE_MAP = re.compile(rb"^\s*(//[#@] sourceMappingURL=.*|/\*[#@] sourceMappingURL=.*\*/)\s*$", re.MULTILINE)
+SEPARATORS = {".css": b"\n", ".js": b";\n"}
+
+
+class AssetError(Exception):
+    pass
+
+
+def integrity(data):
+    """Subresource integrity value of ``data``, e.g. ``sha384-ggOy...``."""
+    return "sha384-" + base64.b64encode(hashlib.sha384(data).digest()).decode()
+
+
+def load_vendor(root):
+    path = Path(root) / VENDOR_MANIFEST
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def fetch_vendor(root, opener=urlopen):
+    """Download the vendored files that are missing or do not match their hash."""
+    fetched = []
+    for name, entry in load_vendor(root).items():
+        path = Path(root) / name
+        if path.exists() and integrity(path.read_bytes()) == entry["integrity"]:
+            continue
+        with opener(entry["url"]) as response:
+            data = response.read()
+        if integrity(data) != entry["integrity"]:
+            raise AssetError(f"{entry['url']} does not match the integrity hash in {VENDOR_MANIFEST}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        fetched.append(name)
+    return fetched
+
+
+def compile_scss(path):
+    try:
+        import sass
+    except ImportError:
+        raise AssetError(f"Compiling {path.name} needs libsass, see requirements/local.txt")
+    return sass.compile(filename=str(path), output_style="compressed").encode()
+
+
+def minify_js(data, path):
+    try:
+        import rjsmin
+    except ImportError:
+        raise AssetError(f"Minifying {path.name} needs rjsmin, see requirements/local.txt")
+    return rjsmin.jsmin(data.decode()).encode()
+
+
+def read_source(root, name, vendor):
+    path = Path(root) / name
+    if name in vendor:
+        if not path.exists():
+            raise AssetError(f"{name} is missing, run `manage.py build_assets --fetch` once with network access")
+        data = path.read_bytes()
+        if integrity(data) != vendor[name]["integrity"]:
+            raise AssetError(f"{name} does not match the integrity hash in {VENDOR_MANIFEST}")
+    elif path.suffix == ".scss":
+        data = compile_scss(path)
+    elif path.suffix == ".js" and not path.name.endswith(".min.js"):
+        data = minify_js(path.read_bytes(), path)
+    else:
+        data = path.read_bytes()
+    return SOURCE_MAP.sub(b"", data).strip()
+
+
+def build(root, bundles):
+    """Return the content of each bundle, keyed by its name."""
+    vendor = load_vendor(root)
+    outputs = {}
+    for bundle, sources in bundles.items():
+        separator = SEPARATORS[Path(bundle).suffix]
+        outputs[bundle] = separator.join(read_source(root, name, vendor) for name in sources) + b"\n"
+    return outputs
+
+
+def stale(root, outputs):
+    """Names of the bundles whose file differs from ``outputs``."""
+    names = []
+    for bundle, data in outputs.items():
+        path = Path(root) / bundle
+        if not path.exists() or path.read_bytes() != data:
+            names.append(bundle)
+    return names
+
+
+def missing(root, bundles):
+    """Names of the bundles that have not been built."""
+    return [bundle for bundle in bundles if not (Path(root) / bundle).exists()]
+
+
+@checks.register(checks.Tags.templates)
+def check_bundles(app_configs, **kwargs):
+    hint = "Run `manage.py build_assets --fetch` with network access and commit the vendor and dist files."
+    if settings.DEBUG:
+        return [
+            checks.Warning(
+                f"{bundle} has not been built; pages load its sources one by one, vendored ones from their CDN.",
+                hint=hint,
+                id="utils.W001",
+            )
+            for bundle in missing(settings.ASSETS_ROOT, settings.ASSET_BUNDLES)
+        ]
+    return [
+        checks.Error(f"{bundle} has not been built; pages cannot load it.", hint=hint, id="utils.E001")
+        for bundle in missing(settings.ASSETS_ROOT, settings.ASSET_BUNDLES)
+    ]
@@ -0,0 +1,43 @@
+"""
+Helpers for async views.
+
+The ORM, sessions and template context processors are synchronous, so async
+views reach them through ``sync_to_async``. ``thread_sensitive`` keeps those
+calls on one thread per request, where Django opens and closes its database
+connections.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.shortcuts import render
+
+render_async = sync_to_async(render, thread_sensitive=True)
+
+
+async def get_user(request):
+    """Resolve the lazy ``request.user`` off the event loop and return it."""
+    await sync_to_async(lambda: request.user.is_authenticated, thread_sensitive=True)()
+    return request.user
+
+
+def async_login_required(view):
+    """``login_required`` for async views."""
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await get_user(request)
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def async_template_view(template_name):
+    """Async counterpart of ``TemplateView.as_view(template_name=...)``."""
+
+    async def view(request, *args, **kwargs):
+        return await render_async(request, template_name, kwargs)
+
+    return view
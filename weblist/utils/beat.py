@@ -0,0 +1,32 @@
+"""
+Cache marker for changes to the periodic task schedule.
+
+The marker is bumped whenever a ``PeriodicTask`` or django-celery-beat's own
+``PeriodicTasks`` change row is written, so the beat process can notice
+schedule edits by reading the cache instead of polling the database; see
+``weblist.utils.schedulers.CachedDatabaseScheduler``.
+"""
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+
+MARKER_KEY = "weblist.beat.schedule"
+
+
+def get_schedule_marker():
+    """Return the current marker, creating one if the cache lost it."""
+    marker = cache.get(MARKER_KEY)
+    if marker is None:
+        cache.add(MARKER_KEY, uuid4().hex, None)
+        marker = cache.get(MARKER_KEY)
+    return marker
+
+
+def bump_schedule_marker():
+    cache.set(MARKER_KEY, uuid4().hex, None)
+
+
+def schedule_changed(sender, **kwargs):
+    """Receiver bumping the marker once the change is committed."""
+    transaction.on_commit(bump_schedule_marker)
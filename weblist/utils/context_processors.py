@@ -1,6 +1,9 @@
 from django.conf import settings
 
+from weblist.utils.templates import context_keys
 
+
+@context_keys("DEBUG")
 def settings_context(_request):
     """Settings available by default to the templates context."""
     # Note: we intentionally do NOT expose the entire settings
@@ -0,0 +1,74 @@
+"""
+SQLite connection setup and read/write routing for ``base.db``.
+"""
+from django.conf import settings
+from django.db import connections
+
+WRITER_ALIAS = "default"
+READER_ALIAS = "replica"
+WRITE_STATEMENTS = {"INSERT", "UPDATE", "DELETE", "REPLACE"}
+
+
+def apply_pragmas(cursor, pragmas):
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """``connection_created`` receiver applying ``SQLITE_PRAGMAS`` to new connections."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, getattr(settings, "SQLITE_PRAGMAS", {}))
+        if connection.alias == READER_ALIAS:
+            cursor.execute("PRAGMA query_only = ON")
+
+
+class QueryCounter:
+    """``execute_wrapper`` counting the queries, and the writes among them, it sees."""
+
+    def __init__(self):
+        self.queries = self.writes = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        if sql.split(None, 1)[0].upper() in WRITE_STATEMENTS:
+            self.writes += 1
+        return execute(sql, params, many, context)
+
+    def reset(self):
+        self.queries = self.writes = 0
+
+    def install(self):
+        """Count the queries of every database alias, in the current thread."""
+        for alias in connections:
+            connections[alias].execute_wrappers.append(self)
+
+    def uninstall(self):
+        for alias in connections:
+            if self in connections[alias].execute_wrappers:
+                connections[alias].execute_wrappers.remove(self)
+
+
+class ReadWriteRouter:
+    """Send writes to the single writer connection and other reads to the reader.
+
+    Reads made while the writer is inside a transaction stay on the writer, so
+    a request always sees its own uncommitted changes.
+    """
+
+    def db_for_read(self, model, **hints):
+        if READER_ALIAS not in settings.DATABASES:
+            return None
+        if connections[WRITER_ALIAS].in_atomic_block:
+            return WRITER_ALIAS
+        return READER_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return WRITER_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != READER_ALIAS
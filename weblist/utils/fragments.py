@@ -0,0 +1,65 @@
+"""
+Cache keys for ``{% fragmentcache %}``, see ``weblist.utils.templatetags.fragment_cache``.
+
+A fragment is cached per language and per visitor: one copy for anonymous
+visitors, one per username for authenticated ones. Each user's fragments are
+keyed under a version of that user, which ``weblist.users.signals`` replaces
+whenever the user is saved, so none of the old fragments is read again without
+having to know their keys. The source of the template holding the tag is part
+of the key too, so a deploy that edits it does not serve the old markup.
+
+Fragments go to the ``template_fragments`` cache if there is one, as for
+``{% cache %}``; production makes it a per-process memory cache, as a Redis
+round trip costs about as much as rendering the navigation. Versions always
+live in the shared ``default`` cache so that a save reaches every process.
+"""
+import hashlib
+import uuid
+
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.utils import translation
+
+
+def get_fragment_cache():
+    """The cache ``{% cache %}`` uses as well."""
+    try:
+        return caches["template_fragments"]
+    except InvalidCacheBackendError:
+        return caches["default"]
+
+
+def user_version_key(user_id):
+    return f"fragments:user:{user_id}:version"
+
+
+def get_user_version(user_id):
+    cache = caches["default"]
+    key = user_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, None):
+            version = cache.get(key) or version
+    return version
+
+
+def bump_user_version(user_id):
+    """Make every cached fragment of ``user_id`` unreadable."""
+    caches["default"].set(user_version_key(user_id), uuid.uuid4().hex, None)
+
+
+def source_version(source):
+    return hashlib.md5(source.encode()).hexdigest()[:12]
+
+
+def fragment_key(name, request, source_version=""):
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        # Once per request, however many fragments the page has.
+        if getattr(request, "_fragment_user_version", None) is None:
+            request._fragment_user_version = get_user_version(user.pk)
+        visitor = [user.get_username(), request._fragment_user_version]
+    else:
+        visitor = ["", "anonymous"]
+    return make_template_fragment_key(name, [source_version, translation.get_language(), *visitor])
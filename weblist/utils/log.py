@@ -0,0 +1,331 @@
+import contextvars
+import copy
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+import traceback
+import zlib
+from datetime import datetime, timezone
+
+from django.core import mail
+from django.utils.functional import LazyObject, empty
+
+#: The current request, its id and start time, set by RequestContextMiddleware.
+request_context = contextvars.ContextVar("weblist_request_context", default=None)
+
+#: LogRecord attributes that are not ``extra`` fields.
+RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+CONTEXT_FIELDS = ("request_id", "user_id", "route", "elapsed_ms")
+
+
+def fingerprint(record):
+    """Identify records that come from the same failure."""
+    if record.exc_info and record.exc_info[1] is not None:
+        exc_type, _, tb = record.exc_info
+        frames = [
+            (frame.f_code.co_filename, frame.f_code.co_name, lineno)
+            for frame, lineno in traceback.walk_tb(tb)
+        ]
+        key = (exc_type.__module__, exc_type.__qualname__, frames)
+    else:
+        key = (record.name, record.levelno, record.pathname, record.lineno, str(record.msg))
+    return hashlib.sha1(repr(key).encode()).hexdigest()
+
+
+class AdminDigestHandler(logging.Handler):
+    """Mail the site admins one digest per distinct error instead of one per record.
+
+    ``emit`` only formats the record and puts it on a bounded in-process queue;
+    when the queue is full the record is counted in ``dropped`` and discarded.
+    A daemon thread groups queued records by :func:`fingerprint` and, ``window``
+    seconds after the first one of a burst, sends a digest per fingerprint with
+    its occurrence count.
+    """
+
+    def __init__(self, window=60, maxsize=1000):
+        super().__init__()
+        self.window = window
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+
+    def emit(self, record):
+        try:
+            self._ensure_listener()
+            self._queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            with self._pending_lock:
+                self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    def prepare(self, record):
+        request = getattr(record, "request", None)
+        summary = record.getMessage().strip().split("\n", 1)[0]
+        return {
+            "fingerprint": fingerprint(record),
+            "level": record.levelname,
+            "summary": summary[:200],
+            "request": f"{request.method} {request.get_full_path()}" if request else None,
+            "message": self.format(record),
+            "created": record.created,
+        }
+
+    def flush(self):
+        """Send every pending digest now, including records still queued."""
+        if self._queue is not None:
+            while True:
+                try:
+                    self._collect(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+        self._send_pending()
+
+    def close(self):
+        self.flush()
+        super().close()
+
+    def _ensure_listener(self):
+        # A forked worker inherits neither the thread nor a usable queue.
+        if self._pid == os.getpid():
+            return
+        with self._pending_lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(self.maxsize)
+            self._pending = {}
+            thread = threading.Thread(target=self._listen, name="admin-digest", daemon=True)
+            thread.start()
+            self._pid = os.getpid()
+
+    def _listen(self):
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                self._collect(self._queue.get(timeout=timeout))
+                if deadline is None:
+                    deadline = time.monotonic() + self.window
+            except queue.Empty:
+                pass
+            if deadline is not None and time.monotonic() >= deadline:
+                self._send_pending()
+                deadline = None
+
+    def _collect(self, entry):
+        with self._pending_lock:
+            digest = self._pending.get(entry["fingerprint"])
+            if digest is None:
+                self._pending[entry["fingerprint"]] = dict(entry, count=1, last=entry["created"])
+            else:
+                digest["count"] += 1
+                digest["last"] = entry["created"]
+
+    def _send_pending(self):
+        with self._pending_lock:
+            digests, self._pending = self._pending, {}
+        for digest in digests.values():
+            self.send_digest(digest)
+
+    def send_digest(self, digest):
+        subject = f"{digest['level']} ({digest['count']}x): {digest['summary']}"
+        first = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(digest["created"]))
+        last = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(digest["last"]))
+        lines = [f"{digest['count']} occurrence(s) between {first} and {last}."]
+        if digest["request"]:
+            lines.append(f"First request: {digest['request']}")
+        lines += ["", digest["message"]]
+        mail.mail_admins(subject, "\n".join(lines), fail_silently=True)
+
+
+def add_request_context(record):
+    """Copy the current request's id, user id, route and elapsed time to ``record``."""
+    context = request_context.get()
+    if context is None:
+        return
+    request = context["request"]
+    user = getattr(request, "user", None)
+    if isinstance(user, LazyObject):
+        # Never load the user for a log line.
+        user = user._wrapped
+    match = getattr(request, "resolver_match", None)
+    record.request_id = context["id"]
+    record.user_id = None if user is empty else getattr(user, "pk", None)
+    record.route = match.view_name if match else None
+    record.elapsed_ms = round((time.perf_counter() - context["started"]) * 1000, 2)
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: the record, its request context and ``extra`` fields."""
+
+    def format(self, record):
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.thread,
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and key not in data and key != "request":
+                data[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        if record.stack_info:
+            data["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(data, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Pass only a fraction of the INFO and lower records of noisy loggers.
+
+    ``rates`` maps logger names to the fraction kept; the closest configured
+    ancestor applies. Records of one request are kept or dropped together, and
+    kept records carry their ``sample_rate``.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = rates or {}
+
+    def rate(self, name):
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1
+
+    def filter(self, record):
+        if record.levelno > logging.INFO:
+            return True
+        rate = self.rate(record.name)
+        if rate >= 1:
+            return True
+        context = request_context.get()
+        if context is not None:
+            sample = zlib.crc32(context["id"].encode()) / 2 ** 32
+        else:
+            sample = int.from_bytes(os.urandom(4), "big") / 2 ** 32
+        record.sample_rate = rate
+        return sample < rate
+
+
+class _Listener(logging.handlers.QueueListener):
+    def __init__(self, queue, handler, owner):
+        super().__init__(queue, handler)
+        self.owner = owner
+
+    def handle(self, record):
+        super().handle(record)
+        self.owner.report_dropped()
+
+    def enqueue_sentinel(self):
+        # Wait for room rather than lose the sentinel and hang in stop().
+        self.queue.put(self._sentinel)
+
+
+class QueueStreamHandler(logging.handlers.QueueHandler):
+    """Log to a stream from a background thread, never blocking the caller.
+
+    The calling thread only adds the request context, merges the message with
+    its arguments and puts the record on a bounded queue; a ``QueueListener``
+    formats and writes it. When the queue is full the record is dropped and
+    counted in ``dropped``, and the listener logs how many were lost once it
+    catches up. The formatter set on this handler is used by the listener.
+    """
+
+    def __init__(self, stream=None, maxsize=10000):
+        super().__init__(None)
+        self.target = logging.StreamHandler(stream)
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._reported = 0
+        self._lock = threading.Lock()
+        self._pid = None
+        self.listener = None
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def emit(self, record):
+        try:
+            self._ensure_listener()
+            self.queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    def prepare(self, record):
+        # Other handlers still see the original record.
+        record = copy.copy(record)
+        add_request_context(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Tracebacks reference live frames; render them now.
+            record.exc_text = (self.formatter or logging.Formatter()).formatException(record.exc_info)
+            record.exc_info = None
+        # The request does not pickle or outlive it; the context has what we need.
+        record.__dict__.pop("request", None)
+        return record
+
+    def report_dropped(self):
+        dropped = self.dropped
+        if dropped > self._reported and self.queue.empty():
+            count, self._reported = dropped - self._reported, dropped
+            self.target.handle(
+                logging.makeLogRecord(
+                    {
+                        "name": __name__,
+                        "levelno": logging.WARNING,
+                        "levelname": "WARNING",
+                        "msg": "Dropped %d log records, the log queue was full",
+                        "args": (count,),
+                        "dropped": count,
+                    }
+                )
+            )
+
+    def flush(self):
+        """Wait until every queued record has been written."""
+        if self.listener is not None and self._pid == os.getpid():
+            # The listener marks each record done once it is written.
+            self.queue.join()
+        self.target.flush()
+
+    def close(self):
+        if self.listener is not None and self._pid == os.getpid():
+            self.listener.stop()
+            self.listener = None
+        self.target.close()
+        super().close()
+
+    def _ensure_listener(self):
+        # A forked worker inherits neither the thread nor a usable queue.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self.queue = queue.Queue(self.maxsize)
+            self.listener = _Listener(self.queue, self.target, self)
+            self.listener.start()
+            self._pid = os.getpid()
@@ -0,0 +1,50 @@
+import gzip
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from weblist.utils import assets
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile, bundle and minify the CSS and JavaScript in ASSET_BUNDLES from committed sources, "
+        "without network access. Commit the bundles it writes."
+    )
+    # The bundles check fails until this command has run.
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fetch", action="store_true", help="download missing vendored files listed in vendor/vendor.json first"
+        )
+        parser.add_argument(
+            "--check", action="store_true", help="write nothing, fail if a committed bundle is out of date"
+        )
+
+    def handle(self, *args, **options):
+        root = Path(settings.ASSETS_ROOT)
+        try:
+            if options["fetch"]:
+                for name in assets.fetch_vendor(root):
+                    self.stdout.write(f"fetched {name}")
+            outputs = assets.build(root, settings.ASSET_BUNDLES)
+        except assets.AssetError as e:
+            raise CommandError(str(e))
+
+        stale = assets.stale(root, outputs)
+        for bundle, data in outputs.items():
+            state = "out of date" if options["check"] else "written"
+            self.stdout.write(
+                f"{bundle:<20} {len(data) / 1024:8.1f} KiB  gzip {len(gzip.compress(data)) / 1024:6.1f} KiB  "
+                f"{state if bundle in stale else 'unchanged'}"
+            )
+        if options["check"]:
+            if stale:
+                raise CommandError(f"Out of date: {', '.join(stale)}; run `manage.py build_assets`")
+            return
+        for bundle in stale:
+            path = root / bundle
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(outputs[bundle])
@@ -0,0 +1,82 @@
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What each process type imports before it can do any work.
+PROCESSES = {
+    "command": "import django; django.setup()",
+    "wsgi": "import config.wsgi",
+    "asgi": "import config.asgi",
+    "celery": "from config.celery_app import app; app.loader.import_default_modules()",
+}
+
+
+def parse_importtime(output):
+    """Parse ``python -X importtime`` output into ``(module, depth, self_us, cumulative_us)``."""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        module = name.rstrip()
+        depth = (len(module) - len(module.lstrip())) // 2
+        imports.append((module.strip(), depth, int(own), int(cumulative)))
+    return imports
+
+
+def profile(process, repeat):
+    walls, imports = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", PROCESSES[process]],
+            cwd=settings.ROOT_DIR,
+            stderr=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            universal_newlines=True,
+        )
+        walls.append(time.perf_counter() - start)
+        if result.returncode:
+            raise CommandError(f"{process} failed to start:\n{result.stderr[-2000:]}")
+        imports = parse_importtime(result.stderr)
+    return statistics.median(walls), imports
+
+
+class Command(BaseCommand):
+    help = (
+        "Start each process type in a fresh interpreter under -X importtime and "
+        "report its start-up time and the packages and modules that dominate it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("processes", nargs="*", help=f"Any of {', '.join(PROCESSES)}; all by default.")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per process; wall time is the median.")
+        parser.add_argument("--top", type=int, default=15)
+
+    def handle(self, *args, **options):
+        unknown = set(options["processes"]) - set(PROCESSES)
+        if unknown:
+            raise CommandError(f"Unknown process type: {', '.join(sorted(unknown))}")
+        for process in options["processes"] or PROCESSES:
+            wall, imports = profile(process, options["repeat"])
+            total = sum(cumulative for _, depth, _, cumulative in imports if depth == 0)
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(f"{process}: {wall * 1000:.0f}ms wall, {total / 1000:.0f}ms importing")
+            )
+
+            packages = Counter()
+            for module, _, own, _ in imports:
+                packages[module.partition(".")[0]] += own
+            self.stdout.write("  by package (self time)")
+            for package, own in packages.most_common(options["top"]):
+                self.stdout.write(f"    {own / 1000:8.1f}ms  {package}")
+
+            self.stdout.write("  by module (cumulative)")
+            slowest = sorted(imports, key=lambda item: item[3], reverse=True)[: options["top"]]
+            for module, depth, _, cumulative in slowest:
+                self.stdout.write(f"    {cumulative / 1000:8.1f}ms  {module}")
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from weblist.utils import warmup
+
+
+class Command(BaseCommand):
+    help = (
+        "Build URL resolvers, compiled templates and translation catalogs, render the WARMUP_ROUTES pages "
+        "and fill the shared cache, reporting the time of each step. Fails if a page does not render."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--routes", nargs="+", metavar="NAME", help="URL names to render instead of WARMUP_ROUTES")
+        parser.add_argument("--skip-routes", action="store_true", help="render no pages")
+
+    def handle(self, *args, **options):
+        routes = [] if options["skip_routes"] else options["routes"]
+        timings = warmup.warm_up(warmup.STEPS + warmup.worker_steps(routes))
+
+        failed = []
+        for name, (count, ms) in timings.items():
+            self.stdout.write(f"{name:<28} {count:6d} {ms:9.1f}ms")
+            if name.startswith("route ") and not count:
+                failed.append(name[len("route ") :])
+        self.stdout.write(f"{'total':<28} {'':6} {sum(ms for _, ms in timings.values()):9.1f}ms")
+        if failed:
+            raise CommandError(f"Failed to render: {', '.join(failed)}")
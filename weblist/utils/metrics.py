@@ -0,0 +1,329 @@
+"""
+Per-request performance metrics and their Prometheus exposition.
+
+``weblist.utils.middleware.PerformanceMiddleware`` starts a
+:class:`RequestMetrics` for each request; the hooks installed by
+:func:`install` add database queries, template rendering and cache lookups to
+whichever request is current, including the threads ``sync_to_async`` runs
+async views' database work in. Finished requests are aggregated per route by
+the process-wide :data:`store`.
+
+Each process writes its aggregates to its own file in ``METRICS_DIR`` at most
+every ``METRICS_FLUSH_INTERVAL`` seconds, and the metrics view sums every file
+there, so a scrape sees all gunicorn workers whichever one answers it. Files of
+workers that exited are kept so that counters never go backwards; the gunicorn
+config empties the directory when the master starts. The files are JSON, and
+the directory must belong to the user the app runs as and be writable by no
+one else, or :func:`metrics_dir` refuses it.
+"""
+import asyncio
+import contextvars
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache.backends.base import BaseCache
+from django.core.exceptions import ImproperlyConfigured
+from django.template.base import Template
+from django.utils.module_loading import import_string
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+HISTOGRAMS = {
+    "weblist_request_duration_seconds": ("Request duration.", SECONDS_BUCKETS),
+    "weblist_request_db_queries": ("Database queries per request.", QUERY_BUCKETS),
+    "weblist_request_db_seconds": ("Database time per request.", SECONDS_BUCKETS),
+    "weblist_request_template_seconds": ("Template rendering time per request.", SECONDS_BUCKETS),
+}
+COUNTERS = {
+    "weblist_cache_hits_total": "Cache lookups that found the key.",
+    "weblist_cache_misses_total": "Cache lookups that did not find the key.",
+    "weblist_middleware_seconds_total": "Time spent in each middleware, excluding the layers inside it.",
+}
+
+current = contextvars.ContextVar("weblist_request_metrics", default=None)
+#: Off while ``weblist.utils.warmup`` renders pages, which are not traffic.
+recording = contextvars.ContextVar("weblist_metrics_recording", default=True)
+_MISS = object()
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Inclusive time of each middleware layer by position, filled in as
+        # the layers return, and the exclusive time per middleware from it.
+        self.layer_ms = {}
+        self.middleware_ms = {}
+        self.view_ms = 0.0
+
+    @property
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self):
+        """``Server-Timing`` header value, e.g. ``total;dur=12.1, db;desc="3 queries";dur=1.2``."""
+        entries = [
+            f"total;dur={self.total_ms:.1f}",
+            f'db;desc="{self.db_queries} queries";dur={self.db_ms:.1f}',
+            f"template;dur={self.template_ms:.1f}",
+            f"view;dur={self.view_ms:.1f}",
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+        ]
+        entries.extend(f"mw-{name};dur={ms:.1f}" for name, ms in self.middleware_ms.items())
+        return ", ".join(entries)
+
+
+def time_queries(execute, sql, params, many, context):
+    """``execute_wrapper`` adding each query to the current request."""
+    metrics = current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_queries += 1
+        metrics.db_ms += (time.perf_counter() - start) * 1000
+
+
+def instrument_connection(sender, connection, **kwargs):
+    """``connection_created`` receiver installing :func:`time_queries`."""
+    # First in the list: execute_wrapper() blocks pop the last wrapper on exit.
+    if time_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, time_queries)
+
+
+def _timed_render(render):
+    def timed_render(self, context):
+        metrics = current.get()
+        if metrics is None:
+            return render(self, context)
+        # Included templates are rendered inside their parent; count them once.
+        metrics.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            metrics.template_depth -= 1
+            if not metrics.template_depth:
+                metrics.template_ms += (time.perf_counter() - start) * 1000
+
+    timed_render.instrumented = True
+    return timed_render
+
+
+def timed_layer(get_response, layer_ms, index):
+    """Wrap the call into one middleware layer; ``layer_ms(index, start)`` records it."""
+    if asyncio.iscoroutinefunction(get_response):
+
+        async def timed(request):
+            start = time.perf_counter()
+            try:
+                return await get_response(request)
+            finally:
+                layer_ms(index, start)
+
+    else:
+
+        def timed(request):
+            start = time.perf_counter()
+            try:
+                return get_response(request)
+            finally:
+                layer_ms(index, start)
+
+    return timed
+
+
+def _counted_get(get):
+    def counted_get(self, key, default=None, *args, **kwargs):
+        value = get(self, key, _MISS, *args, **kwargs)
+        metrics = current.get()
+        if metrics is not None:
+            if value is _MISS:
+                metrics.cache_misses += 1
+            else:
+                metrics.cache_hits += 1
+        return default if value is _MISS else value
+
+    counted_get.instrumented = True
+    return counted_get
+
+
+def _counted_get_many(get_many):
+    def counted_get_many(self, keys, *args, **kwargs):
+        keys = list(keys)
+        values = get_many(self, keys, *args, **kwargs)
+        metrics = current.get()
+        if metrics is not None:
+            metrics.cache_hits += len(values)
+            metrics.cache_misses += len(keys) - len(values)
+        return values
+
+    counted_get_many.instrumented = True
+    return counted_get_many
+
+
+def install():
+    """Hook template rendering and the configured cache backends; idempotent."""
+    if not getattr(Template.render, "instrumented", False):
+        Template.render = _timed_render(Template.render)
+    for config in settings.CACHES.values():
+        backend = import_string(config["BACKEND"])
+        if not getattr(backend.get, "instrumented", False):
+            backend.get = _counted_get(backend.get)
+        # The default get_many() calls get() for each key.
+        if backend.get_many is not BaseCache.get_many and not getattr(backend.get_many, "instrumented", False):
+            backend.get_many = _counted_get_many(backend.get_many)
+
+
+def metrics_dir():
+    """``METRICS_DIR``, created if missing, or None; refused if another user could write to it."""
+    directory = settings.METRICS_DIR
+    if not directory:
+        return None
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    status = os.lstat(directory)
+    if not stat.S_ISDIR(status.st_mode) or status.st_uid != os.geteuid() or status.st_mode & 0o022:
+        raise ImproperlyConfigured(
+            f"METRICS_DIR {directory} must be a directory owned by this user and writable by no one else."
+        )
+    return directory
+
+
+def dump_series(series):
+    """``{(name, labels): value}`` as a JSON-friendly list."""
+    return [[name, [list(label) for label in labels], value] for (name, labels), value in series.items()]
+
+
+def load_series(rows):
+    return {(name, tuple(tuple(label) for label in labels)): value for name, labels, value in rows}
+
+
+class Store:
+    """Per-route histograms and counters of this process, mirrored to a file."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.flushed_at = time.monotonic()
+        # (name, labels) -> [bucket counts..., sum, count]
+        self.histograms = {}
+        # (name, labels) -> value
+        self.counters = defaultdict(float)
+
+    def observe(self, name, labels, value):
+        buckets = HISTOGRAMS[name][1]
+        key = (name, labels)
+        if key not in self.histograms:
+            self.histograms[key] = [0] * (len(buckets) + 2)
+        series = self.histograms[key]
+        for index, bound in enumerate(buckets):
+            if value <= bound:
+                series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def record(self, route, metrics):
+        with self.lock:
+            if os.getpid() != self.pid:
+                # A forked worker starts from zero; the parent owns its data.
+                self.reset()
+            labels = (("route", route),)
+            self.observe("weblist_request_duration_seconds", labels, metrics.total_ms / 1000)
+            self.observe("weblist_request_db_queries", labels, metrics.db_queries)
+            self.observe("weblist_request_db_seconds", labels, metrics.db_ms / 1000)
+            self.observe("weblist_request_template_seconds", labels, metrics.template_ms / 1000)
+            self.counters[("weblist_cache_hits_total", labels)] += metrics.cache_hits
+            self.counters[("weblist_cache_misses_total", labels)] += metrics.cache_misses
+            for name, ms in metrics.middleware_ms.items():
+                self.counters[("weblist_middleware_seconds_total", (("middleware", name),))] += ms / 1000
+        if time.monotonic() - self.flushed_at >= settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        directory = metrics_dir()
+        if not directory:
+            return
+        with self.lock:
+            self.flushed_at = time.monotonic()
+            data = json.dumps(
+                {"histograms": dump_series(self.histograms), "counters": dump_series(self.counters)}
+            ).encode()
+        handle, temporary = tempfile.mkstemp(dir=directory, prefix=".")
+        with os.fdopen(handle, "wb") as f:
+            f.write(data)
+        os.replace(temporary, os.path.join(directory, f"{self.pid}.metrics"))
+
+    def collect(self):
+        """Sum the aggregates of every process, or of this one without ``METRICS_DIR``."""
+        directory = metrics_dir()
+        if not directory:
+            with self.lock:
+                return dict(self.histograms), dict(self.counters)
+        self.flush()
+        histograms, counters = {}, defaultdict(float)
+        for filename in os.listdir(directory):
+            if not filename.endswith(".metrics"):
+                continue
+            with open(os.path.join(directory, filename), "rb") as f:
+                data = json.load(f)
+            process_histograms, process_counters = load_series(data["histograms"]), load_series(data["counters"])
+            for key, series in process_histograms.items():
+                total = histograms.setdefault(key, [0] * len(series))
+                for index, value in enumerate(series):
+                    total[index] += value
+            for key, value in process_counters.items():
+                counters[key] += value
+        return histograms, counters
+
+
+store = Store()
+
+
+def clear_metrics_dir():
+    """Remove the files of a previous server run."""
+    directory = metrics_dir()
+    if directory:
+        for filename in os.listdir(directory):
+            if filename.endswith(".metrics"):
+                os.remove(os.path.join(directory, filename))
+
+
+def _labels(labels, **extra):
+    pairs = (*labels, *extra.items())
+    return ",".join(f'{name}="{value}"' for name, value in pairs)
+
+
+def render_prometheus(histograms, counters):
+    """Prometheus text exposition format, version 0.0.4."""
+    lines = []
+    for name, (description, buckets) in HISTOGRAMS.items():
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+        for (metric, labels), series in sorted(histograms.items()):
+            if metric != name:
+                continue
+            for bound, count in zip((*buckets, "+Inf"), (*series[: len(buckets)], series[-1])):
+                lines.append(f"{name}_bucket{{{_labels(labels, le=bound)}}} {count}")
+            lines.append(f"{name}_sum{{{_labels(labels)}}} {series[-2]}")
+            lines.append(f"{name}_count{{{_labels(labels)}}} {series[-1]}")
+    for name, description in COUNTERS.items():
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f"{name}{{{_labels(labels)}}} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.functional import LazyObject, empty
+
+from weblist.utils import metrics
+from weblist.utils.log import request_context
+from weblist.utils.transactions import ATOMIC, SAFE_METHODS, get_transaction_policy
+
+logger = logging.getLogger("weblist.transactions")
+
+
+class RequestContextMiddleware:
+    """Give each request an id and make it the logging context, see ``weblist.utils.log``.
+
+    The id comes from an ``X-Request-ID`` header set by the proxy, or is
+    generated, and is returned in the same response header.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = request_context.set(self.context(request))
+        try:
+            return self.finish(request, self.get_response(request))
+        finally:
+            request_context.reset(token)
+
+    async def __acall__(self, request):
+        token = request_context.set(self.context(request))
+        try:
+            return self.finish(request, await self.get_response(request))
+        finally:
+            request_context.reset(token)
+
+    def context(self, request):
+        request.id = request.headers.get("X-Request-ID", "")[:64] or uuid.uuid4().hex
+        return {"request": request, "id": request.id, "started": time.perf_counter()}
+
+    def finish(self, request, response):
+        response["X-Request-ID"] = request.id
+        return response
+
+
+class TransactionTimingMiddleware:
+    """Log how long each view ran and under which transaction policy.
+
+    The duration covers the view call including BEGIN/COMMIT for atomic views,
+    and template rendering for views returning a ``TemplateResponse``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Mark the instance as a coroutine function so Django runs it
+            # natively under ASGI instead of adapting it to a thread.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        self.log(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        self.log(request)
+        return response
+
+    def log(self, request):
+        started = getattr(request, "_view_started", None)
+        if started is not None:
+            duration = (time.perf_counter() - started) * 1000
+            logger.info(
+                "%s %s %.2fms",
+                request._view_name,
+                request._transaction_policy,
+                duration,
+                extra={
+                    "view": request._view_name,
+                    "transaction_policy": request._transaction_policy,
+                    "duration_ms": duration,
+                },
+            )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        policy = get_transaction_policy(view_func)
+        if policy == ATOMIC and (
+            request.method in SAFE_METHODS or not settings.DATABASES[DEFAULT_DB_ALIAS].get("ATOMIC_REQUESTS")
+        ):
+            policy = "autocommit"
+        request._transaction_policy = policy
+        request._view_name = request.resolver_match.view_name
+        request._view_started = time.perf_counter()
+
+
+def _layer_name(target):
+    if hasattr(target, "get_response"):
+        return type(target).__name__
+    if getattr(target, "__name__", None) in ("_get_response", "_get_response_async"):
+        return "view"
+    return getattr(target, "__qualname__", repr(target))
+
+
+class PerformanceMiddleware:
+    """Measure each request and report it, see ``weblist.utils.metrics``.
+
+    Goes first in ``MIDDLEWARE`` so that it can time every layer after it; the
+    time of each middleware excludes the layers inside it, and "view" covers
+    URL resolution, the view and rendering its response. Staff users whose
+    ``request.user`` was loaded anyway, and everyone under ``DEBUG``, get the
+    figures in a ``Server-Timing`` header.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        metrics.install()
+        self.layers = []
+        owner = self
+        while True:
+            inner = owner.get_response
+            # convert_exception_to_response() wraps each layer with wraps().
+            target = getattr(inner, "__wrapped__", inner)
+            self.layers.append(_layer_name(target))
+            owner.get_response = metrics.timed_layer(inner, self.record_layer, len(self.layers) - 1)
+            if not hasattr(target, "get_response"):
+                break
+            owner = target
+
+    def record_layer(self, index, start):
+        request_metrics = metrics.current.get()
+        if request_metrics is not None:
+            request_metrics.layer_ms[index] = (time.perf_counter() - start) * 1000
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = metrics.current.set(metrics.RequestMetrics())
+        try:
+            response = self.get_response(request)
+            return self.finish(request, response)
+        finally:
+            metrics.current.reset(token)
+
+    async def __acall__(self, request):
+        token = metrics.current.set(metrics.RequestMetrics())
+        try:
+            response = await self.get_response(request)
+            return self.finish(request, response)
+        finally:
+            metrics.current.reset(token)
+
+    def finish(self, request, response):
+        request_metrics = metrics.current.get()
+        inclusive = request_metrics.layer_ms
+        for index, name in enumerate(self.layers):
+            if index in inclusive:
+                exclusive = inclusive[index] - inclusive.get(index + 1, 0)
+                request_metrics.middleware_ms[name] = exclusive
+        view_ms = request_metrics.middleware_ms.pop("view", None)
+        if view_ms is not None:
+            request_metrics.view_ms = view_ms
+        match = getattr(request, "resolver_match", None)
+        if metrics.recording.get():
+            metrics.store.record(match.view_name if match else "unmatched", request_metrics)
+        if settings.DEBUG or self.is_staff(request):
+            response["Server-Timing"] = request_metrics.server_timing()
+        return response
+
+    @staticmethod
+    def is_staff(request):
+        # Never load the user just for the header: that would be a query, and
+        # not allowed from async code.
+        user = getattr(request, "user", None)
+        if isinstance(user, LazyObject):
+            user = user._wrapped
+        return user is not empty and getattr(user, "is_staff", False)
@@ -0,0 +1,192 @@
+"""
+Query count and wall-time budgets for tests, registered by ``weblist/conftest.py``.
+
+Wrap the code under test with the ``budget`` fixture, or mark the whole test::
+
+    def test_detail(client, budget):
+        with budget(queries=3, ms=200):
+            client.get("/users/jdoe/")
+
+    @pytest.mark.budget(queries=3, templates={"users/user_detail.html": {"queries": 0}})
+    def test_detail_page(client): ...
+
+Template budgets count the queries issued while rendering that template's own
+nodes and the time spent rendering it. Time limits are multiplied by the
+``BUDGET_TIME_FACTOR`` environment variable, which slow CI machines can raise
+and ``0`` turns off. A failure lists the captured SQL with the project code and
+template lines that issued each query.
+"""
+import os
+import sys
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+
+import pytest
+from django.conf import settings
+from django.db import connections
+from django.template.base import Template
+
+#: Project frames shown per query.
+ORIGIN_FRAMES = 3
+#: Instrumentation whose frames are left out of query origins.
+SKIP_MODULES = {__name__, "weblist.utils.metrics"}
+#: Characters of SQL shown per query.
+SQL_WIDTH = 300
+
+
+class BudgetExceeded(AssertionError):
+    pass
+
+
+def time_factor():
+    return float(os.environ.get("BUDGET_TIME_FACTOR", 1))
+
+
+def query_origins():
+    """Return the code lines that issued the current query and its template line.
+
+    The first code line is the ORM's caller, wherever it is; the rest are the
+    innermost project frames.
+    """
+    code, template = [], None
+    apps_dir, orm_dir = str(settings.APPS_DIR), os.path.join("django", "db", "")
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if template is None and frame.f_code.co_name == "render_annotated":
+            node = frame.f_locals.get("self")
+            origin, token = getattr(node, "origin", None), getattr(node, "token", None)
+            if origin is not None and token is not None:
+                template = f"{origin.template_name}:{token.lineno}"
+        elif frame.f_globals.get("__name__") in SKIP_MODULES or orm_dir in filename:
+            pass
+        elif not code or (len(code) <= ORIGIN_FRAMES and filename.startswith(apps_dir)):
+            path = os.path.relpath(filename, settings.ROOT_DIR) if filename.startswith(apps_dir) else filename
+            location = f"{path}:{frame.f_lineno} in {frame.f_code.co_name}"
+            if location not in code:
+                code.append(location)
+        frame = frame.f_back
+    return code, template
+
+
+class Budget:
+    """Context manager failing when its block exceeds a query count or time.
+
+    ``templates`` maps template names to ``{"queries": n, "ms": t}`` limits.
+    """
+
+    def __init__(self, queries=None, ms=None, templates=None, using=None):
+        self.queries = queries
+        self.ms = ms
+        self.templates = templates or {}
+        self.using = using or list(settings.DATABASES)
+        self.captured = []
+        self.template_ms = defaultdict(float)
+        self.elapsed_ms = None
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for alias in self.using:
+            self._stack.enter_context(connections[alias].execute_wrapper(self._capture))
+        render = Template._render
+
+        def timed_render(template, context):
+            start = time.perf_counter()
+            try:
+                return render(template, context)
+            finally:
+                self.template_ms[template.origin.template_name] += (time.perf_counter() - start) * 1000
+
+        Template._render = timed_render
+        self._stack.callback(setattr, Template, "_render", render)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed_ms = (time.perf_counter() - self._start) * 1000
+        self._stack.close()
+        if exc_type is None:
+            self.check()
+
+    def _capture(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            code, template = query_origins()
+            self.captured.append(
+                {
+                    "sql": sql,
+                    "params": params,
+                    "ms": (time.perf_counter() - start) * 1000,
+                    "code": code,
+                    "template": template,
+                }
+            )
+
+    def template_queries(self, name):
+        return [
+            query
+            for query in self.captured
+            if query["template"] and query["template"].rsplit(":", 1)[0] == name
+        ]
+
+    def check(self):
+        failures = []
+        factor = time_factor()
+        if self.queries is not None and len(self.captured) > self.queries:
+            failures.append(f"{len(self.captured)} queries, budget {self.queries}")
+        if self.ms is not None and factor and self.elapsed_ms > self.ms * factor:
+            failures.append(f"{self.elapsed_ms:.1f}ms, budget {self.ms * factor:g}ms")
+        for name, limits in self.templates.items():
+            if name not in self.template_ms:
+                failures.append(f"{name} was not rendered")
+                continue
+            count = len(self.template_queries(name))
+            if "queries" in limits and count > limits["queries"]:
+                failures.append(f"{name}: {count} queries, budget {limits['queries']}")
+            ms = self.template_ms[name]
+            if "ms" in limits and factor and ms > limits["ms"] * factor:
+                failures.append(f"{name}: {ms:.1f}ms, budget {limits['ms'] * factor:g}ms")
+        if failures:
+            raise BudgetExceeded(self.describe(failures))
+
+    def describe(self, failures):
+        lines = ["Budget exceeded:", *(f"  {failure}" for failure in failures)]
+        lines.append(f"Captured queries ({len(self.captured)}):")
+        for number, query in enumerate(self.captured, 1):
+            sql = query["sql"] if len(query["sql"]) <= SQL_WIDTH else query["sql"][:SQL_WIDTH] + "..."
+            lines.append(f"  {number}. [{query['ms']:.2f}ms] {sql}")
+            if query["params"]:
+                lines.append(f"     params: {query['params']!r}"[: SQL_WIDTH + 13])
+            if query["template"]:
+                lines.append(f"     template {query['template']}")
+            lines.extend(f"     at {origin}" for origin in query["code"])
+        return "\n".join(lines)
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "budget(queries=None, ms=None, templates=None): fail the test if its body "
+        "exceeds the query count or wall time; see weblist.utils.pytest_budget",
+    )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("budget")
+    if marker is None:
+        yield
+        return
+    budget = Budget(**marker.kwargs)
+    budget.__enter__()
+    outcome = yield
+    budget.__exit__(*(outcome.excinfo or (None, None, None)))
+
+
+@pytest.fixture
+def budget():
+    """:class:`Budget`, to be used as a context manager around the code under test."""
+    return Budget
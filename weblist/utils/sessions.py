@@ -0,0 +1,85 @@
+"""
+Cached database session engine that coalesces writes.
+
+Sessions are read from the cache and written through to the database only when
+their data changes. A save that would merely push the expiry forward, such as
+``SESSION_SAVE_EVERY_REQUEST`` or re-assigning an unchanged value, refreshes
+the cache entry and leaves the database row alone until it is
+``SESSION_DB_REFRESH_INTERVAL`` seconds behind, so a busy session causes one
+expiry write per interval instead of one per request.
+"""
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.utils import timezone
+
+KEY_PREFIX = "weblist.sessions"
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._stored_digest = None
+        self._stored_expiry = None
+
+    def _digest(self, data):
+        return hashlib.sha1(self.serializer().dumps(data)).hexdigest()
+
+    def _cache_entry(self, data, expire_date):
+        return {"data": data, "digest": self._digest(data), "expire_date": expire_date}
+
+    def load(self):
+        try:
+            entry = self._cache.get(self.cache_key)
+        except Exception:
+            # Some backends (e.g. memcache) raise an exception on invalid
+            # cache keys. If this happens, reset the session. See #17810.
+            entry = None
+
+        if entry is None:
+            session = self._get_session_from_db()
+            if session is None:
+                self._stored_digest = self._stored_expiry = None
+                return {}
+            entry = self._cache_entry(self.decode(session.session_data), session.expire_date)
+            self._cache.set(self.cache_key, entry, self.get_expiry_age(expiry=session.expire_date))
+
+        self._stored_digest = entry["digest"]
+        self._stored_expiry = entry["expire_date"]
+        return entry["data"]
+
+    def _needs_db_write(self, digest, expire_date):
+        if self._stored_expiry is None or digest != self._stored_digest:
+            return True
+        interval = timedelta(seconds=getattr(settings, "SESSION_DB_REFRESH_INTERVAL", 0))
+        # Keep the row valid for at least another interval so clearsessions
+        # never deletes a session that is still alive in the cache.
+        return (
+            expire_date - self._stored_expiry >= interval
+            or self._stored_expiry - timezone.now() < interval
+        )
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = self._get_session(no_load=must_create)
+        digest = self._digest(data)
+        expire_date = self.get_expiry_date()
+
+        if must_create or self._needs_db_write(digest, expire_date):
+            DBStore.save(self, must_create=must_create)
+            self._stored_digest, self._stored_expiry = digest, expire_date
+            entry = {"data": data, "digest": digest, "expire_date": expire_date}
+            self._cache.set(self.cache_key, entry, self.get_expiry_age())
+        else:
+            self._cache.touch(self.cache_key, self.get_expiry_age())
+
+    def delete(self, session_key=None):
+        super().delete(session_key)
+        if session_key is None or session_key == self.session_key:
+            self._stored_digest = self._stored_expiry = None
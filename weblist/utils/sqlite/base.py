@@ -0,0 +1,21 @@
+"""
+SQLite backend for the writer connection of ``base.db``.
+
+Django opens transactions with a deferred ``BEGIN``, which takes the write lock
+only at the first write. If another connection commits in between, SQLite
+cannot upgrade the transaction's stale snapshot and fails with "database is
+locked" at once, without waiting for ``busy_timeout``. ``BEGIN IMMEDIATE`` takes
+the write lock up front, so concurrent write transactions wait their turn
+instead. Reads outside transactions, and the read-only connection, are not
+affected.
+
+The lock is held until the transaction ends, so only requests that may write
+run in one: GET, HEAD and OPTIONS requests skip ``ATOMIC_REQUESTS``, see
+``weblist.utils.transactions``.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute("BEGIN IMMEDIATE")
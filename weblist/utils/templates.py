@@ -0,0 +1,221 @@
+"""
+Django template backend that runs context processors only when needed.
+
+Django runs every context processor on each render, whether or not the
+template uses its output. With ``weblist.utils.templates.DjangoTemplates`` as
+the ``TEMPLATES`` backend, a processor whose keys are registered runs the first
+time a template looks up one of them, and never if none is used; variables the
+view passes are found before the processors are consulted at all. Processors
+without registered keys still run on every render, so any processor works
+unchanged.
+
+Keys are registered in :data:`PROCESSOR_KEYS` by dotted path, or on the
+processor itself with :func:`context_keys`. A registered processor that
+returns a key it did not register raises ``ImproperlyConfigured``, as the key
+could otherwise be missed.
+"""
+from contextlib import contextmanager
+
+from django.core.exceptions import ImproperlyConfigured
+from django.template import TemplateDoesNotExist
+from django.template.backends import django as django_backend
+from django.template.context import Context, RequestContext
+
+PROCESSOR_KEYS = {
+    "django.template.context_processors.csrf": ("csrf_token",),
+    "django.template.context_processors.debug": ("debug", "sql_queries"),
+    "django.template.context_processors.request": ("request",),
+    "django.template.context_processors.i18n": ("LANGUAGES", "LANGUAGE_CODE", "LANGUAGE_BIDI"),
+    "django.template.context_processors.media": ("MEDIA_URL",),
+    "django.template.context_processors.static": ("STATIC_URL",),
+    "django.template.context_processors.tz": ("TIME_ZONE",),
+    "django.contrib.auth.context_processors.auth": ("user", "perms"),
+    "django.contrib.messages.context_processors.messages": ("messages", "DEFAULT_MESSAGE_LEVELS"),
+}
+
+
+def context_keys(*keys):
+    """Register the keys a project context processor returns."""
+
+    def decorator(processor):
+        processor.context_keys = keys
+        return processor
+
+    return decorator
+
+
+def processor_keys(processor):
+    keys = getattr(processor, "context_keys", None)
+    if keys is None:
+        keys = PROCESSOR_KEYS.get(f"{processor.__module__}.{processor.__qualname__}")
+    return keys
+
+
+class LazyProcessorOutput(dict):
+    """The context processors' output, each processor run on first lookup of one of its keys.
+
+    As with Django's eager merge, a key belongs to the last processor providing it.
+    """
+
+    def __init__(self, processors, request):
+        super().__init__()
+        self.request = request
+        # key -> (position, processor) of registered processors not run yet
+        self.pending = {}
+        self.owners = {}
+        for position, processor in enumerate(processors):
+            keys = processor_keys(processor)
+            if keys is None:
+                output = processor(request)
+                for key, value in output.items():
+                    self.owners[key] = position
+                    self.pending.pop(key, None)
+                    dict.__setitem__(self, key, value)
+            else:
+                for key in keys:
+                    self.owners[key] = position
+                    self.pending[key] = (position, processor)
+                    dict.pop(self, key, None)
+
+    def run(self, position, processor):
+        keys = processor_keys(processor)
+        output = processor(self.request)
+        unregistered = set(output) - set(keys)
+        if unregistered:
+            raise ImproperlyConfigured(
+                f"{processor.__module__}.{processor.__qualname__} returned {sorted(unregistered)}, "
+                f"which are not among its registered context keys {list(keys)}."
+            )
+        for key in keys:
+            if self.pending.get(key, (None,))[0] == position:
+                del self.pending[key]
+        for key, value in output.items():
+            if self.owners[key] == position:
+                dict.__setitem__(self, key, value)
+
+    def resolve(self, key):
+        if key in self.pending:
+            self.run(*self.pending[key])
+
+    def resolve_all(self):
+        while self.pending:
+            self.run(*next(iter(self.pending.values())))
+
+    def __missing__(self, key):
+        if key not in self.pending:
+            raise KeyError(key)
+        self.resolve(key)
+        return dict.__getitem__(self, key)
+
+    # Anything that looks at the whole output, e.g. Context.flatten(), gets all of it.
+    def __iter__(self):
+        self.resolve_all()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self.resolve_all()
+        return dict.__len__(self)
+
+    def __repr__(self):
+        self.resolve_all()
+        return dict.__repr__(self)
+
+    def keys(self):
+        self.resolve_all()
+        return dict.keys(self)
+
+    def values(self):
+        self.resolve_all()
+        return dict.values(self)
+
+    def items(self):
+        self.resolve_all()
+        return dict.items(self)
+
+    def copy(self):
+        self.resolve_all()
+        return dict(self.items())
+
+
+class LazyRequestContext(RequestContext):
+    """``RequestContext`` whose lookups run the processor of a pending key when they reach it.
+
+    Lookups stay plain dict operations otherwise: they are the hot path of
+    rendering.
+    """
+
+    _lazy_output = None
+
+    def __getitem__(self, key):
+        lazy_output = self._lazy_output
+        for d in reversed(self.dicts):
+            if key in d:
+                return d[key]
+            if d is lazy_output and key in lazy_output.pending:
+                return lazy_output[key]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, otherwise=None):
+        try:
+            return self[key]
+        except KeyError:
+            return otherwise
+
+    def new(self, values=None):
+        new_context = super().new(values)
+        new_context._lazy_output = None
+        return new_context
+
+    @contextmanager
+    def bind_template(self, template):
+        if self.template is not None:
+            raise RuntimeError("Context is already bound to a template")
+        self.template = template
+        processors = template.engine.template_context_processors + self._processors
+        self._lazy_output = LazyProcessorOutput(processors, self.request)
+        self.dicts[self._processors_index] = self._lazy_output
+        try:
+            yield
+        finally:
+            self.template = None
+            self._lazy_output = None
+            self.dicts[self._processors_index] = {}
+
+
+def make_context(context, request=None, **kwargs):
+    """``django.template.context.make_context`` with a :class:`LazyRequestContext`."""
+    if context is not None and not isinstance(context, dict):
+        raise TypeError(f"context must be a dict rather than {context.__class__.__name__}.")
+    if request is None:
+        return Context(context, **kwargs)
+    lazy_context = LazyRequestContext(request, **kwargs)
+    if context:
+        lazy_context.push(context)
+    return lazy_context
+
+
+class Template(django_backend.Template):
+    def render(self, context=None, request=None):
+        context = make_context(context, request, autoescape=self.backend.engine.autoescape)
+        try:
+            return self.template.render(context)
+        except TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self.backend)
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
@@ -0,0 +1,52 @@
+from functools import lru_cache
+from pathlib import Path
+
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from weblist.utils import assets
+
+register = template.Library()
+
+TAGS = {
+    ".css": '<link href="{}" rel="stylesheet"{}>',
+    ".js": '<script defer src="{}"{}></script>',
+}
+
+
+def source_tags(root, bundle):
+    """One tag per source of ``bundle``: vendored files from their CDN, SCSS compiled in place."""
+    html = TAGS[Path(bundle).suffix]
+    vendor = assets.load_vendor(root)
+    tags = []
+    for source in settings.ASSET_BUNDLES[bundle]:
+        if source in vendor:
+            attributes = format_html(' integrity="{}" crossorigin="anonymous"', vendor[source]["integrity"])
+            tags.append(format_html(html, vendor[source]["url"], attributes))
+        elif source.endswith(".scss"):
+            # Our own stylesheet; escaping would break its quotes.
+            tags.append(mark_safe(f"<style>{assets.compile_scss(Path(root) / source).decode()}</style>"))
+        else:
+            tags.append(format_html(html, static(source), ""))
+    return mark_safe("\n".join(tags))
+
+
+def bundle_tags(root, bundle):
+    if settings.DEBUG and assets.missing(root, [bundle]):
+        return source_tags(root, bundle)
+    return format_html(TAGS[Path(bundle).suffix], static(bundle), "")
+
+
+cached_bundle_tags = lru_cache(maxsize=None)(bundle_tags)
+
+
+@register.simple_tag
+def asset_bundle(bundle):
+    """The tag loading ``bundle``; with ``DEBUG`` on and no bundle built, one tag per source."""
+    if settings.DEBUG:
+        # Picks up a bundle built while the server runs.
+        return bundle_tags(settings.ASSETS_ROOT, bundle)
+    return cached_bundle_tags(settings.ASSETS_ROOT, bundle)
@@ -0,0 +1,59 @@
+from django import template
+from django.conf import settings
+
+from weblist.utils import fragments
+
+register = template.Library()
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, name, timeout):
+        self.nodelist = nodelist
+        self.name = name
+        self.timeout = timeout
+        self._source_version = None
+
+    def source_version(self):
+        if self._source_version is None:
+            loader = getattr(self.origin, "loader", None)
+            source = loader.get_contents(self.origin) if loader is not None else ""
+            self._source_version = fragments.source_version(source)
+        return self._source_version
+
+    def render(self, context):
+        if self.timeout is None:
+            timeout = settings.TEMPLATE_FRAGMENT_CACHE_TIMEOUT
+        else:
+            timeout = self.timeout.resolve(context)
+        if not timeout:
+            return self.nodelist.render(context)
+        cache = fragments.get_fragment_cache()
+        key = fragments.fragment_key(self.name, context.get("request"), self.source_version())
+        value = cache.get(key)
+        if value is None:
+            value = self.nodelist.render(context)
+            cache.set(key, value, timeout)
+        return value
+
+
+@register.tag
+def fragmentcache(parser, token):
+    """
+    Cache the enclosed markup per language, per anonymous or authenticated
+    visitor and per username, until the user is saved::
+
+        {% load fragment_cache %}
+        {% fragmentcache "navbar" [timeout] %}
+            .. navigation for request.user ..
+        {% endfragmentcache %}
+
+    ``timeout`` defaults to ``TEMPLATE_FRAGMENT_CACHE_TIMEOUT``; ``0`` renders
+    the block every time. Keep CSRF tokens and messages out of the block.
+    """
+    bits = token.split_contents()
+    if len(bits) not in (2, 3) or bits[1][0] not in "\"'" or bits[1][0] != bits[1][-1]:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes a quoted fragment name and an optional timeout.")
+    nodelist = parser.parse(("endfragmentcache",))
+    parser.delete_first_token()
+    timeout = parser.compile_filter(bits[2]) if len(bits) == 3 else None
+    return FragmentCacheNode(nodelist, bits[1][1:-1], timeout)
@@ -0,0 +1,151 @@
+import io
+import json
+import re
+
+import pytest
+from django.contrib.staticfiles import finders
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+
+from weblist.utils import assets
+from weblist.utils.templatetags.asset_bundle import bundle_tags
+
+VENDOR_CSS = b".btn{color:red}\n/*# sourceMappingURL=lib.min.css.map */\n"
+VENDOR_JS = b"window.lib=1;\n//# sourceMappingURL=lib.min.js.map\n"
+BUNDLES = {
+    "dist/bundle.css": ["vendor/lib.min.css", "css/site.css"],
+    "dist/bundle.js": ["vendor/lib.min.js", "js/site.min.js"],
+}
+
+
+@pytest.fixture
+def root(tmp_path):
+    (tmp_path / "vendor").mkdir()
+    (tmp_path / "css").mkdir()
+    (tmp_path / "js").mkdir()
+    (tmp_path / "vendor/lib.min.css").write_bytes(VENDOR_CSS)
+    (tmp_path / "vendor/lib.min.js").write_bytes(VENDOR_JS)
+    (tmp_path / "css/site.css").write_bytes(b".alert{margin:0}\n")
+    (tmp_path / "js/site.min.js").write_bytes(b"init()\n")
+    manifest = {
+        name: {"url": f"https://cdn.example.com/{name}", "integrity": assets.integrity(data)}
+        for name, data in (("vendor/lib.min.css", VENDOR_CSS), ("vendor/lib.min.js", VENDOR_JS))
+    }
+    (tmp_path / assets.VENDOR_MANIFEST).write_text(json.dumps(manifest))
+    return tmp_path
+
+
+def test_build_bundles_sources_in_order_without_source_maps(root):
+    outputs = assets.build(root, BUNDLES)
+
+    assert outputs == {
+        "dist/bundle.css": b".btn{color:red}\n.alert{margin:0}\n",
+        "dist/bundle.js": b"window.lib=1;;\ninit()\n",
+    }
+
+
+def test_build_refuses_modified_vendor_file(root):
+    (root / "vendor/lib.min.js").write_bytes(b"window.lib=2;\n")
+
+    with pytest.raises(assets.AssetError, match="integrity"):
+        assets.build(root, BUNDLES)
+
+
+def test_build_reports_missing_vendor_file(root):
+    (root / "vendor/lib.min.css").unlink()
+
+    with pytest.raises(assets.AssetError, match="--fetch"):
+        assets.build(root, BUNDLES)
+
+
+def test_fetch_vendor_downloads_missing_files_only(root):
+    (root / "vendor/lib.min.css").unlink()
+    requested = []
+
+    def opener(url):
+        requested.append(url)
+        return io.BytesIO(VENDOR_CSS)
+
+    assert assets.fetch_vendor(root, opener) == ["vendor/lib.min.css"]
+    assert requested == ["https://cdn.example.com/vendor/lib.min.css"]
+    assert (root / "vendor/lib.min.css").read_bytes() == VENDOR_CSS
+
+
+def test_fetch_vendor_rejects_unexpected_content(root):
+    (root / "vendor/lib.min.css").unlink()
+
+    with pytest.raises(assets.AssetError, match="does not match"):
+        assets.fetch_vendor(root, lambda url: io.BytesIO(b"tampered"))
+    assert not (root / "vendor/lib.min.css").exists()
+
+
+def test_build_assets_command_writes_and_checks_bundles(root, capsys):
+    with override_settings(ASSETS_ROOT=str(root), ASSET_BUNDLES=BUNDLES):
+        with pytest.raises(CommandError, match="Out of date"):
+            call_command("build_assets", check=True)
+        call_command("build_assets")
+        call_command("build_assets", check=True)
+
+    assert (root / "dist/bundle.css").read_bytes() == b".btn{color:red}\n.alert{margin:0}\n"
+    assert capsys.readouterr().out.splitlines()[-1].endswith("unchanged")
+
+
+@pytest.mark.parametrize("debug, check_id", [(False, "utils.E001"), (True, "utils.W001")])
+def test_check_fails_when_bundle_is_missing(root, debug, check_id):
+    with override_settings(ASSETS_ROOT=str(root), ASSET_BUNDLES=BUNDLES, DEBUG=debug):
+        call_command("build_assets")
+        (root / "dist/bundle.js").unlink()
+
+        with pytest.raises(CommandError, match="dist/bundle.js"):
+            call_command("build_assets", check=True)
+        assert [message.id for message in assets.check_bundles(None)] == [check_id]
+
+
+def test_build_compiles_scss(root, monkeypatch):
+    (root / "sass").mkdir()
+    (root / "sass/site.scss").write_text("$red: #b94a48;\n.alert { color: $red; }\n")
+    monkeypatch.setattr(assets, "compile_scss", lambda path: b".alert{color:#b94a48}\n")
+
+    outputs = assets.build(root, {"dist/bundle.css": ["vendor/lib.min.css", "sass/site.scss"]})
+
+    assert outputs["dist/bundle.css"] == b".btn{color:red}\n.alert{color:#b94a48}\n"
+
+
+def test_asset_bundle_loads_sources_only_in_debug_until_bundle_is_built(root, monkeypatch):
+    monkeypatch.setattr(assets, "compile_scss", lambda path: b'.alert{content:"!"}')
+    bundles = {**BUNDLES, "dist/bundle.css": ["vendor/lib.min.css", "sass/site.scss", "css/site.css"]}
+
+    with override_settings(ASSETS_ROOT=str(root), ASSET_BUNDLES=bundles, DEBUG=True):
+        assert bundle_tags(str(root), "dist/bundle.css") == (
+            '<link href="https://cdn.example.com/vendor/lib.min.css" rel="stylesheet" '
+            f'integrity="{assets.integrity(VENDOR_CSS)}" crossorigin="anonymous">\n'
+            '<style>.alert{content:"!"}</style>\n'
+            '<link href="/static/css/site.css" rel="stylesheet">'
+        )
+    with override_settings(ASSETS_ROOT=str(root), ASSET_BUNDLES=bundles, DEBUG=False):
+        assert bundle_tags(str(root), "dist/bundle.css") == '<link href="/static/dist/bundle.css" rel="stylesheet">'
+
+    with override_settings(ASSETS_ROOT=str(root), ASSET_BUNDLES=BUNDLES, DEBUG=True):
+        call_command("build_assets")
+        assert bundle_tags(str(root), "dist/bundle.css") == '<link href="/static/dist/bundle.css" rel="stylesheet">'
+        assert bundle_tags(str(root), "dist/bundle.js") == '<script defer src="/static/dist/bundle.js"></script>'
+
+
+@pytest.fixture
+def built_root(root, settings):
+    finders.get_finder.cache_clear()
+    dirs = [str(root), *settings.STATICFILES_DIRS]
+    with override_settings(ASSETS_ROOT=str(root), ASSET_BUNDLES=BUNDLES, STATICFILES_DIRS=dirs):
+        call_command("build_assets")
+        yield root
+    finders.get_finder.cache_clear()
+
+
+def test_base_template_loads_only_built_bundles(built_root, client):
+    content = client.get("/").content.decode()
+    paths = re.findall(r'(?:href|src)="/static/([^"]+)"', content)
+
+    assert "dist/bundle.css" in paths
+    assert "dist/bundle.js" in paths
+    assert "cdn.example.com" not in content
+    assert [path for path in paths if finders.find(path) is None] == []
@@ -0,0 +1,54 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.template.loader import render_to_string
+from django.utils.functional import SimpleLazyObject
+
+from weblist.users.models import User
+from weblist.users.tests.factories import UserFactory
+from weblist.utils.pytest_budget import Budget, BudgetExceeded
+
+pytestmark = pytest.mark.django_db
+
+
+def test_exceeded_query_budget_shows_sql_and_origin(budget):
+    UserFactory.create_batch(2)
+
+    with pytest.raises(BudgetExceeded) as excinfo:
+        with budget(queries=1):
+            for user in User.objects.all():
+                User.objects.get(pk=user.pk)
+
+    message = str(excinfo.value)
+    assert "3 queries, budget 1" in message
+    assert 'FROM "users_user"' in message
+    assert "weblist/utils/tests/test_budget.py:" in message
+
+
+def test_template_queries_are_attributed_to_the_template(budget, rf):
+    user = UserFactory()
+    request = rf.get("/")
+    request.user = AnonymousUser()
+    # Loaded on first use, i.e. by the template.
+    lazy_user = SimpleLazyObject(lambda: User.objects.get(pk=user.pk))
+
+    with pytest.raises(BudgetExceeded) as excinfo:
+        with budget(templates={"users/user_detail.html": {"queries": 0}}) as spent:
+            render_to_string("users/user_detail.html", {"object": lazy_user}, request=request)
+
+    assert len(spent.template_queries("users/user_detail.html")) == 1
+    assert "template users/user_detail.html:" in str(excinfo.value)
+
+
+def test_time_budget_respects_factor(monkeypatch):
+    monkeypatch.setenv("BUDGET_TIME_FACTOR", "0")
+    spent = Budget(ms=0)
+
+    with spent:
+        User.objects.count()
+
+    assert spent.elapsed_ms > 0
+
+
+@pytest.mark.budget(queries=1)
+def test_marker_wraps_the_test_body():
+    User.objects.count()
@@ -0,0 +1,107 @@
+import sqlite3
+import threading
+
+import pytest
+from django.conf import settings
+from django.db import OperationalError, connection, connections, transaction
+from django.db.utils import ConnectionHandler
+from django.test.utils import CaptureQueriesContext
+
+from weblist.users.models import User
+from weblist.users.tests.factories import UserFactory
+from weblist.utils.db import ReadWriteRouter, apply_pragmas
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    monkeypatch.setitem(settings.DATABASES, "replica", dict(settings.DATABASES["default"]))
+
+
+class TestReadWriteRouter:
+    def test_reads_go_to_reader(self, replica):
+        assert ReadWriteRouter().db_for_read(User) == "replica"
+
+    def test_reads_in_transaction_stay_on_writer(self, replica, monkeypatch):
+        monkeypatch.setattr(connections["default"], "in_atomic_block", True)
+
+        assert ReadWriteRouter().db_for_read(User) == "default"
+
+    def test_without_reader_leaves_default_routing(self):
+        assert ReadWriteRouter().db_for_read(User) is None
+
+    def test_writes_and_migrations_go_to_writer(self, replica):
+        router = ReadWriteRouter()
+
+        assert router.db_for_write(User) == "default"
+        assert router.allow_migrate("default", "users")
+        assert not router.allow_migrate("replica", "users")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reads_are_served_by_the_read_only_connection(live_replica):
+    user = UserFactory()
+
+    with CaptureQueriesContext(live_replica) as replica_queries:
+        assert User.objects.get(pk=user.pk) == user
+    assert len(replica_queries) == 1
+    with pytest.raises(OperationalError, match="readonly"):
+        with live_replica.cursor() as cursor:
+            cursor.execute("DELETE FROM users_user")
+
+    with transaction.atomic(), CaptureQueriesContext(live_replica) as replica_queries:
+        User.objects.filter(pk=user.pk).update(name="Renamed")
+        assert User.objects.get(pk=user.pk).name == "Renamed"
+    assert len(replica_queries) == 0
+
+
+def increment(db, times, errors):
+    try:
+        for _ in range(times):
+            # What transaction.atomic() does, with a read before the write.
+            db.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+            with db.cursor() as cursor:
+                cursor.execute("SELECT value FROM counter")
+                value = cursor.fetchone()[0]
+                cursor.execute("UPDATE counter SET value = %s", [value + 1])
+            db.commit()
+            db.set_autocommit(True)
+    except OperationalError as e:
+        errors.append(e)
+    finally:
+        db.close()
+
+
+def test_concurrent_write_transactions_wait_instead_of_failing(tmp_path, django_db_blocker):
+    handler = ConnectionHandler({"default": {"ENGINE": "weblist.utils.sqlite", "NAME": str(tmp_path / "locks.db")}})
+    errors = []
+    with django_db_blocker.unblock():
+        with handler["default"].cursor() as cursor:
+            cursor.execute("CREATE TABLE counter (value INTEGER)")
+            cursor.execute("INSERT INTO counter VALUES (0)")
+        handler["default"].close()
+
+        # Connections are per thread.
+        threads = [threading.Thread(target=lambda: increment(handler["default"], 20, errors)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with handler["default"].cursor() as cursor:
+            cursor.execute("SELECT value FROM counter")
+            assert (cursor.fetchone()[0], errors) == (120, [])
+        handler["default"].close()
+
+
+@pytest.mark.django_db
+def test_pragmas_are_applied_to_new_connections():
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA busy_timeout")
+        assert cursor.fetchone()[0] == settings.SQLITE_PRAGMAS["busy_timeout"]
+
+
+def test_apply_pragmas_enables_wal(tmp_path):
+    db = sqlite3.connect(str(tmp_path / "wal.db"))
+    apply_pragmas(db, {"journal_mode": "WAL"})
+
+    assert db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
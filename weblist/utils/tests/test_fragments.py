@@ -0,0 +1,70 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.template import TemplateSyntaxError, engines
+from django.urls import reverse
+from django.utils import translation
+
+from weblist.users.tests.factories import UserFactory
+
+TEMPLATE = '{% load fragment_cache %}{% fragmentcache "fragment" %}{{ value }}{% endfragmentcache %}'
+
+pytestmark = pytest.mark.django_db
+
+
+def render(rf, user, value, source=TEMPLATE):
+    request = rf.get("/")
+    request.user = user
+    return engines["django"].from_string(source).render({"value": value}, request)
+
+
+def test_fragment_is_cached_per_visitor(rf, user):
+    other = UserFactory()
+
+    assert render(rf, AnonymousUser(), 1) == "1"
+    assert render(rf, AnonymousUser(), 2) == "1"
+    assert render(rf, user, 3) == "3"
+    assert render(rf, user, 4) == "3"
+    assert render(rf, other, 5) == "5"
+
+
+def test_fragment_is_cached_per_language(rf, user):
+    with translation.override("en"):
+        assert render(rf, user, 1) == "1"
+    with translation.override("fr"):
+        assert render(rf, user, 2) == "2"
+    with translation.override("en"):
+        assert render(rf, user, 3) == "1"
+
+
+def test_saving_user_renders_their_fragments_again(rf, user):
+    other = UserFactory()
+    render(rf, user, 1)
+    render(rf, other, 1)
+
+    user.name = "Renamed"
+    user.save()
+
+    assert render(rf, user, 2) == "2"
+    assert render(rf, other, 2) == "1"
+
+
+def test_zero_timeout_disables_cache(rf, user, settings):
+    settings.TEMPLATE_FRAGMENT_CACHE_TIMEOUT = 0
+
+    assert render(rf, user, 1) == "1"
+    assert render(rf, user, 2) == "2"
+
+
+def test_fragment_name_must_be_quoted():
+    with pytest.raises(TemplateSyntaxError):
+        engines["django"].from_string("{% load fragment_cache %}{% fragmentcache navbar %}{% endfragmentcache %}")
+
+
+def test_navbar_follows_login(client, user):
+    assert "Sign In" in client.get(reverse("home")).content.decode()
+
+    client.force_login(user)
+    content = client.get(reverse("home")).content.decode()
+
+    assert "Sign In" not in content
+    assert reverse("users:detail", kwargs={"username": user.username}) in content
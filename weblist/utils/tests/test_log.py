@@ -0,0 +1,212 @@
+import io
+import json
+import logging
+import sys
+import threading
+import time
+
+import pytest
+from django.urls import reverse
+
+from weblist.utils.log import (
+    AdminDigestHandler,
+    JSONFormatter,
+    QueueStreamHandler,
+    SamplingFilter,
+    fingerprint,
+    request_context,
+)
+
+
+def raise_error(message):
+    raise ValueError(message)
+
+
+def error_record(message="boom"):
+    try:
+        raise_error(message)
+    except ValueError:
+        record = logging.getLogger("django.request").makeRecord(
+            "django.request", logging.ERROR, __file__, 1, "Internal Server Error: /", (), None
+        )
+        record.exc_info = sys.exc_info()
+        return record
+
+
+@pytest.fixture
+def handler():
+    handler = AdminDigestHandler(window=3600)
+    yield handler
+    handler.close()
+
+
+def test_fingerprint_groups_same_traceback():
+    assert fingerprint(error_record("a")) == fingerprint(error_record("b"))
+
+
+def test_fingerprint_separates_log_sites():
+    first = logging.makeLogRecord({"msg": "Slow query", "lineno": 10})
+    second = logging.makeLogRecord({"msg": "Slow query", "lineno": 11})
+    assert fingerprint(first) != fingerprint(second)
+
+
+def test_digest_per_fingerprint(handler, mailoutbox, settings):
+    settings.ADMINS = [("Admin", "admin@example.com")]
+
+    for _ in range(3):
+        handler.handle(error_record())
+    handler.handle(logging.makeLogRecord({"levelname": "ERROR", "msg": "Something else"}))
+    assert mailoutbox == []
+
+    handler.flush()
+
+    subjects = sorted(message.subject for message in mailoutbox)
+    assert subjects == [
+        "[Django] ERROR (1x): Something else",
+        "[Django] ERROR (3x): Internal Server Error: /",
+    ]
+    assert "3 occurrence(s)" in mailoutbox[0].body + mailoutbox[1].body
+    assert "ValueError: boom" in mailoutbox[0].body + mailoutbox[1].body
+
+
+def test_emit_drops_instead_of_blocking(handler, mailoutbox):
+    handler.maxsize = 1
+    handler._pid = None
+    handler._listen = lambda: time.sleep(3600)
+
+    start = time.monotonic()
+    for _ in range(5):
+        handler.handle(error_record())
+
+    assert time.monotonic() - start < 1
+    assert handler.dropped == 4
+
+
+class BlockedStream(io.StringIO):
+    """Stream whose writes wait until ``release`` is set, like a stalled stdout."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.release.wait()
+        return super().write(text)
+
+
+@pytest.fixture
+def stream_handler():
+    handler = QueueStreamHandler(io.StringIO())
+    handler.setFormatter(JSONFormatter())
+    yield handler
+    handler.close()
+
+
+def lines(handler):
+    handler.flush()
+    return [json.loads(line) for line in handler.target.stream.getvalue().splitlines()]
+
+
+def test_json_lines_with_extra_fields_and_exception(stream_handler):
+    logger = logging.getLogger("weblist.tests.json")
+    record = logger.makeRecord(logger.name, logging.INFO, __file__, 1, "Took %dms", (12,), None, extra={"view": "home"})
+    stream_handler.handle(record)
+    stream_handler.handle(error_record())
+
+    info, error = lines(stream_handler)
+
+    assert info["message"] == "Took 12ms"
+    assert info["view"] == "home"
+    assert info["level"] == "INFO"
+    assert "ValueError: boom" in error["exception"]
+
+
+def test_queue_drops_and_counts_under_backpressure():
+    handler = QueueStreamHandler(BlockedStream(), maxsize=2)
+    handler.setFormatter(JSONFormatter())
+    try:
+        start = time.monotonic()
+        for number in range(10):
+            handler.handle(logging.makeLogRecord({"msg": f"record {number}"}))
+        assert time.monotonic() - start < 1
+        assert handler.dropped >= 7
+
+        handler.target.stream.release.set()
+        written = lines(handler)
+    finally:
+        handler.close()
+
+    assert written[-1]["message"] == f"Dropped {handler.dropped} log records, the log queue was full"
+    assert len(written) == 10 - handler.dropped + 1
+
+
+def test_flush_keeps_the_listener_running(stream_handler):
+    for number in range(50):
+        stream_handler.handle(logging.makeLogRecord({"msg": f"record {number}"}))
+    thread = stream_handler.listener._thread
+
+    assert len(lines(stream_handler)) == 50
+    assert stream_handler.listener._thread is thread
+
+
+def test_drops_counted_across_threads():
+    handler = QueueStreamHandler(BlockedStream(), maxsize=1)
+    handler.setFormatter(JSONFormatter())
+
+    def log():
+        for number in range(250):
+            handler.handle(logging.makeLogRecord({"msg": f"record {number}"}))
+
+    try:
+        threads = [threading.Thread(target=log) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        handler.target.stream.release.set()
+        written = lines(handler)
+    finally:
+        handler.close()
+
+    reported = sum(line.get("dropped", 0) for line in written)
+    assert reported == handler.dropped
+    assert len(written) - 1 + handler.dropped == 1000
+
+
+def test_sampling_keeps_warnings_and_whole_requests():
+    sampling = SamplingFilter({"weblist.transactions": 0.5, "weblist.transactions.quiet": 0})
+
+    def record(name, level=logging.INFO):
+        return logging.makeLogRecord({"name": name, "levelno": level})
+
+    assert sampling.filter(record("weblist.transactions", logging.WARNING))
+    assert sampling.filter(record("weblist.users"))
+    assert not sampling.filter(record("weblist.transactions.quiet.sub"))
+    kept = []
+    for number in range(200):
+        token = request_context.set({"id": f"request-{number}"})
+        try:
+            first = sampling.filter(record("weblist.transactions"))
+            assert sampling.filter(record("weblist.transactions")) == first
+            kept.append(first)
+        finally:
+            request_context.reset(token)
+    assert 60 < sum(kept) < 140
+
+
+@pytest.mark.django_db
+def test_request_context_in_records(client, user, stream_handler):
+    logger = logging.getLogger("weblist.transactions")
+    logger.addHandler(stream_handler)
+    client.force_login(user)
+    try:
+        response = client.get(reverse("users:detail", kwargs={"username": user.username}), HTTP_X_REQUEST_ID="abc")
+    finally:
+        logger.removeHandler(stream_handler)
+
+    (line,) = lines(stream_handler)
+    assert response["X-Request-ID"] == "abc"
+    assert line["request_id"] == "abc"
+    assert line["user_id"] == user.pk
+    assert line["route"] == "users:detail"
+    assert line["elapsed_ms"] > 0
@@ -0,0 +1,124 @@
+import json
+import os
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+from weblist.users.models import User
+from weblist.utils import metrics
+from weblist.utils.middleware import PerformanceMiddleware
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def fresh_store(monkeypatch):
+    monkeypatch.setattr(metrics, "store", metrics.Store())
+
+
+def server_timing(response):
+    return dict(
+        (entry.split(";")[0], entry) for entry in response["Server-Timing"].split(", ")
+    )
+
+
+def test_staff_get_server_timing(admin_client):
+    response = admin_client.get(reverse("about"))
+
+    timing = server_timing(response)
+    assert {"total", "db", "template", "view", "cache", "mw-SessionMiddleware"} <= set(timing)
+    assert float(timing["template"].split("dur=")[1]) > 0
+
+
+def test_others_do_not(client, user: User):
+    assert "Server-Timing" not in client.get(reverse("about"))
+    client.force_login(user)
+    assert "Server-Timing" not in client.get(reverse("about"))
+
+
+def test_metrics_endpoint(client, admin_client, settings):
+    admin_client.get(reverse("users:detail", kwargs={"username": "admin"}))
+    settings.METRICS_TOKEN = "secret"
+
+    assert client.get(reverse("metrics")).status_code == 403
+    response = client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret")
+
+    body = response.content.decode()
+    assert response.status_code == 200
+    assert 'weblist_request_duration_seconds_count{route="users:detail"} 1' in body
+    assert 'weblist_request_db_queries_bucket{route="users:detail",le="+Inf"} 1' in body
+    assert 'weblist_middleware_seconds_total{middleware="AuthenticationMiddleware"}' in body
+
+
+def test_metrics_endpoint_is_closed_without_token(client, admin_client, user, settings):
+    settings.METRICS_TOKEN = ""
+
+    assert client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer ").status_code == 403
+    client.force_login(user)
+    assert client.get(reverse("metrics")).status_code == 403
+    assert admin_client.get(reverse("metrics")).status_code == 200
+
+
+def test_cache_lookups_are_counted():
+    token = metrics.current.set(metrics.RequestMetrics())
+    try:
+        cache.set("present", 1)
+        assert cache.get("present") == 1
+        assert cache.get("absent", "default") == "default"
+        assert cache.get_many(["present", "absent"]) == {"present": 1}
+        request_metrics = metrics.current.get()
+    finally:
+        metrics.current.reset(token)
+
+    assert (request_metrics.cache_hits, request_metrics.cache_misses) == (2, 2)
+
+
+def test_async_requests_count_queries_made_in_threads(rf: RequestFactory):
+    async def view(request):
+        await sync_to_async(User.objects.count, thread_sensitive=True)()
+        return HttpResponse()
+
+    middleware = PerformanceMiddleware(view)
+    request = rf.get("/")
+
+    async_to_sync(middleware)(request)
+
+    histograms, _ = metrics.store.collect()
+    series = histograms[("weblist_request_db_queries", (("route", "unmatched"),))]
+    assert series[-2:] == [1, 1]
+
+
+def test_processes_are_summed_through_files(settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path)
+    request_metrics = metrics.RequestMetrics()
+    request_metrics.db_queries = 2
+    first, second = metrics.Store(), metrics.Store()
+    first.record("home", request_metrics)
+    second.record("home", request_metrics)
+    second.pid += 1  # as if recorded by another worker
+    second.flush()
+
+    histograms, _ = first.collect()
+
+    assert histograms[("weblist_request_db_queries", (("route", "home"),))][-2:] == [4, 2]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        f"{first.pid}.metrics",
+        f"{second.pid}.metrics",
+    ]
+    assert json.loads((tmp_path / f"{first.pid}.metrics").read_text())["histograms"]
+
+
+def test_metrics_dir_writable_by_others_is_refused(settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path / "metrics")
+    assert metrics.metrics_dir() == settings.METRICS_DIR
+    assert os.stat(settings.METRICS_DIR).st_mode & 0o077 == 0
+
+    os.chmod(settings.METRICS_DIR, 0o777)
+
+    with pytest.raises(ImproperlyConfigured, match="METRICS_DIR"):
+        metrics.store.collect()
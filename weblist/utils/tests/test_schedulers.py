@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django_celery_beat.models import IntervalSchedule, PeriodicTask
+
+from config.celery_app import app as celery_app
+from weblist.utils.beat import get_schedule_marker
+from weblist.utils.db import QueryCounter
+from weblist.utils.schedulers import CachedDatabaseScheduler
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture
+def scheduler():
+    every_minute = IntervalSchedule.objects.create(every=1, period=IntervalSchedule.MINUTES)
+    PeriodicTask.objects.create(name="ping", task="weblist.users.tasks.get_users_count", interval=every_minute)
+    scheduler = CachedDatabaseScheduler(app=celery_app)
+    scheduler.schedule  # initial read
+    yield scheduler
+    scheduler.close()
+
+
+def test_unchanged_schedule_is_read_from_memory(scheduler):
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(10):
+            scheduler.schedule
+
+    assert queries.captured_queries == []
+
+
+def test_saving_a_task_reloads_the_schedule(scheduler):
+    marker = get_schedule_marker()
+    PeriodicTask.objects.filter(name="ping").update(enabled=False)
+    PeriodicTask.objects.get(name="ping").save()
+
+    assert get_schedule_marker() != marker
+    assert "ping" not in scheduler.schedule
+
+
+def test_sync_batches_run_state(scheduler):
+    entry = scheduler.schedule["ping"]
+    scheduler.reserve(entry)
+    scheduler.reserve(scheduler.schedule["ping"])
+
+    with CaptureQueriesContext(connection) as queries:
+        scheduler.sync()
+
+    writes = [q for q in queries.captured_queries if q["sql"].startswith(("SELECT", "UPDATE"))]
+    assert len(writes) == 1 and writes[0]["sql"].startswith("UPDATE")
+    task = PeriodicTask.objects.get(name="ping")
+    assert task.total_run_count == 2
+    assert timezone.now() - task.last_run_at < timedelta(minutes=1)
+    assert scheduler._dirty == set()
+
+
+def test_query_counter(scheduler):
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        PeriodicTask.objects.count()
+        PeriodicTask.objects.update(description="")
+
+    assert (counter.queries, counter.writes) == (2, 1)
+    assert scheduler.query_counter.queries >= 2
+
+
+def test_query_counter_covers_every_alias(live_replica):
+    scheduler = CachedDatabaseScheduler(app=celery_app)
+    counted = scheduler.query_counter.queries
+
+    PeriodicTask.objects.using("replica").count()
+    PeriodicTask.objects.using("default").count()
+    assert scheduler.query_counter.queries == counted + 2
+
+    scheduler.close()
+    assert scheduler.query_counter not in live_replica.execute_wrappers
+    assert scheduler.query_counter not in connection.execute_wrappers
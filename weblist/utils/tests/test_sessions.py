@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from weblist.utils.sessions import SessionStore
+
+pytestmark = pytest.mark.django_db
+
+
+def session_writes(queries):
+    return [
+        q["sql"]
+        for q in queries.captured_queries
+        if "django_session" in q["sql"] and not q["sql"].startswith("SELECT")
+    ]
+
+
+@pytest.fixture
+def session():
+    cache.clear()
+    session = SessionStore()
+    session["cart"] = [1, 2]
+    session.save()
+    return SessionStore(session.session_key)
+
+
+def test_unchanged_data_is_not_rewritten(session):
+    session["cart"] = [1, 2]
+
+    with CaptureQueriesContext(connection) as queries:
+        session.save()
+
+    assert session_writes(queries) == []
+
+
+def test_changed_data_is_written_through(session):
+    session["cart"] = [1, 2, 3]
+    session.save()
+
+    cache.clear()
+    assert SessionStore(session.session_key)["cart"] == [1, 2, 3]
+
+
+def test_expiry_refresh_is_coalesced(session, settings):
+    settings.SESSION_DB_REFRESH_INTERVAL = 3600
+    session.load()
+    row_expiry = Session.objects.get(pk=session.session_key).expire_date
+
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(5):
+            store = SessionStore(session.session_key)
+            store.load()
+            store.save()
+
+    assert session_writes(queries) == []
+    assert Session.objects.get(pk=session.session_key).expire_date == row_expiry
+
+
+def test_stale_expiry_is_written(session, settings):
+    settings.SESSION_DB_REFRESH_INTERVAL = 3600
+    stale = timezone.now() + timedelta(minutes=30)
+    Session.objects.filter(pk=session.session_key).update(expire_date=stale)
+    cache.clear()
+
+    session.load()
+    session.save()
+
+    assert Session.objects.get(pk=session.session_key).expire_date > stale
+
+
+def test_falls_back_to_database(session):
+    cache.clear()
+
+    assert session["cart"] == [1, 2]
+
+
+def test_cycle_key_keeps_data(session):
+    old_key = session.session_key
+    session.cycle_key()
+
+    assert session.session_key != old_key
+    assert SessionStore(session.session_key)["cart"] == [1, 2]
+    assert not Session.objects.filter(pk=old_key).exists()
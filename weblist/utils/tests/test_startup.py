@@ -0,0 +1,41 @@
+from django.core.management import call_command
+from django_celery_beat.admin import TaskSelectWidget
+
+from weblist.utils.management.commands.startup_profile import parse_importtime, profile
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       150 |        150 |     _io
+import time:      1200 |       1350 |   django.utils
+import time:       300 |       1650 | django
+"""
+
+
+def test_parse_importtime():
+    assert parse_importtime(IMPORTTIME) == [
+        ("_io", 2, 150, 150),
+        ("django.utils", 1, 1200, 1350),
+        ("django", 0, 300, 1650),
+    ]
+
+
+def test_django_setup_does_not_create_celery_app():
+    _, imports = profile("command", repeat=1)
+    modules = {module for module, _, _, _ in imports}
+
+    assert "django.apps" in modules
+    assert "config.celery_app" not in modules
+
+
+def test_startup_profile_command(capsys):
+    call_command("startup_profile", "command", repeat=1, top=3)
+
+    out = capsys.readouterr().out
+    assert out.startswith("command: ")
+    assert "by package (self time)" in out
+
+
+def test_celery_beat_admin_lists_project_tasks():
+    choices = dict(TaskSelectWidget().tasks_as_choices())
+
+    assert "weblist.users.tasks.get_users_count" in choices
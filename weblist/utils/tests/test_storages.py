@@ -0,0 +1,87 @@
+import os
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+
+from weblist.utils import storages
+
+STORAGE = "weblist.utils.storages.ParallelCompressedManifestStaticFilesStorage"
+SERIAL_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+
+
+@pytest.fixture
+def source(tmp_path):
+    directory = tmp_path / "source"
+    (directory / "css").mkdir(parents=True)
+    (directory / "js").mkdir()
+    (directory / "images").mkdir()
+    (directory / "images/logo.png").write_bytes(b"\x89PNG" + bytes(range(256)))
+    (directory / "css/site.css").write_text("body { background: url('../images/logo.png'); }\n" * 50)
+    for number in range(12):
+        (directory / f"js/module{number}.js").write_text(f"function module{number}() {{ return {number}; }}\n" * 40)
+    return directory
+
+
+def collect(source, root, storage, workers=2):
+    with override_settings(
+        STATICFILES_DIRS=[str(source)],
+        STATICFILES_FINDERS=["django.contrib.staticfiles.finders.FileSystemFinder"],
+        STATICFILES_STORAGE=storage,
+        STATICFILES_COMPRESS_WORKERS=workers,
+        STATIC_ROOT=str(root),
+    ):
+        call_command("collectstatic", interactive=False, verbosity=0)
+
+
+def tree(root):
+    files = {}
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            with open(path, "rb") as f:
+                files[os.path.relpath(path, root)] = f.read()
+    return files
+
+
+def test_output_matches_serial_storage(source, tmp_path):
+    collect(source, tmp_path / "serial", SERIAL_STORAGE)
+    collect(source, tmp_path / "parallel", STORAGE)
+
+    parallel = tree(tmp_path / "parallel")
+    assert parallel == tree(tmp_path / "serial")
+    assert "js/module0.js.gz" in parallel
+    assert "images/logo.png.gz" not in parallel
+
+
+def test_unchanged_files_are_not_compressed_again(source, tmp_path, monkeypatch):
+    root = tmp_path / "static"
+    collect(source, root, STORAGE, workers=1)
+    compressed = []
+    compress_file = storages.compress_file
+    monkeypatch.setattr(
+        storages, "compress_file", lambda path, extensions: compressed.append(path) or compress_file(path, extensions)
+    )
+    (source / "js/module3.js").write_text("function changed() {}\n" * 40)
+    # collectstatic copies only files modified in a later second.
+    os.utime(source / "js/module3.js", (os.stat(source).st_mtime + 5,) * 2)
+
+    collect(source, root, STORAGE, workers=1)
+
+    names = [os.path.relpath(path, root) for path in compressed]
+    assert len(names) == 2
+    assert all(name.startswith("js/module3.") for name in names)
+    collect(source, tmp_path / "serial", SERIAL_STORAGE)
+    serial = tree(tmp_path / "serial")
+    rerun = tree(root)
+    assert {name: rerun[name] for name in serial} == serial
+
+
+def test_missing_compressed_file_is_compressed_again(source, tmp_path):
+    root = tmp_path / "static"
+    collect(source, root, STORAGE, workers=1)
+    os.remove(root / "js/module5.js.gz")
+
+    collect(source, root, STORAGE, workers=1)
+
+    assert (root / "js/module5.js.gz").exists()
@@ -0,0 +1,98 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.exceptions import ImproperlyConfigured
+from django.template import engines
+
+from weblist.utils.templates import DjangoTemplates, LazyProcessorOutput, context_keys, processor_keys
+
+calls = []
+
+
+@context_keys("greeting", "shout")
+def greeting(request):
+    calls.append("greeting")
+    return {"greeting": "hello", "shout": "HELLO"}
+
+
+@context_keys("greeting")
+def override(request):
+    calls.append("override")
+    return {"greeting": "hi"}
+
+
+def unregistered(request):
+    calls.append("unregistered")
+    return {"always": "there"}
+
+
+@context_keys("declared")
+def undeclared(request):
+    return {"declared": 1, "surprise": 2}
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+
+
+def render(source, context=None, processors=("weblist.utils.tests.test_templates.greeting",), rf=None):
+    backend = DjangoTemplates(
+        {
+            "NAME": "lazy",
+            "DIRS": [],
+            "APP_DIRS": False,
+            "OPTIONS": {"context_processors": list(processors)},
+        }
+    )
+    return backend.from_string(source).render(context, rf.get("/"))
+
+
+def test_processor_runs_only_when_a_template_uses_its_keys(rf):
+    assert render("{{ other }}", rf=rf) == ""
+    assert calls == []
+
+    assert render("{{ greeting }} {{ shout }} {{ greeting }}", rf=rf) == "hello HELLO hello"
+    assert calls == ["greeting"]
+
+
+def test_view_context_is_found_before_processors(rf):
+    assert render("{{ greeting }}", {"greeting": "from view"}, rf=rf) == "from view"
+    assert calls == []
+
+
+def test_last_processor_wins_as_with_eager_merge(rf):
+    processors = [f"weblist.utils.tests.test_templates.{name}" for name in ("greeting", "override", "unregistered")]
+
+    assert render("{{ greeting }} {{ shout }}", processors=processors, rf=rf) == "hi HELLO"
+    assert calls == ["unregistered", "override", "greeting"]
+
+
+def test_unregistered_key_is_an_error(rf):
+    output = LazyProcessorOutput([undeclared], rf.get("/"))
+
+    with pytest.raises(ImproperlyConfigured, match="surprise"):
+        output["declared"]
+
+
+def test_whole_output_is_available_to_flatten(rf):
+    request = rf.get("/")
+    expected = {"greeting": "hello", "shout": "HELLO", "always": "there"}
+
+    assert dict(LazyProcessorOutput([greeting, unregistered], request).items()) == expected
+    assert {**LazyProcessorOutput([greeting, unregistered], request)} == expected
+
+
+def test_registered_keys_match_configured_processors(rf, settings):
+    settings.DEBUG = True
+    settings.INTERNAL_IPS = ["127.0.0.1"]
+    request = rf.get("/")
+    request.user = AnonymousUser()
+    request.session = {}
+    request._messages = FallbackStorage(request)
+    engine = engines["django"].engine
+
+    for processor in engine.template_context_processors:
+        path = f"{processor.__module__}.{processor.__qualname__}"
+        assert processor_keys(processor) is not None, path
+        assert set(processor(request)) == set(processor_keys(processor)), path
@@ -0,0 +1,71 @@
+import logging
+
+import pytest
+from django.db import connection
+from django.urls import include, path, resolve, reverse
+
+from weblist.users.models import User
+from weblist.utils.transactions import (
+    ATOMIC,
+    NON_ATOMIC,
+    READ_ONLY,
+    apply_transaction_policy,
+    get_transaction_policy,
+)
+
+
+@pytest.mark.parametrize(
+    "url, policy",
+    [
+        ("/", READ_ONLY),
+        ("/about/", READ_ONLY),
+        ("/users/~redirect/", READ_ONLY),
+        ("/users/someone/", READ_ONLY),
+        ("/users/~update/", ATOMIC),
+        ("/accounts/signup/", ATOMIC),
+    ],
+)
+def test_configured_policies(url, policy):
+    view = resolve(url).func
+
+    assert get_transaction_policy(view) == policy
+    # The request transaction, if any, is opened by the view itself.
+    assert connection.alias in view._non_atomic_requests
+
+
+def test_namespace_marks_every_view():
+    def view(request):
+        pass
+
+    patterns = [path("api/", include(([path("a/", view, name="a")], "api")))]
+    apply_transaction_policy(patterns, non_atomic=["api"])
+
+    assert get_transaction_policy(view) == NON_ATOMIC
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("method, atomic", [("get", False), ("head", False), ("post", True), ("delete", True)])
+def test_default_views_are_atomic_only_for_unsafe_methods(rf, method, atomic):
+    seen = []
+
+    def view(request):
+        seen.append(connection.in_atomic_block)
+
+    patterns = apply_transaction_policy([path("a/", view, name="a")])
+    patterns[0].callback(getattr(rf, method)("/a/"))
+
+    assert seen == [atomic]
+    assert get_transaction_policy(patterns[0].callback) == ATOMIC
+
+
+@pytest.mark.django_db
+def test_middleware_logs_policy_and_duration(client, user: User, caplog):
+    client.force_login(user)
+
+    with caplog.at_level(logging.INFO, logger="weblist.transactions"):
+        client.get(reverse("users:detail", kwargs={"username": user.username}))
+        client.get(reverse("users:update"))
+        client.post(reverse("users:update"), {"name": "Renamed"})
+
+    records = [(r.view, r.transaction_policy) for r in caplog.records if r.name == "weblist.transactions"]
+    assert records == [("users:detail", READ_ONLY), ("users:update", "autocommit"), ("users:update", ATOMIC)]
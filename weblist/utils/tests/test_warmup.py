@@ -0,0 +1,123 @@
+import logging
+from types import SimpleNamespace
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.template import engines
+
+from config import gunicorn
+from weblist.utils import metrics, warmup
+
+
+def test_template_names_include_project_and_app_templates():
+    names = warmup.template_names()
+
+    assert "base.html" in names
+    assert "account/login.html" in names
+    assert "admin/base.html" in names
+
+
+def test_warm_templates_fills_cached_loader():
+    engine = engines["django"].engine
+    loader = engine.template_loaders[0]
+    loader.reset()
+
+    assert warmup.warm_templates(["base.html", "pages/home.html"]) == 2
+    assert {"base.html", "pages/home.html"} <= {key.split("-")[0] for key in loader.get_template_cache}
+
+
+@pytest.mark.django_db
+def test_warm_up_reports_every_step(monkeypatch):
+    closed = []
+    monkeypatch.setattr(warmup.connections, "close_all", lambda: closed.append(True))
+
+    timings = warmup.warm_up()
+
+    assert list(timings) == [name for name, _ in warmup.STEPS]
+    assert timings["templates"][0] > 0
+    assert closed
+
+
+def test_default_workers_bounded_by_memory(monkeypatch):
+    monkeypatch.setattr(gunicorn, "cpu_count", lambda: 4)
+    monkeypatch.setattr(gunicorn, "memory_limit", lambda: 1024 * gunicorn.MB)
+
+    assert gunicorn.default_workers(worker_mb=100) == 7
+    assert gunicorn.default_workers(worker_mb=300) == 2
+    assert gunicorn.default_workers(worker_mb=4096) == 1
+
+
+def test_post_request_recycles_worker_over_rss_limit(monkeypatch):
+    monkeypatch.setattr(warmup, "worker_steps", lambda: [])
+    worker = SimpleNamespace(pid=1, alive=True, log=logging.getLogger("gunicorn.test"))
+    gunicorn.post_fork(None, worker)
+    monkeypatch.setattr(gunicorn, "max_worker_rss_mb", 10_000)
+
+    gunicorn.post_request(worker, None, {}, None)
+    assert worker.alive
+
+    monkeypatch.setattr(gunicorn, "max_worker_rss_mb", 1)
+    gunicorn.post_request(worker, None, {}, None)
+    assert not worker.alive
+    assert worker.requests_served == 2
+
+
+@pytest.mark.django_db
+def test_warm_route_renders_page_without_recording_metrics(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(metrics.store, "record", lambda *args: recorded.append(args))
+
+    assert warmup.warm_route("home") == 1
+    assert recorded == []
+
+
+@pytest.mark.parametrize("proxy_header", [None, ("HTTP_X_FORWARDED_PROTO", "https")])
+def test_route_request_is_secure_get_on_allowed_host(settings, proxy_header):
+    settings.ALLOWED_HOSTS = [".example.com", "*"]
+    settings.SECURE_PROXY_SSL_HEADER = proxy_header
+
+    request = warmup.route_request("/about/")
+
+    assert request.method == "GET"
+    assert request.get_host() == "example.com"
+    assert request.is_secure()
+    assert request.build_absolute_uri() == "https://example.com/about/"
+
+
+@pytest.mark.django_db
+def test_warm_route_reports_failed_page(monkeypatch, caplog):
+    monkeypatch.setattr(warmup, "reverse", lambda name: "/missing/")
+
+    assert warmup.warm_route("missing") == 0
+    assert "Warm-up of missing failed with status 404" in caplog.text
+
+
+@pytest.mark.django_db
+def test_warmup_command_reports_each_step(capsys):
+    call_command("warmup", routes=["home", "about"])
+
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split()[0] for line in lines[:3]] == ["url_resolvers", "templates", "translations"]
+    assert any(line.startswith("route about") for line in lines)
+    assert lines[-1].startswith("total")
+
+
+@pytest.mark.django_db
+def test_warmup_command_fails_on_page_that_does_not_render(monkeypatch):
+    monkeypatch.setattr(warmup, "warm_route", lambda name: 0)
+
+    with pytest.raises(CommandError, match="home"):
+        call_command("warmup", routes=["home"])
+
+
+@pytest.mark.django_db
+def test_post_fork_warms_worker(settings, caplog):
+    settings.WARMUP_ROUTES = ["home"]
+    worker = SimpleNamespace(pid=1, log=logging.getLogger("gunicorn.test"))
+
+    with caplog.at_level(logging.INFO, logger="gunicorn.test"):
+        gunicorn.post_fork(None, worker)
+
+    assert "Worker 1 warm-up route home: 1 in" in caplog.text
+    assert "Worker 1 warm-up shared_cache: 1 in" in caplog.text
+    assert worker.requests_served == 0
@@ -0,0 +1,84 @@
+"""
+Declarative transaction policy for views and URL patterns.
+
+``ATOMIC_REQUESTS`` wraps every view in a transaction, which on ``base.db``
+holds SQLite's single write lock until the view returns. So the views of
+:func:`apply_transaction_policy` open it only for requests that may write: GET,
+HEAD and OPTIONS requests run without one, and their queries also reach the
+read-only connection (see ``weblist.utils.db.ReadWriteRouter``). A view that
+writes on GET has to use ``transaction.atomic`` itself. Views that never write
+are marked :func:`read_only` and views that manage their own transactions
+:func:`non_atomic`; neither runs in a request transaction.
+"""
+import asyncio
+from contextlib import ExitStack
+from functools import wraps
+
+from django.db import connections, transaction
+from django.urls import URLResolver
+
+ATOMIC = "atomic"
+READ_ONLY = "read_only"
+NON_ATOMIC = "non_atomic"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def _mark(view, policy):
+    view = transaction.non_atomic_requests(view)
+    view.transaction_policy = policy
+    return view
+
+
+def read_only(view):
+    """Run ``view`` without a request transaction; it must not write."""
+    return _mark(view, READ_ONLY)
+
+
+def non_atomic(view):
+    """Run ``view`` without a request transaction; it handles its own."""
+    return _mark(view, NON_ATOMIC)
+
+
+def atomic_unless_safe(view):
+    """Run ``view`` in the ``ATOMIC_REQUESTS`` transactions, except for GET, HEAD and OPTIONS."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            return view(request, *args, **kwargs)
+        with ExitStack() as stack:
+            for db in connections.all():
+                if db.settings_dict["ATOMIC_REQUESTS"]:
+                    stack.enter_context(transaction.atomic(using=db.alias))
+            return view(request, *args, **kwargs)
+
+    return _mark(wrapper, ATOMIC)
+
+
+def get_transaction_policy(view):
+    return getattr(view, "transaction_policy", ATOMIC)
+
+
+def apply_transaction_policy(patterns, read_only=(), non_atomic=(), namespace=None):
+    """Mark views in ``patterns`` by URL name, e.g. ``"home"`` or ``"users:detail"``.
+
+    A bare namespace such as ``"users"`` marks every view included under it.
+    Other views are wrapped by :func:`atomic_unless_safe`.
+    """
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            nested = namespace
+            if pattern.namespace:
+                nested = f"{namespace}:{pattern.namespace}" if namespace else pattern.namespace
+            apply_transaction_policy(pattern.url_patterns, read_only, non_atomic, nested)
+            continue
+        name = f"{namespace}:{pattern.name}" if namespace else pattern.name
+        if name in read_only or namespace in read_only:
+            _mark(pattern.callback, READ_ONLY)
+        elif name in non_atomic or namespace in non_atomic:
+            _mark(pattern.callback, NON_ATOMIC)
+        elif not hasattr(pattern.callback, "transaction_policy") and not asyncio.iscoroutinefunction(pattern.callback):
+            # Views shared by several patterns are wrapped once; Django
+            # refuses async views under ATOMIC_REQUESTS itself.
+            pattern.callback = atomic_unless_safe(pattern.callback)
+    return patterns
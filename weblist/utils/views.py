@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from weblist.utils import metrics
+
+
+def metrics_view(request):
+    """Request metrics of all workers in the Prometheus text format.
+
+    Scrapers send ``METRICS_TOKEN`` as a bearer token; staff users may read it
+    from a browser. Everyone else is refused, as is every scraper while no
+    token is set.
+    """
+    token = settings.METRICS_TOKEN
+    authorized = bool(token) and constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}")
+    if not (authorized or request.user.is_staff):
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render_prometheus(*metrics.store.collect()), content_type="text/plain; version=0.0.4")
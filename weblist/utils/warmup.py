@@ -0,0 +1,172 @@
+"""
+Build per-process caches before a process starts serving requests.
+
+``config/gunicorn.py`` runs :func:`warm_up` in the master process before it
+forks, so compiled templates, URL patterns and translation catalogs are built
+once and shared copy-on-write by every worker instead of being rebuilt by each
+worker on its first requests.
+
+Each worker then runs :func:`worker_steps` before it accepts a request: it
+renders the ``WARMUP_ROUTES`` pages through the whole middleware stack, which
+opens its own database and cache connections and fills its fragment cache,
+and runs the ``WARMUP_CACHE_FILLERS`` that fill the shared cache. ``manage.py
+warmup`` runs all of it in the release step.
+"""
+import io
+import logging
+import os
+import sys
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.handlers.base import BaseHandler
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.template import TemplateSyntaxError, engines
+from django.template.loader import get_template
+from django.urls import get_resolver, reverse
+from django.utils import translation
+from django.utils.module_loading import import_string
+
+from weblist.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = (".html", ".txt")
+
+
+def warm_url_resolvers():
+    resolver = get_resolver()
+    # Each of these populates the whole tree of included resolvers.
+    resolver.reverse_dict
+    resolver.namespace_dict
+    resolver.app_dict
+    return len(resolver.reverse_dict)
+
+
+def template_names():
+    """Names of every template the configured loaders can find."""
+    names = set()
+    for engine in engines.all():
+        for loader in getattr(engine, "engine", engine).template_loaders:
+            for child in getattr(loader, "loaders", [loader]):
+                for directory in child.get_dirs():
+                    for root, _, files in os.walk(directory):
+                        for filename in files:
+                            if filename.endswith(TEMPLATE_EXTENSIONS):
+                                names.add(os.path.relpath(os.path.join(root, filename), directory))
+    return sorted(names)
+
+
+def warm_templates(names=None):
+    """Compile ``names``, or every template found, into the cached loader."""
+    compiled = 0
+    for name in template_names() if names is None else names:
+        try:
+            get_template(name)
+        except TemplateSyntaxError:
+            # Templates of optional apps may use tag libraries that are not
+            # installed; they fail the same way on first real use.
+            continue
+        compiled += 1
+    return compiled
+
+
+def warm_translations():
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.gettext("")
+    return 1
+
+
+def release_connections():
+    """Close connections opened while warming so no socket is shared across a fork."""
+    connections.close_all()
+    for cache in caches.all():
+        cache.close()
+    return 0
+
+
+def warmup_host():
+    for host in settings.ALLOWED_HOSTS:
+        if host != "*":
+            return host.lstrip(".")
+    return "localhost"
+
+
+def route_request(path):
+    """An anonymous HTTPS GET of ``path`` on the first allowed host."""
+    host = warmup_host()
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "SCRIPT_NAME": "",
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SERVER_NAME": host,
+        "SERVER_PORT": "443",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": host,
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "https",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": False,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    if settings.SECURE_PROXY_SSL_HEADER:
+        # Behind a proxy only its header makes the request secure.
+        header, value = settings.SECURE_PROXY_SSL_HEADER
+        environ[header] = value
+    return WSGIRequest(environ)
+
+
+def warm_route(name):
+    """Render the page of URL ``name`` for an anonymous GET; 1 if it rendered."""
+    handler = BaseHandler()
+    handler.load_middleware()
+    token = metrics.recording.set(False)
+    try:
+        # Errors come back as responses, as they would to a client.
+        response = handler.get_response(route_request(reverse(name)))
+        response.close()
+    finally:
+        metrics.recording.reset(token)
+    if response.status_code >= 400:
+        logger.warning("Warm-up of %s failed with status %d", name, response.status_code)
+        return 0
+    return 1
+
+
+def warm_shared_cache():
+    for path in settings.WARMUP_CACHE_FILLERS:
+        import_string(path)()
+    return len(settings.WARMUP_CACHE_FILLERS)
+
+
+STEPS = [
+    ("url_resolvers", warm_url_resolvers),
+    ("templates", warm_templates),
+    ("translations", warm_translations),
+    ("release_connections", release_connections),
+]
+
+
+def worker_steps(routes=None):
+    """Steps for a process about to serve requests, one per route in ``routes`` or ``WARMUP_ROUTES``."""
+    routes = settings.WARMUP_ROUTES if routes is None else routes
+    return [
+        *((f"route {name}", partial(warm_route, name)) for name in routes),
+        ("shared_cache", warm_shared_cache),
+    ]
+
+
+def warm_up(steps=STEPS):
+    """Run ``steps`` and return ``{name: (count, milliseconds)}`` for each."""
+    timings = {}
+    for name, step in steps:
+        start = time.perf_counter()
+        count = step()
+        timings[name] = (count, (time.perf_counter() - start) * 1000)
+    return timings